@@ -70,6 +70,7 @@ def create_tables():
     from model.mahasiswatimetable_model import MahasiswaTimeTable
     from model.user_model import User
     from model.timetable_model import TimeTable
+    from model.timetable_version_model import TimeTableVersion, TimeTableStaging
     from model.openedclass_model import OpenedClass
     from model.programstudi_model import ProgramStudi
     from model.academicperiod_model import AcademicPeriods
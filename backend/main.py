@@ -29,9 +29,12 @@ from routes.dosenopened_routes import router as dosenopened_router
 from routes.sa_routes import router as sa_router
 from routes.ga_routes import router as ga_router
 from routes.hybrid_routes import router as hybrid_router
+from routes.tabu_routes import router as tabu_router
 from routes.temporary_timetable_routes import router as temporary_timetable_router
 from routes.hybrid_backup_routes import router as hybrid_backup_router
 from routes.export_routes import router as export_router
+from routes.job_routes import router as job_router
+from utils.jobs import job_manager
 load_dotenv()
 
 SECRET_KEY = os.getenv("SECRET_KEY", "default_secret_key")
@@ -132,6 +135,7 @@ async def test_hello():
 @app.on_event("shutdown")
 async def shutdown_event():
     scheduler.shutdown()
+    job_manager.shutdown()
     print("Scheduler shutdown ✅")
 
 
@@ -155,7 +159,9 @@ app.include_router(dosenopened_router, prefix="/dosen-opened", tags=["Dosen Open
 app.include_router(sa_router, prefix="/sa-router", tags=["Simulated Annealing"])
 app.include_router(ga_router, prefix="/ga-router", tags=["Genetic Algorithm"])
 app.include_router(hybrid_router, prefix="/hybrid-router", tags=["Hybrid Algorithm"])
+app.include_router(tabu_router, prefix="/tabu-router", tags=["Tabu Search"])
 app.include_router(export_router, prefix="/export", tags=["Export"])
+app.include_router(job_router, prefix="/jobs", tags=["Jobs"])
 app.include_router(temporary_timetable_router, prefix="/temporary-timetable", tags=["Temporary Timetable"])
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8080)
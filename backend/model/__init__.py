@@ -18,6 +18,7 @@ from .programstudi_model import ProgramStudi
 # from .matakuliah_programstudi import MataKuliahProgramStudi
 from .academicperiod_model import AcademicPeriods
 from .timetable_model import TimeTable
+from .timetable_version_model import TimeTableVersion, TimeTableStaging
 from .ruangan_model import Ruangan
 from .temporary_timetable_model import TemporaryTimeTable
 from .dosenopened_model import openedclass_dosen
@@ -0,0 +1,48 @@
+from datetime import datetime
+from typing import List
+
+from database import Base
+from sqlalchemy.orm import mapped_column, Mapped
+from sqlalchemy import JSON, String, Integer, ForeignKey, Boolean, DateTime
+
+
+class TimeTableVersion(Base):
+    """
+    Satu versi jadwal hasil solver. Status: staged (baru ditulis, belum
+    tampil), active (isinya yang sekarang ada di tabel timetable), archived
+    (pernah aktif, bisa dipublish ulang buat rollback).
+    """
+    __tablename__ = "timetable_version"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="staged")
+    source: Mapped[str] = mapped_column(String(50), nullable=True)
+    rows: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    academic_period_id: Mapped[int] = mapped_column(ForeignKey("academic_periods.id"), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+    published_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<TimeTableVersion(id={self.id}, status={self.status}, rows={self.rows})>"
+
+
+class TimeTableStaging(Base):
+    """Baris jadwal per versi, kolomnya sama dengan timetable."""
+    __tablename__ = "timetable_staging"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    version_id: Mapped[int] = mapped_column(ForeignKey("timetable_version.id"), nullable=False, index=True)
+    opened_class_id: Mapped[int] = mapped_column(ForeignKey("opened_class.id"), nullable=False)
+    ruangan_id: Mapped[int] = mapped_column(ForeignKey("ruangan.id"), nullable=False)
+    timeslot_ids: Mapped[List[int]] = mapped_column(JSON, nullable=False)
+
+    is_conflicted: Mapped[bool] = mapped_column(Boolean, default=False)
+    kelas: Mapped[str] = mapped_column(String(10), nullable=False)
+    kapasitas: Mapped[int] = mapped_column(Integer, nullable=False, default=35)
+    reason: Mapped[str] = mapped_column(String(255), nullable=True)
+    academic_period_id: Mapped[int] = mapped_column(ForeignKey("academic_periods.id"), nullable=False)
+    kuota: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    placeholder: Mapped[str] = mapped_column(String(255), nullable=True)
+
+    def __repr__(self):
+        return f"<TimeTableStaging(version_id={self.version_id}, opened_class_id={self.opened_class_id})>"
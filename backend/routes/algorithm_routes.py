@@ -2,7 +2,7 @@ import string
 from typing import Any, Dict, List, Optional
 from numpy import number
 from sqlalchemy import String, and_, case, or_, text
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 # from model.matakuliah_programstudi import MataKuliahProgramStudi
 from model.temporary_timetable_model import TemporaryTimeTable
 from model.academicperiod_model import AcademicPeriods
@@ -14,7 +14,11 @@ from model.timeslot_model import TimeSlot
 from model.preference_model import Preference
 from model.openedclass_model import OpenedClass
 from model.timetable_model import TimeTable
+from model.timetable_version_model import TimeTableVersion
 from model.openedclass_model import openedclass_dosen
+from utils.snapshot import ProblemSnapshot, cached_snapshot
+from utils.timetable_writer import publish_version, rollback_timetable
+from itertools import chain
 import random
 import logging
 import time
@@ -40,7 +44,8 @@ def fetch_data(db: Session):
     timeslots = db.query(TimeSlot).order_by(TimeSlot.day_index, TimeSlot.start_time).all()
 
     preferences = db.query(Preference).all()
-    opened_classes = db.query(OpenedClass).all()
+    # dosen per kelas diambil sekalian, bukan lazy load satu query per kelas
+    opened_classes = db.query(OpenedClass).options(selectinload(OpenedClass.dosens)).all()
 
     
     opened_class_cache = {oc.id: {
@@ -57,6 +62,62 @@ def fetch_data(db: Session):
     return courses, lecturers, rooms, timeslots, preferences, opened_classes, opened_class_cache, room_cache, timeslot_cache
 
 
+def fetch_dosen_preferences(db: Session, opened_classes: List[OpenedClass]):
+    """
+    Preferensi dosen per (opened_class_id, dosen_id) untuk semua kelas di
+    `opened_classes`. Cuma dua query (penugasan dosen dan preferensinya),
+    sisanya dikelompokkan di memori; preferensi satu dosen dipakai bareng
+    untuk semua kelas yang dia ajar.
+    """
+    class_ids = [oc.id for oc in opened_classes]
+    if not class_ids:
+        return {}
+    assignments = db.query(openedclass_dosen).filter(
+        openedclass_dosen.c.opened_class_id.in_(class_ids)
+    ).all()
+
+    prefs_by_dosen = {}
+    dosen_ids = {assignment.dosen_id for assignment in assignments}
+    if dosen_ids:
+        for p in db.query(Preference).filter(Preference.dosen_id.in_(dosen_ids)).order_by(Preference.id):
+            prefs_by_dosen.setdefault(p.dosen_id, []).append(p)
+
+    dosen_info = {}
+    for dosen_id in dosen_ids:
+        dosen_prefs = prefs_by_dosen.get(dosen_id, [])
+        dosen_info[dosen_id] = {
+            'preferences': {p.timeslot_id: p for p in dosen_prefs},
+            'is_high_priority': any(p.is_high_priority for p in dosen_prefs),
+            'is_special_needs': any(p.is_special_needs for p in dosen_prefs)
+        }
+
+    preferences_cache = {}
+    for assignment in assignments:
+        preferences_cache[(assignment.opened_class_id, assignment.dosen_id)] = {
+            'used_preference': assignment.used_preference,
+            **dosen_info[assignment.dosen_id],
+        }
+    return preferences_cache
+
+
+def build_problem_snapshot(db: Session):
+    data = fetch_data(db)
+    courses, lecturers, rooms, timeslots, preferences, opened_classes = data[:6]
+    preferences_cache = fetch_dosen_preferences(db, opened_classes)
+    # objek ORM dipakai lintas request, jangan sampai di-expire commit session ini
+    for obj in chain(courses, lecturers, rooms, timeslots, preferences, opened_classes):
+        if obj in db:
+            db.expunge(obj)
+    return ProblemSnapshot(data, preferences_cache, {dosen.pegawai_id: dosen for dosen in lecturers})
+
+
+def load_problem_snapshot(db: Session):
+    """
+    Input solver untuk periode aktif, dari cache kalau data master belum
+    berubah sejak load terakhir (lihat `utils.snapshot`); run berikutnya
+    tidak perlu query data lagi.
+    """
+    return cached_snapshot(db, build_problem_snapshot)
 
 
 def clear_timetable(db: Session):
@@ -64,6 +125,8 @@ def clear_timetable(db: Session):
     db.execute(text("DELETE FROM temporary_timetable"))
     db.execute(text("DELETE FROM mahasiswa_timetable"))
     db.execute(text("DELETE FROM timetable"))
+    # isi versi aktif masih ada di staging, jadi tetap bisa di-rollback
+    db.query(TimeTableVersion).filter(TimeTableVersion.status == "active").update({"status": "archived"})
     db.commit()
 
 
@@ -385,6 +448,55 @@ async def reset_schedule(db: Session = Depends(get_db)):
         logger.error(f"Error resetting schedule: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+
+def version_summary(version: TimeTableVersion):
+    return {
+        "id": version.id,
+        "status": version.status,
+        "source": version.source,
+        "rows": version.rows,
+        "academic_period_id": version.academic_period_id,
+        "created_at": version.created_at,
+        "published_at": version.published_at,
+    }
+
+
+@router.get("/timetable-versions")
+def list_timetable_versions(db: Session = Depends(get_db)):
+    """Versi jadwal yang masih disimpan (staged, active, archived), terbaru dulu."""
+    versions = db.query(TimeTableVersion).order_by(TimeTableVersion.id.desc()).all()
+    return [version_summary(version) for version in versions]
+
+
+@router.post("/timetable-versions/{version_id}/publish")
+def publish_timetable_version(version_id: int, db: Session = Depends(get_db)):
+    version = db.get(TimeTableVersion, version_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail=f"Versi timetable {version_id} tidak ditemukan")
+    if version.status == "active":
+        raise HTTPException(status_code=400, detail=f"Versi timetable {version_id} sudah aktif")
+    try:
+        version = publish_version(db, version_id)
+        return {"message": f"Timetable versi {version.id} dipublish", "version": version_summary(version)}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error publish timetable versi {version_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/timetable-versions/rollback")
+def rollback_timetable_version(db: Session = Depends(get_db)):
+    """Balik ke jadwal yang tampil sebelum publish terakhir."""
+    try:
+        version = rollback_timetable(db)
+        return {"message": f"Timetable dikembalikan ke versi {version.id}", "version": version_summary(version)}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error rollback timetable: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 from sqlalchemy.orm import joinedload
 from sqlalchemy import or_, desc
 from fastapi import HTTPException, Query, Depends
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status, Body
+from utils.snapshot import invalidate_on_write
 from sqlalchemy import and_, case, func, or_
 from sqlalchemy.orm import Session, joinedload
 from typing import Any, Dict, Optional, List
@@ -97,7 +98,8 @@ class DosenRead(BaseModel):
 
 
 
-router = APIRouter()
+# tiap request tulis bikin snapshot input solver basi
+router = APIRouter(dependencies=[Depends(invalidate_on_write)])
 
 
 @router.get("/get-dosen/names", response_model=Dict[str, Any])
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status, Body
+from utils.snapshot import invalidate_on_write
 from sqlalchemy import func, or_
 from sqlalchemy.orm import Session, joinedload
 from typing import Any, Dict, Optional, List
@@ -15,7 +16,8 @@ from model.dosenopened_model import openedclass_dosen
 
 
 
-router = APIRouter()
+# tiap request tulis bikin snapshot input solver basi
+router = APIRouter(dependencies=[Depends(invalidate_on_write)])
 
 
 
@@ -11,11 +11,9 @@ from sqlalchemy.orm import Session
 
 from routes.sa_routes import get_effective_sks, identify_recess_times
 from database import get_db
-from routes.algorithm_routes import clear_timetable, fetch_data
+from routes.algorithm_routes import clear_timetable, fetch_data, fetch_dosen_preferences
 from model.academicperiod_model import AcademicPeriods
 
-from model.preference_model import Preference
-from model.openedclass_model import OpenedClass, openedclass_dosen
 from model.timetable_model import TimeTable
 
 router = APIRouter()
@@ -575,28 +573,6 @@ def initialize_population(
     return population
 
 
-def fetch_dosen_preferences(db: Session, opened_classes: List[OpenedClass]):
-    preferences_cache = {}
-    for oc in opened_classes:
-        dosen_assignments = db.query(openedclass_dosen).filter(
-            openedclass_dosen.c.opened_class_id == oc.id
-        ).all()
-        for assignment in dosen_assignments:
-            dosen_id = getattr(assignment, "dosen_id", None)
-            used_preference = assignment.used_preference
-            dosen_prefs = db.query(Preference).filter(
-                Preference.dosen_id == dosen_id
-            ).all()
-            key = (oc.id, dosen_id)
-            preferences_cache[key] = {
-                'used_preference': used_preference,
-                'preferences': {p.timeslot_id: p for p in dosen_prefs},
-                'is_high_priority': any(p.is_high_priority for p in dosen_prefs),
-                'is_special_needs': any(p.is_special_needs for p in dosen_prefs)
-            }
-    return preferences_cache
-
-
 # =============================================================================
 #                        HYBRID GA + SA FUNCTION
 # =============================================================================
@@ -2,20 +2,37 @@
 import math
 import random
 import logging
+import uuid
 
 from datetime import datetime
-from typing import  Dict, List
+from functools import partial
+from typing import  Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from routes.sa_routes import get_effective_sks, identify_recess_times
 from database import get_db
-from routes.algorithm_routes import clear_timetable, fetch_data
+from solver.budget import NO_DEADLINE, Deadline
+from solver.cache import FitnessCache
+from solver.checkpoint import NO_CHECKPOINT, Checkpointer, load_checkpoint, problem_fingerprint
+from solver.construct import dsatur_solution
+from solver.cooling import COOLING_MODES, REHEAT_AFTER, STOP_AFTER, TARGET_ACCEPTANCE, CoolingSchedule
+from solver.decompose import COUPLING_THRESHOLD, decomposed_solve
+from solver.delta import IncrementalEvaluator
+from solver.fitness import evaluate, fitness_components
+from solver.islands import elite_solutions, island_ga
+from solver.parallel import population_evaluator
+from solver.problem import CompiledProblem, block_slot_ids, decode_solution
+from solver.rng import make_rng
+from solver.progress import NULL_PROGRESS, ProgressReporter
+from solver.tempering import SA_MODES, multi_start, parallel_tempering
+from solver.warmstart import warm_start
+from routes.algorithm_routes import load_problem_snapshot
+from utils.jobs import job_manager
+from utils.timetable_writer import activate_live, archive_live, first_entries, timetable_placeholder, write_timetable
 from model.academicperiod_model import AcademicPeriods
 
-from model.preference_model import Preference
-from model.openedclass_model import OpenedClass, openedclass_dosen
 from model.timetable_model import TimeTable
 
 router = APIRouter()
@@ -27,207 +44,58 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# porsi default budget waktu untuk GA kalau time_budget_seconds diisi, sisanya buat SA
+GA_BUDGET_SHARE = 0.3
+# mode decomposed: porsi budget untuk repair setelah hasil cluster digabung
+REPAIR_BUDGET_SHARE = 0.2
 
-def check_conflicts(solution, opened_class_cache, room_cache, timeslot_cache, penalties):
-    conflicts = 0
-    timeslot_usage = {}  
-    lecturer_schedule = {}  
 
-    for assignment in solution:
-        opened_class_id, room_id, timeslot_id = assignment
-        class_info = opened_class_cache[opened_class_id]
+def fitness(solution, problem: CompiledProblem, penalties):
+    return evaluate(solution, problem, penalties)
 
-        effective_sks = get_effective_sks(class_info)
-        current_timeslot = timeslot_cache[timeslot_id]
 
-        for i in range(effective_sks):
-            current_id = timeslot_id + i
-            if current_id not in timeslot_cache:
-                conflicts += penalties["invalid_timeslot"]  # Penalti timeslot invalid
-                continue
-
-            next_timeslot = timeslot_cache[current_id]
-            if next_timeslot.day != current_timeslot.day:
-                conflicts += penalties["cross_day"]  # Penalti loncat hari
-                continue
-
-            if current_id not in timeslot_usage:
-                timeslot_usage[current_id] = []
-            for used_room, _ in timeslot_usage[current_id]:
-                if used_room == room_id:
-                    conflicts += penalties["room_conflict"]  # Penalti ruangan bentrok
-            timeslot_usage[current_id].append((room_id, opened_class_id))
-
-            for dosen_id in class_info['dosen_ids']:
-                schedule_key = (dosen_id, current_id)
-                if schedule_key in lecturer_schedule:
-                    conflicts += penalties["lecturer_conflict"]  # Penalti  dosen bentrok
-                lecturer_schedule[schedule_key] = opened_class_id
-
-    return conflicts
-
-
-def check_room_type_compatibility(solution, opened_class_cache, room_cache, penalties):
-    penalty = 0
-    for opened_class_id, room_id, _ in solution:
-        class_info = opened_class_cache[opened_class_id]
-        mata_kuliah = class_info['mata_kuliah']
-        room = room_cache[room_id]
-
-        if mata_kuliah.tipe_mk == 'P' and room.tipe_ruangan != 'P':
-            penalty += penalties["wrong_room"]
-        elif mata_kuliah.tipe_mk == 'T' and room.tipe_ruangan != 'T':
-            penalty += penalties["wrong_room"]
-        elif mata_kuliah.tipe_mk == 'S' and room.tipe_ruangan != 'S':
-            penalty += penalties["wrong_room"]    
-
-    return penalty
-
-def check_special_needs_compliance(solution, opened_class_cache, room_cache, preferences_cache, penalties):
-    penalty = 0
-    for opened_class_id, room_id, _ in solution:
-        class_info = opened_class_cache[opened_class_id]
-        room = room_cache[room_id]
-
-        for dosen_id in class_info['dosen_ids']:
-            dosen_key = (opened_class_id, dosen_id)
-            if dosen_key in preferences_cache and preferences_cache[dosen_key].get('is_special_needs', False):
-                if room.group_code not in ['KHD2', 'DS2']:
-                    penalty += penalties["special_needs"]
-    return penalty
-        
-        
-def check_daily_load_balance(solution, opened_class_cache, timeslot_cache, penalties):
-    penalty = 0
-    lecturer_daily_counts = {}
-
-    # loop semua jadwal
-    for opened_class_id, _, timeslot_id in solution:
-        class_info = opened_class_cache[opened_class_id]
-        for dosen_id in class_info['dosen_ids']:
-            day = timeslot_cache[timeslot_id].day
-            # bikin mapping dosen -> hari -> jumlah ngajar
-            if dosen_id not in lecturer_daily_counts:
-                lecturer_daily_counts[dosen_id] = {}
-            if day not in lecturer_daily_counts[dosen_id]:
-                lecturer_daily_counts[dosen_id][day] = 0
-            lecturer_daily_counts[dosen_id][day] += 1
-
-    # cek balance per dosen
-    for dosen_id, day_counts in lecturer_daily_counts.items():
-        counts = list(day_counts.values())
-        if not counts:
-            continue
-        avg = sum(counts) / len(counts)  # hitung rata-rata ngajar per hari
-        for count in counts:
-            # kalau beda jauh bgt sama rata-rata (selisih > 4) kena penalti
-            if abs(count - avg) > 4:
-                penalty += penalties["daily_load"] * abs(count - avg)
-
-    return penalty
-
-
-def check_preference_compliance(solution, opened_class_cache, timeslot_cache, preferences_cache, penalties):
-    penalty = 0
-
-    for opened_class_id, _, timeslot_id in solution:
-        for dosen_id in opened_class_cache[opened_class_id]['dosen_ids']:
-            key = (opened_class_id, dosen_id)
-            if key not in preferences_cache:
-                continue
-            pref_info = preferences_cache[key]
-
-            # high-priority -> forbidden
-            if pref_info['is_high_priority']:
-                if timeslot_id in pref_info['preferences']:
-                    penalty += penalties['high_priority_preference']
-            # low priority -> general preference
-            elif pref_info['used_preference']:
-                if timeslot_id not in pref_info['preferences']:
-                    penalty += penalties['general_preference']
-
-    return penalty
-
-def check_jabatan_constraint(solution, opened_class_cache, timeslot_cache, dosen_cache, penalties):
-    penalty = 0
-    for opened_class_id, room_id, timeslot_id in solution:
-        class_info = opened_class_cache[opened_class_id]
-        timeslot = timeslot_cache[timeslot_id]
-        
-        if timeslot.day_index == 0:
-            for dosen_id in class_info["dosen_ids"]:
-                dosen = dosen_cache.get(dosen_id)
-                if dosen and dosen.jabatan is not None:
-                    penalty += penalties["jabatan"]
-    return penalty
-
-def fitness(solution, opened_class_cache, room_cache, timeslot_cache, preferences_cache, dosen_cache, penalties):
-    conflict_score = check_conflicts(solution, opened_class_cache, room_cache, timeslot_cache, penalties)
-    
-    room_type_score = check_room_type_compatibility(solution, opened_class_cache, room_cache, penalties)
-    special_needs_score = check_special_needs_compliance(solution, opened_class_cache, room_cache, preferences_cache, penalties)
-    daily_load_score = check_daily_load_balance(solution, opened_class_cache, timeslot_cache, penalties)
-    preference_score = check_preference_compliance(solution, opened_class_cache, timeslot_cache, preferences_cache, penalties)
-    jabatan_penalty = check_jabatan_constraint(solution, opened_class_cache, timeslot_cache, dosen_cache, penalties)
-    
-    soft_score = room_type_score + special_needs_score + daily_load_score + preference_score + jabatan_penalty
-    
-   
-    if conflict_score > 0:
-        return (conflict_score * penalties["conflict_multiplier"]) + soft_score
-    else:
-        return soft_score
-def generate_neighbor_solution(current_solution, opened_classes, rooms, timeslots, opened_class_cache, recess_times):
-    # clone dulu solusi sekarang biar originalnya aman
-    new_solution = current_solution.copy()
-    if not new_solution:
-        return new_solution
+def neighbor_move(solution, problem: CompiledProblem, movable=None, rng=random):
+    """
+    Pilih satu move neighbor: (index gen, ruangan baru, start slot baru) atau None.
+    Kalau `movable` diisi, gen yang digeser cuma dari list index itu.
+    """
+    if not solution:
+        return None
 
     # pilih random satu kelas buat dimutasi
-    idx = random.randrange(len(new_solution))
-    opened_class_id, _, _ = new_solution[idx]
-    class_info = opened_class_cache[opened_class_id]
-    tipe_mk = class_info["mata_kuliah"].tipe_mk
+    idx = rng.choice(movable) if movable else rng.randrange(len(solution))
+    c = solution.classes[idx]
 
     # cari ruangan yang kompatibel (tipe ruangan sama tipe mata kuliah)
-    compatible_rooms = [r for r in rooms if r.tipe_ruangan == tipe_mk]
+    compatible_rooms = problem.class_rooms[c]
     if not compatible_rooms:
-        return new_solution
+        return None
 
     # acak pilih ruangan baru buat kelas ini
-    new_room = random.choice(compatible_rooms)
-    effective_sks = get_effective_sks(class_info)
+    new_room = rng.choice(compatible_rooms)
 
-    # semua kemungkinan start index timeslot
-    possible_indices = list(range(len(timeslots)))
-    random.shuffle(possible_indices)
+    # potongan timeslot yang valid udah diindex di depan:
+    # - semua slot masih di hari yg sama
+    # - ID berurutan
+    # - jam start-end nyambung
+    # - bukan jam istirahat
+    starts = problem.tight_block_starts[problem.class_sks[c]]
+    if not starts:
+        return None
+    return idx, new_room, rng.choice(starts)
 
-    # cari potongan timeslot yang valid
-    for start_idx in possible_indices:
-        if start_idx + effective_sks > len(timeslots):
-            continue
-        slots = timeslots[start_idx: start_idx + effective_sks]
-
-        # cek syarat:
-        # - semua slot masih di hari yg sama
-        # - ID berurutan
-        # - jam start-end nyambung
-        # - bukan jam istirahat
-        if all(
-            slots[i].day_index == slots[0].day_index and 
-            slots[i].id == slots[i - 1].id + 1 and 
-            slots[i].start_time == slots[i - 1].end_time and 
-            slots[i].id not in recess_times
-            for i in range(1, effective_sks)
-        ):
-            # kalau ketemu, langsung ganti entri yang dipilih
-            new_solution[idx] = (opened_class_id, new_room.id, slots[0].id)
-            break
 
-    return new_solution  # balikin solusi baru hasil neighbor
+def generate_neighbor_solution(current_solution, problem: CompiledProblem, rng=random):
+    # clone dulu solusi sekarang biar originalnya aman
+    new_solution = current_solution.copy()
+    move = neighbor_move(new_solution, problem, rng=rng)
+    if move is not None:
+        idx, new_room, start_idx = move
+        new_solution[idx] = (new_solution[idx][0], new_room, start_idx)
+    return new_solution
 
 
-def format_solution_for_db(db: Session, solution, opened_class_cache, room_cache, timeslot_cache):
+def format_solution_for_db(db: Session, solution, opened_class_cache, room_cache, timeslot_cache, problem: CompiledProblem):
     active_period = db.query(AcademicPeriods).filter(AcademicPeriods.is_active == True).first()
     if not active_period:
         raise ValueError("Active academic period tidak ditemukan")
@@ -236,15 +104,7 @@ def format_solution_for_db(db: Session, solution, opened_class_cache, room_cache
         try:
             class_info = opened_class_cache[opened_class_id]
             effective_sks = get_effective_sks(class_info)
-            timeslot_ids = []
-            current_day = timeslot_cache[start_timeslot_id].day_index
-            for i in range(effective_sks):
-                current_id = start_timeslot_id + i
-                if current_id not in timeslot_cache:
-                    raise ValueError(f"Invalid timeslot ID: {current_id}")
-                if timeslot_cache[current_id].day_index != current_day:
-                    raise ValueError(f"Timeslots memiliki hari yang berbeda {opened_class_id}")
-                timeslot_ids.append(current_id)
+            timeslot_ids = block_slot_ids(problem, effective_sks, start_timeslot_id)
             timetable_entry = {
                 "opened_class_id": opened_class_id,
                 "ruangan_id": room_id,
@@ -260,320 +120,129 @@ def format_solution_for_db(db: Session, solution, opened_class_cache, room_cache
             continue
     return formatted
 
-def insert_timetable(db: Session, timetable: List[Dict], opened_class_cache, room_cache, timeslot_cache):
+def insert_timetable(db: Session, timetable: List[Dict], opened_class_cache, room_cache, timeslot_cache, source="hybrid"):
+    # ditulis ke staging dulu, timetable yang tampil baru diganti waktu publish
+    return write_timetable(db, timetable, opened_class_cache, room_cache, timeslot_cache, source)
+
+def update_timetable(db: Session, rows, timetable: List[Dict], opened_class_cache, room_cache, timeslot_cache):
+    """
+    Versi inkremental `insert_timetable`: baris lama diupdate di tempat (id
+    dan relasi mahasiswa_timetable tetap), cuma kalau ruangan/slot/placeholder
+    berubah; kelas yang belum punya baris di-insert. Jadwal sebelumnya
+    disimpan dulu sebagai versi archived dan hasilnya dicatat sebagai versi
+    aktif baru, jadi tetap bisa di-rollback; semuanya satu transaksi.
+    """
     active_period = db.query(AcademicPeriods).filter(AcademicPeriods.is_active == True).first()
     if not active_period:
         raise ValueError("Active academic period tidak ditemukan")
-    for entry in timetable:
-        try:
-            opened_class = opened_class_cache[entry["opened_class_id"]]
-            mata_kuliah = opened_class["mata_kuliah"]
-            room = room_cache[entry["ruangan_id"]]
-            timeslot_ids = entry["timeslot_ids"]
-            first_timeslot = timeslot_cache[timeslot_ids[0]]
-            day = first_timeslot.day.value
-            start_time = first_timeslot.start_time.strftime("%H:%M")
-            end_time = timeslot_cache[timeslot_ids[-1]].end_time.strftime("%H:%M")
-            placeholder = f"1. {room.kode_ruangan} - {day} ({start_time} - {end_time})"
-            if mata_kuliah.have_kelas_besar:
-                first_entry_same_kodemk = next(
-                    (e for e in timetable if opened_class_cache[e["opened_class_id"]]["mata_kuliah"].kodemk == mata_kuliah.kodemk),
-                    None
+    existing = {}
+    for row in rows:
+        existing.setdefault(row.opened_class_id, row)
+    # urutan entri ikut urutan baris lama, biar "entri pertama" kelas besar tidak pindah
+    position = {opened_class_id: i for i, opened_class_id in enumerate(existing)}
+    timetable = sorted(timetable, key=lambda e: position.get(e["opened_class_id"], len(position)))
+    first = first_entries(timetable, opened_class_cache)
+
+    try:
+        archive_live(db, active_period.id)
+        updated = inserted = 0
+        for entry in timetable:
+            try:
+                opened_class = opened_class_cache[entry["opened_class_id"]]
+                placeholder = timetable_placeholder(
+                    entry, first.get(opened_class["mata_kuliah"].kodemk), opened_class_cache, room_cache, timeslot_cache
                 )
-                if first_entry_same_kodemk:
-                    first_entry_timeslot = timeslot_cache[first_entry_same_kodemk["timeslot_ids"][0]]
-                    first_entry_day = first_entry_timeslot.day.value  
-                    first_entry_start_time = first_entry_timeslot.start_time.strftime("%H:%M")  
-                    first_entry_end_time = timeslot_cache[first_entry_same_kodemk["timeslot_ids"][-1]].end_time.strftime("%H:%M")
-                    placeholder += f"\n2. FIK-VCR-KB-1 - {first_entry_day} ({first_entry_start_time} - {first_entry_end_time})"
-            timetable_entry = TimeTable(
-                opened_class_id=entry["opened_class_id"],
-                ruangan_id=entry["ruangan_id"],
-                timeslot_ids=entry["timeslot_ids"],
-                is_conflicted=entry["is_conflicted"],
-                kelas=entry["kelas"],
-                kapasitas=opened_class["kapasitas"],
-                academic_period_id=active_period.id,
-                placeholder=placeholder,
-            )
-            db.add(timetable_entry)
-        except KeyError as e:
-            logger.error(f"Missing key in opened_class_cache or room_cache for timetable entry: {e}")
-            continue
-    db.commit()
+            except KeyError as e:
+                logger.error(f"Missing key in opened_class_cache or room_cache for timetable entry: {e}")
+                continue
+            row = existing.get(entry["opened_class_id"])
+            if row is None:
+                db.add(TimeTable(
+                    opened_class_id=entry["opened_class_id"],
+                    ruangan_id=entry["ruangan_id"],
+                    timeslot_ids=entry["timeslot_ids"],
+                    is_conflicted=entry["is_conflicted"],
+                    kelas=entry["kelas"],
+                    kapasitas=opened_class["kapasitas"],
+                    academic_period_id=active_period.id,
+                    placeholder=placeholder,
+                ))
+                inserted += 1
+            elif (row.ruangan_id, list(row.timeslot_ids), row.placeholder) != (entry["ruangan_id"], entry["timeslot_ids"], placeholder):
+                row.ruangan_id = entry["ruangan_id"]
+                row.timeslot_ids = entry["timeslot_ids"]
+                row.placeholder = placeholder
+                updated += 1
+        version = activate_live(db, active_period.id, source="incremental")
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return {"updated": updated, "inserted": inserted, "version": version.id}
 
 
 # =============================================================================
 #                        GA SUPPORT FUNCTIONS
 # =============================================================================
 
-def selection(population, opened_class_cache, room_cache, timeslot_cache, preferences_cache, dosen_cache, penalties, k=3):
+def selection(population, fitness_cache: FitnessCache, k=3, rng=random):
     selected = []
     for _ in range(len(population)):
-        candidates = random.sample(population, k)
-        best_candidate = min(
-            candidates,
-            key=lambda sol: fitness(sol, opened_class_cache, room_cache, timeslot_cache, preferences_cache, dosen_cache, penalties)
-        )
+        candidates = rng.sample(population, k)
+        best_candidate = min(candidates, key=fitness_cache)
         selected.append(best_candidate)
     return selected
 
-def roulette_wheel_selection(population, opened_class_cache, room_cache, timeslot_cache, preferences_cache, dosen_cache, penalties):
-    fitness_values = [1 / (1 + fitness(sol, opened_class_cache, room_cache, timeslot_cache, preferences_cache, dosen_cache, penalties))
-                      for sol in population]
+def roulette_wheel_selection(population, fitness_cache: FitnessCache, rng=random):
+    fitness_values = [1 / (1 + score) for score in fitness_cache.score_population(population)]
     total_fitness = sum(fitness_values)
     probabilities = [f / total_fitness for f in fitness_values]
-    selected = random.choices(population, weights=probabilities, k=len(population))
+    selected = rng.choices(population, weights=probabilities, k=len(population))
     return selected
 
-def crossover(parent1, parent2):
+def crossover(parent1, parent2, rng=random):
     if len(parent1) == 0 or len(parent2) == 0:
         return parent1, parent2
-    point = random.randint(1, min(len(parent1), len(parent2)) - 1)
-    child1 = parent1[:point] + parent2[point:]
-    child2 = parent2[:point] + parent1[point:]
-    return child1, child2
+    point = rng.randint(1, min(len(parent1), len(parent2)) - 1)
+    return parent1.splice(parent2, point), parent2.splice(parent1, point)
+
+def is_block_preferred(problem: CompiledProblem, c, start_idx):
+    # semua dosen kelas ini punya minimal satu slot preferensi di potongan ini (bitmask, dihitung di compile)
+    return problem.class_pref_starts[c] >> start_idx & 1
 
-def mutate(solution, opened_classes, rooms, timeslots, opened_class_cache, recess_times, preferences_cache, mutation_prob=0.1):
+def mutate(solution, problem: CompiledProblem, mutation_prob=0.1, rng=random):
     new_solution = solution.copy()
     if not new_solution:
         return new_solution
-    if random.random() < mutation_prob:
+    if rng.random() < mutation_prob:
         # ngambil salah satu entri solusi
-        idx = random.randrange(len(new_solution))
+        idx = rng.randrange(len(new_solution))
 
-        opened_class_id, _, _ = new_solution[idx]
-        class_info = opened_class_cache[opened_class_id]
-        effective_sks = get_effective_sks(class_info)
-        tipe_mk = class_info["mata_kuliah"].tipe_mk
-        compatible_rooms = [r for r in rooms if r.tipe_ruangan == tipe_mk]
+        c, _, _ = new_solution[idx]
+        effective_sks = problem.class_sks[c]
+        compatible_rooms = problem.class_rooms[c]
 
         if compatible_rooms:
-            new_room = random.choice(compatible_rooms)
-            valid_timeslots = sorted(timeslots, key=lambda x: (x.day_index, x.start_time))
-            # [0,1,2,3,…] artinya potongan 2-slot bisa mulai di index 0,1,2,…
-            possible_indices = list(range(len(valid_timeslots) - effective_sks + 1))
-            
-            random.shuffle(possible_indices)
-
-            # pisahin timeslot berdasarkan preferensi dosen
-            preferred_timeslots = []
-            non_preferred_timeslots = []
-
-            # buat nyari timeslot yang possible aja
-            for start_idx in possible_indices:
-                slots = valid_timeslots[start_idx : start_idx + effective_sks]
-                slot_ids = {slot.id for slot in slots}
-
-                is_preferred = all(
-                    any(t in preferences_cache.get((opened_class_id, dosen_id), {}).get('preferences', {}) for t in slot_ids)
-                    for dosen_id in class_info["dosen_ids"]
+            new_room = rng.choice(compatible_rooms)
+            # start yang valid (hari sama, berurutan, ga kepotong istirahat) udah diindex
+            valid_starts = problem.block_starts[effective_sks]
+
+            # prioritasin timeslot yang sesuai preferensi dosen
+            preferred_timeslots = [s for s in valid_starts if is_block_preferred(problem, c, s)]
+            candidates = preferred_timeslots or valid_starts
+
+            if candidates:
+                start_idx = rng.choice(candidates)
+                new_solution[idx] = (c, new_room, start_idx)
+                logger.info(
+                    f"Mutasi: kelas {problem.class_ids[c]} pindah ke ruangan {problem.room_ids[new_room]}, "
+                    f"dg timeslot {problem.slot_ids[start_idx]}"
                 )
-
-                if is_preferred:
-                    preferred_timeslots.append(start_idx)
-                else:
-                    non_preferred_timeslots.append(start_idx)
-
-            sorted_indices = preferred_timeslots + non_preferred_timeslots
-
-            # diurutin, trus buat dicari dia nyambung engganya
-            for start_idx in sorted_indices:
-                # ngambil potongan sebanyak sks 
-                slots = valid_timeslots[start_idx : start_idx + effective_sks]
-
-                if all(
-                    slots[i].day_index == slots[0].day_index and
-                    slots[i].id == slots[i-1].id + 1 and
-                    slots[i].id not in recess_times
-                    for i in range(1, effective_sks)
-                ):
-                    new_solution[idx] = (opened_class_id, new_room.id, slots[0].id)
-                    logger.info(f"Mutasi: kelas {opened_class_id} pindah ke ruangan {new_room.id}, dg timeslot {slots[0].id}")
-                    break
     return new_solution
 
-def initialize_population(
-    opened_classes, rooms, timeslots, population_size,
-    opened_class_cache, recess_times, preferences_cache, dosen_cache
-):
- 
-    population = []
-    timeslots_list = sorted(timeslots, key=lambda x: (x.day_index, x.start_time))
-    
-    for _ in range(population_size):
-       
-        solution = []
-        room_schedule = {}      # Menyimpan jadwal penggunaan ruangan dengan format (room_id, slot_id) -> kelas_id
-        lecturer_schedule = {}  # Menyimpan jadwal dosen dengan format (dosen_id, slot_id) -> kelas_id
-        
-        
-        sorted_classes = sorted(
-            opened_classes,
-            key=lambda oc: get_effective_sks(opened_class_cache[oc.id]),
-            reverse=True
-        )
-        
-        for oc in sorted_classes:
-            class_info = opened_class_cache[oc.id]
-            sks = get_effective_sks(class_info)
-            tipe_mk = class_info["mata_kuliah"].tipe_mk
-
-          
-            compatible_rooms = [r for r in rooms if r.tipe_ruangan == tipe_mk]
-            if not compatible_rooms:
-                continue  # Lewati jika tidak ada ruangan yang cocok
-            
-            # Cek dosen jabatan? -> gaboleh senen
-            has_jabatan = any(
-                dosen_cache[d].jabatan is not None
-                for d in class_info["dosen_ids"]
-                if d in dosen_cache
-            )
-            
-            assigned = False
-            random.shuffle(compatible_rooms)  # Acak urutan ruangan untuk variasi solusi
-            
-            # Cari semua kemungkinan indeks awal untuk slot waktu berurutan sesuai jumlah SKS
-            possible_start_idxs = list(range(len(timeslots_list) - sks + 1))
-            random.shuffle(possible_start_idxs)  # Acak urutan indeks untuk variasi solusi
-            
-          
-            preferred_timeslots = []
-            non_preferred_timeslots = []
-            for idx in possible_start_idxs:
-                slots = timeslots_list[idx : idx + sks]
-                
-                # jika dosen memiliki jabatan, hindari jadwal hari Senin (day_index==0)
-                if has_jabatan and slots[0].day_index == 0:
-                    continue
-                
-                slot_ids = {s.id for s in slots}
-                # cek apakah semua dosen menyukai slot waktu ini
-                is_preferred = all(
-                    any(t in preferences_cache.get((oc.id, d), {}).get("preferences", {}) for t in slot_ids)
-                    for d in class_info["dosen_ids"]
-                )
-                
-                # Kelompokkan slot waktu berdasarkan preferensi
-                if is_preferred:
-                    preferred_timeslots.append(idx)
-                else:
-                    non_preferred_timeslots.append(idx)
-            
-         
-            sorted_start_idxs = preferred_timeslots + non_preferred_timeslots
-            
-            # coba jadwalkan kelas ke ruangan dan slot waktu yang tersedia
-            for room in compatible_rooms:
-                if assigned:
-                    break
-                for start_idx in sorted_start_idxs:
-                    slots = timeslots_list[idx : idx + sks]
-
-                    # Pastikan semua slot :
-                    #  di hari yang sama
-                    #  ga kepotong istirahat
-                    # berurutan
-                    if not all(
-                        slots[i].day_index == slots[0].day_index and 
-                        slots[i].id == slots[i-1].id + 1 and
-                        slots[i].id not in recess_times
-                        for i in range(1, sks)
-                    ):
-                        continue
-
-                    # Cek ketersediaan slot waktu dan dosen
-                    slot_available = True
-                    for slot in slots:
-                        if (room.id, slot.id) in room_schedule or any(
-                            (dosen_id, slot.id) in lecturer_schedule for dosen_id in class_info["dosen_ids"]
-                        ):
-                            slot_available = False
-                            break
-
-                    # Jika semua slot tersedia, jadwalkan kelas
-                    if slot_available:
-                        for slot in slots:
-                            room_schedule[(room.id, slot.id)] = oc.id
-                            for dosen_id in class_info["dosen_ids"]:
-                                lecturer_schedule[(dosen_id, slot.id)] = oc.id
-                        solution.append((oc.id, room.id, slots[0].id))
-                        assigned = True
-                        break
-
-            # kalo ga ketemu, make fallback
-            if not assigned:
-                
-                best_conflict = float('inf')
-                best_assignment = None
-                best_slots = None
-                best_room = None
-                
-                # Cari jadwal dengan konflik paling sedikit
-                for room in compatible_rooms:
-                    for start_idx in possible_start_idxs:
-                        slots = timeslots_list[idx : idx + sks]
-                        
-                        # Pastikan semua slot waktu pada hari yang sama, berurutan, dan tidak bentrok dengan waktu istirahat
-                        if not all(
-                            slots[i].day_index == slots[0].day_index and 
-                            slots[i].id == slots[i-1].id + 1 and
-                            slots[i].id not in recess_times
-                            for i in range(1, sks)
-                        ):
-                            continue
-                        
-                        # Hitung jumlah konflik yang terjadi
-                        conflict_cost = sum(
-                            (room.id, slot.id) in room_schedule or any(
-                                (dosen_id, slot.id) in lecturer_schedule for dosen_id in class_info["dosen_ids"]
-                            ) for slot in slots
-                        )
-                        
-                        # Update jadwal terbaik jika ditemukan konflik yang lebih sedikit
-                        if conflict_cost < best_conflict:
-                            best_conflict = conflict_cost
-                            best_assignment = (oc.id, room.id, slots[0].id)
-                            best_slots = slots
-                            best_room = room
-                
-                # Terapkan jadwal dengan konflik minimal jika ditemukan
-                if best_assignment:
-                    for slot in best_slots:
-                        room_schedule[(best_room.id, slot.id)] = oc.id
-                        for dosen_id in class_info["dosen_ids"]:
-                            lecturer_schedule[(dosen_id, slot.id)] = oc.id
-                    solution.append(best_assignment)
-                    assigned = True
-                    
-                
-        # Tambahkan solusi ke dalam populasi
-        population.append(solution)
-        
-    return population
-
-
-def fetch_dosen_preferences(db: Session, opened_classes: List[OpenedClass]):
-    preferences_cache = {}
-    for oc in opened_classes:
-        dosen_assignments = db.query(openedclass_dosen).filter(
-            openedclass_dosen.c.opened_class_id == oc.id
-        ).all()
-        for assignment in dosen_assignments:
-            dosen_id = getattr(assignment, "pegawai_id", None)
-            used_preference = assignment.used_preference
-            dosen_prefs = db.query(Preference).filter(
-                Preference.dosen_id == dosen_id
-            ).all()
-            key = (oc.id, dosen_id)
-            preferences_cache[key] = {
-                'used_preference': used_preference,
-                'preferences': {p.timeslot_id: p for p in dosen_prefs},
-                'is_high_priority': any(p.is_high_priority for p in dosen_prefs),
-                'is_special_needs': any(p.is_special_needs for p in dosen_prefs)
-            }
-    return preferences_cache
+def initialize_population(problem: CompiledProblem, population_size, rng=random):
+    # DSatur: kelas yang domain (ruangan x start) tersisanya paling kecil ditempatkan duluan
+    return [dsatur_solution(problem, rng) for _ in range(population_size)]
 
 
 # =============================================================================
@@ -601,168 +270,535 @@ def fetch_dosen_preferences(db: Session, opened_classes: List[OpenedClass]):
 #     plt.close(fig)
 #     return base64.b64encode(buf.read()).decode('utf-8')
 
-def hybrid_schedule(
-    penalties,
-    db: Session,
-    population_size: int = 50,
-    generations: int = 50,
-    mutation_prob: float = 0.1,
-    initial_temperature: float = 1000,
-    cooling_rate: float = 0.95,
-    iterations_per_temp: int = 100,
+def evolve_generation(population, problem: CompiledProblem, fitness_cache: FitnessCache, mutation_prob, rng=random):
+    # seleksi disini make roulette
+    selected_pop = roulette_wheel_selection(population, fitness_cache, rng)
+    new_population = []
+    # crossover disini. jadi pasangan yang dipilih dari seleksi akan di crossover disini
+    for i in range(0, len(selected_pop), 2):
+        if i + 1 < len(selected_pop):
+            child1, child2 = crossover(selected_pop[i], selected_pop[i+1], rng)
+            new_population.extend([child1, child2])
+        else:
+            new_population.append(selected_pop[i])
+
+    # mutasi disni. acak 1 gen aja dari hasil crossover make probabilitas
+    # 1 indiv tuh satu jadwal, bukan 1 entri
+    return [mutate(indiv, problem, mutation_prob, rng) for indiv in new_population]
+
+def ga_phase(
+    problem: CompiledProblem, penalties, population_size, generations, mutation_prob, workers=1, elite=1,
+    progress=NULL_PROGRESS, deadline=NO_DEADLINE, checkpointer=NO_CHECKPOINT, resume=None, rng=random
 ):
-    start_time = datetime.now()
-    
-    clear_timetable(db)
-    logger.info("Hybrid GA-SA scheduling dimulai...")
-    courses, lecturers, rooms, timeslots, preferences, opened_classes, opened_class_cache, room_cache, timeslot_cache = fetch_data(db)
-    preferences_cache = fetch_dosen_preferences(db, opened_classes)
-    dosen_cache = {dosen.pegawai_id: dosen for dosen in lecturers}
-    recess_times = identify_recess_times(timeslot_cache)
-
-    # ------------------------- GA Phase -------------------------
-    population = initialize_population(
-        opened_classes, rooms, timeslots, population_size,
-        opened_class_cache, recess_times, preferences_cache, dosen_cache
-    )
-    
-  
     best_solution_overall = None
     best_fitness_overall = float('inf')
-    
-    # loop tiap generasi
-    for gen in range(generations):
-        # seleksi disini make roulette
-        selected_pop = roulette_wheel_selection(
-            population, opened_class_cache, room_cache, timeslot_cache,
-            preferences_cache, dosen_cache, penalties
-        )
-        new_population = []
-        # crossover disini. jadi pasangan yang dipilih dari seleksi akan di crossover disini
-        for i in range(0, len(selected_pop), 2):
-            if i + 1 < len(selected_pop):
-                child1, child2 = crossover(selected_pop[i], selected_pop[i+1])
-                new_population.extend([child1, child2])
-            else:
-                new_population.append(selected_pop[i])
-                
-            # mutasi disni. acak 1 gen aja dari hasil crossover make probabilitas
-        mutated_population = []
-        
-        # 1 indiv tuh satu jadwal, bukan 1 entri 
-        for indiv in new_population:
-            mutated_indiv = mutate(
-                indiv, opened_classes, rooms, timeslots,
-                opened_class_cache, recess_times, preferences_cache, mutation_prob
+    if resume:
+        # lanjut dari checkpoint fase GA: populasi, best dan RNG persis seperti waktu disimpan
+        population = resume["population"]
+        first_gen = resume["generation"]
+        best_solution_overall = resume["best_solution"]
+        best_fitness_overall = resume["best_fitness"]
+        rng.setstate(resume["rng_state"])
+    else:
+        population = initialize_population(problem, population_size, rng)
+        first_gen = 0
+    # tiap kromosom unik cukup dinilai sekali sepanjang fase GA
+    with population_evaluator(problem, penalties, workers) as batch_evaluator:
+        fitness_cache = FitnessCache(problem, penalties, batch_evaluator=batch_evaluator)
+
+        # loop tiap generasi
+        for gen in range(first_gen, generations):
+            population = evolve_generation(population, problem, fitness_cache, mutation_prob, rng)
+
+            # satu generasi dinilai sekaligus (NumPy), sisanya ambil dari cache
+            scores = fitness_cache.score_population(population)
+            best_idx = min(range(len(population)), key=scores.__getitem__)
+            best_solution_gen = population[best_idx]
+            best_fitness_gen = scores[best_idx]
+            logger.info(f"GA Generation {gen+1}: Best fitness = {best_fitness_gen}")
+
+            # ganti paling baru kalo ketemu yang bagusan
+            if best_fitness_gen < best_fitness_overall:
+                best_solution_overall = best_solution_gen
+                best_fitness_overall = best_fitness_gen
+            progress.update(
+                phase="ga", generation=gen + 1, best_fitness=best_fitness_overall, current_fitness=best_fitness_gen,
+                evaluations=(gen + 1) * population_size,
+                constraints=lambda: fitness_components(best_solution_overall, problem, penalties),
             )
-            mutated_population.append(mutated_indiv)
-        population = mutated_population
 
-        best_solution_gen = min(
-            population,
-            key=lambda sol: fitness(sol, opened_class_cache, room_cache, timeslot_cache, preferences_cache, dosen_cache, penalties)
-        )
-        best_fitness_gen = fitness(
-            best_solution_gen, opened_class_cache, room_cache, timeslot_cache, preferences_cache, dosen_cache, penalties
-        )
-        logger.info(f"GA Generation {gen+1}: Best fitness = {best_fitness_gen}")
+            if best_fitness_gen == 0:
+                logger.info("Optimal GA solution found; stopping GA early.")
+                population = [best_solution_gen]
+                break
 
-        # ganti paling baru kalo ketemu yang bagusan
-        if best_fitness_gen < best_fitness_overall:
-            best_solution_overall = best_solution_gen
-            best_fitness_overall = best_fitness_gen
+            if deadline.expired():
+                logger.info(f"Budget waktu GA habis di generasi {gen+1}")
+                break
 
-        if best_fitness_gen == 0:
-            logger.info("Optimal GA solution found; stopping GA early.")
-            population = [best_solution_gen]
-            break
+            if checkpointer.due():
+                checkpointer.save(
+                    phase="ga", generation=gen + 1, population=population,
+                    best_solution=best_solution_overall, best_fitness=best_fitness_overall,
+                    rng_state=rng.getstate(),
+                )
 
-    # kalo ga ketemu yang bener2 paling bagus. ambil aja yang paling  kecil
-    if best_solution_overall is None:
-        best_solution_overall = min(
-            population,
-            key=lambda sol: fitness(sol, opened_class_cache, room_cache, timeslot_cache, preferences_cache, dosen_cache, penalties)
-        )
-        best_fitness_overall = fitness(
-            best_solution_overall, opened_class_cache, room_cache, timeslot_cache, preferences_cache, dosen_cache, penalties
-        )
-    logger.info(f"GA fase berhasil dengan fitness = {best_fitness_overall}")
+        # kalo ga ketemu yang bener2 paling bagus. ambil aja yang paling  kecil
+        if best_solution_overall is None:
+            best_solution_overall = min(population, key=fitness_cache)
+            best_fitness_overall = fitness_cache(best_solution_overall)
+
+        # kandidat start buat SA multi-replika
+        elite_pool = [best_solution_overall]
+        if elite > 1:
+            elite_pool = elite_solutions(
+                [(best_solution_overall, best_fitness_overall)]
+                + list(zip(population, fitness_cache.score_population(population))),
+                elite,
+            )
+    return best_solution_overall, best_fitness_overall, {"fitness_cache": fitness_cache.stats(), "elite": elite_pool}
 
-    
-    best_solution_ga = best_solution_overall
-    
-    # ------------------------- SA Phase -------------------------
-    current_solution = best_solution_ga
-    current_fitness = fitness(current_solution, opened_class_cache, room_cache, timeslot_cache, preferences_cache, dosen_cache, penalties)
-    temperature = initial_temperature
-    best_solution_sa = current_solution
+def sa_phase(
+    problem: CompiledProblem, penalties, initial_solution, schedule: CoolingSchedule, iterations_per_temp,
+    progress=NULL_PROGRESS, checkpointer=NO_CHECKPOINT, resume=None, movable=None, rng=random
+):
+    # state okupansi disimpan di evaluator, tiap move cuma hitung delta-nya
+    evaluator = IncrementalEvaluator(problem, penalties, initial_solution)
+    current_fitness = evaluator.score
+    best_solution_sa = evaluator.solution.copy()
     best_fitness_sa = current_fitness
 
     iteration = 0
-    # Lanjutkan selama temperatur > 1
-    while temperature > 1:
+    if resume and resume.get("current_solution") is not None:
+        # lanjut dari checkpoint di tengah pendinginan
+        evaluator = IncrementalEvaluator(problem, penalties, resume["current_solution"])
+        current_fitness = evaluator.score
+        best_solution_sa = resume["best_solution"]
+        best_fitness_sa = resume["best_fitness"]
+        schedule.restore(resume, best_fitness_sa)
+        iteration = resume["iteration"]
+    # Lanjutkan selama temperatur > 1 (atau sampai jadwal adaptif berhenti)
+    while schedule.active:
         iteration += 1
+        temperature = schedule.temperature
+        accepted = attempted = 0
         for i in range(iterations_per_temp):
-            # Generate neighbor solution
-            new_solution = generate_neighbor_solution(current_solution, opened_classes, rooms, timeslots, opened_class_cache, recess_times)
-            new_fitness = fitness(new_solution, opened_class_cache, room_cache, timeslot_cache, preferences_cache, dosen_cache, penalties)
-            
+            # Generate neighbor move
+            move = neighbor_move(evaluator.solution, problem, movable, rng)
+            if move is None:
+                continue
+            attempted += 1
+            idx, new_room, new_start = move
+            _, old_room, old_start = evaluator.solution[idx]
+            delta_fitness = evaluator.move(idx, new_room, new_start)
+            new_fitness = evaluator.score
+
             # Update best solution jika lebih bagus
             if new_fitness < best_fitness_sa:
-                best_solution_sa = new_solution.copy()
+                best_solution_sa = evaluator.solution.copy()
                 best_fitness_sa = new_fitness
                 logger.info(f"Iterasi SA {iteration}.{i}: Best fitness terbaru = {new_fitness}")
-                
+
                 if best_fitness_sa == 0:
-                    temperature = 0
                     break
-            
-            delta_fitness = new_fitness - current_fitness
+
             acceptance_probability = math.exp(-delta_fitness / temperature) if delta_fitness > 0 else 1.0
-            
-            if delta_fitness <= 0 or random.random() < acceptance_probability:
-                current_solution = new_solution.copy()
+
+            if delta_fitness <= 0 or rng.random() < acceptance_probability:
                 current_fitness = new_fitness
-                
+                accepted += 1
+            else:
+                # tolak move, balikin gen ke posisi lama
+                evaluator.move(idx, old_room, old_start)
+
         if best_fitness_sa == 0:
             break
-            
-        temperature *= cooling_rate
-        logger.info(f"SA Cooling: Temperature now = {temperature:.2f}")
+
+        schedule.step(accepted, attempted, best_fitness_sa)
+        if schedule.stopped == "deadline":
+            logger.info(f"Budget waktu SA habis di level {iteration}, ambil best sejauh ini")
+            break
+        if schedule.stopped == "plateau":
+            logger.info(f"SA berhenti di level {iteration}: best fitness tidak membaik {schedule.stale} level")
+            break
+        logger.info(f"SA Cooling: Temperature now = {schedule.temperature:.2f}")
+        progress.update(
+            phase="sa", iteration=iteration, temperature=schedule.temperature,
+            best_fitness=best_fitness_sa, current_fitness=current_fitness, cooling_rate=schedule.cooling_rate,
+            acceptance_rate=round(accepted / attempted, 4) if attempted else 0.0, reheats=schedule.reheats,
+            evaluations=iteration * iterations_per_temp,
+            constraints=lambda: fitness_components(best_solution_sa, problem, penalties),
+        )
+
+        if checkpointer.due():
+            checkpointer.save(
+                phase="sa", iteration=iteration, **schedule.state(),
+                current_solution=evaluator.solution, best_solution=best_solution_sa,
+                best_fitness=best_fitness_sa, rng_state=rng.getstate(),
+            )
+
+    return best_solution_sa, best_fitness_sa
+
+def hybrid_schedule(
+    penalties,
+    db: Session,
+    population_size: int = 50,
+    generations: int = 50,
+    mutation_prob: float = 0.1,
+    initial_temperature: float = 1000,
+    cooling_rate: float = 0.95,
+    iterations_per_temp: int = 100,
+    workers: int = 1,
+    islands: int = 1,
+    migration_interval: int = 10,
+    migrants: int = 2,
+    sa_mode: str = "single",
+    replicas: int = 4,
+    swap_interval: int = 100,
+    cooling: str = "geometric",
+    target_acceptance: float = TARGET_ACCEPTANCE,
+    reheat_after: int = REHEAT_AFTER,
+    stop_after: int = STOP_AFTER,
+    time_budget_seconds: Optional[float] = None,
+    ga_budget_share: float = GA_BUDGET_SHARE,
+    checkpoint_interval: Optional[float] = None,
+    run_id: Optional[str] = None,
+    seed: Optional[int] = None,
+    resume: bool = False,
+    progress: ProgressReporter = NULL_PROGRESS,
+):
+    # parameter run ikut ditulis ke checkpoint, resume jalan lagi dengan setelan yang sama
+    run_params = {key: value for key, value in locals().items() if key not in ("db", "resume", "progress")}
+    rng, seed = make_rng(seed)
+    run_params["seed"] = seed
+    if sa_mode not in SA_MODES:
+        raise ValueError(f"sa_mode harus salah satu dari {SA_MODES}")
+    if cooling not in COOLING_MODES:
+        raise ValueError(f"cooling harus salah satu dari {COOLING_MODES}")
+    if not 0 < ga_budget_share < 1:
+        raise ValueError("ga_budget_share harus di antara 0 dan 1")
+    start_time = datetime.now()
+    # budget dihitung dari awal run (termasuk load data); tanpa budget = jalan sesuai parameter
+    budget = Deadline(time_budget_seconds)
+    # checkpoint dibaca duluan: kalau ga ada, langsung gagal sebelum load data
+    resume_state = load_checkpoint(run_id) if resume else None
+
+    logger.info("Hybrid GA-SA scheduling dimulai...")
+    snapshot = load_problem_snapshot(db)
+    opened_class_cache, room_cache, timeslot_cache = snapshot.opened_class_cache, snapshot.room_cache, snapshot.timeslot_cache
+    problem = snapshot.problem(identify_recess_times)
+    if resume_state and resume_state["fingerprint"] != problem_fingerprint(problem):
+        raise ValueError("Data kelas/ruangan/timeslot sudah berubah sejak checkpoint, run tidak bisa dilanjutkan")
+
+    checkpointer = NO_CHECKPOINT
+    if checkpoint_interval is not None:
+        if run_id is None:
+            run_id = run_params["run_id"] = uuid.uuid4().hex
+        checkpointer = Checkpointer(run_id, checkpoint_interval, problem, run_params)
+    if resume_state:
+        logger.info(f"Lanjut dari checkpoint {run_id} (fase {resume_state['phase']})")
+
+    # ------------------------- GA Phase -------------------------
+    elite = 1 if sa_mode == "single" else replicas
+    setup_seconds = budget.elapsed()
+    ga_deadline = budget.split(ga_budget_share)
+    if resume_state and resume_state["phase"] == "sa":
+        # GA sudah selesai sebelum checkpoint, langsung ambil hasilnya
+        best_solution_overall = resume_state["best_solution"]
+        best_fitness_overall = resume_state["best_fitness"]
+        ga_report = {**resume_state["ga_report"], "elite": resume_state["elite"]}
+    elif islands > 1:
+        # model pulau: tiap pulau jalan di prosesnya sendiri, migrasi lewat ring
+        best_solution_overall, best_fitness_overall, ga_report = island_ga(
+            problem, penalties, initialize_population, evolve_generation,
+            islands=islands,
+            population_size=population_size,
+            generations=generations,
+            mutation_prob=mutation_prob,
+            migration_interval=migration_interval,
+            migrants=migrants,
+            elite=elite,
+            progress=progress,
+            deadline=ga_deadline,
+            checkpointer=checkpointer,
+            resume=resume_state,
+            rng=rng,
+        )
+    else:
+        best_solution_overall, best_fitness_overall, ga_report = ga_phase(
+            problem, penalties, population_size, generations, mutation_prob, workers, elite, progress, ga_deadline,
+            checkpointer, resume_state, rng,
+        )
+    ga_seconds = ga_deadline.elapsed()
+    logger.info(f"GA fase berhasil dengan fitness = {best_fitness_overall} (cache {ga_report['fitness_cache']})")
+
+
+    best_solution_ga = best_solution_overall
+
+    # hasil GA dibawa di semua checkpoint fase SA
+    checkpointer.carry = {
+        "ga_report": {"fitness_cache": ga_report["fitness_cache"], "islands": ga_report.get("islands")},
+        "elite": ga_report["elite"],
+    }
+    if resume_state and resume_state["phase"] == "sa":
+        rng.setstate(resume_state["rng_state"])
+    else:
+        resume_state = None
+        if checkpointer.enabled:
+            checkpointer.save(
+                phase="sa", best_solution=best_solution_ga, best_fitness=best_fitness_overall,
+                rng_state=rng.getstate(),
+            )
+
+    # ------------------------- SA Phase -------------------------
+    # sisa budget GA yang ga kepake otomatis jadi jatah SA
+    sa_deadline = budget.split(1)
+    sa_report = None
+    # jadwal pendinginan single/multistart; tempering pakai tangga temperatur tetap
+    schedule = CoolingSchedule(
+        initial_temperature, cooling_rate, sa_deadline, cooling,
+        target_acceptance=target_acceptance, reheat_after=reheat_after, stop_after=stop_after,
+    )
+    if sa_mode == "tempering":
+        best_solution_sa, best_fitness_sa, sa_report = parallel_tempering(
+            problem, penalties, neighbor_move, ga_report["elite"],
+            replicas=replicas,
+            initial_temperature=initial_temperature,
+            cooling_rate=cooling_rate,
+            iterations_per_temp=iterations_per_temp,
+            swap_interval=swap_interval,
+            progress=progress,
+            deadline=sa_deadline,
+            rng=rng,
+        )
+    elif sa_mode == "multistart":
+        # tiap chain mulai dari salah satu top-K individu GA
+        best_solution_sa, best_fitness_sa, sa_report = multi_start(
+            problem, penalties, neighbor_move, ga_report["elite"],
+            replicas=replicas,
+            schedule=schedule,
+            iterations_per_temp=iterations_per_temp,
+            progress=progress,
+            rng=rng,
+        )
+    else:
+        best_solution_sa, best_fitness_sa = sa_phase(
+            problem, penalties, best_solution_ga, schedule, iterations_per_temp, progress,
+            checkpointer, resume_state, rng=rng,
+        )
+    sa_seconds = sa_deadline.elapsed()
+
+    # skor final dihitung ulang penuh biar angka yang dilaporkan persis
+    best_fitness_sa = fitness(best_solution_sa, problem, penalties)
 
     # ------------------------- Finalize -------------------------
-    formatted_solution = format_solution_for_db(db, best_solution_sa, opened_class_cache, room_cache, timeslot_cache)
-    insert_timetable(db, formatted_solution, opened_class_cache, room_cache, timeslot_cache)
-    
+    progress.update(phase="finalize", best_fitness=best_fitness_sa)
+    final_solution = decode_solution(problem, best_solution_sa)
+    formatted_solution = format_solution_for_db(db, final_solution, opened_class_cache, room_cache, timeslot_cache, problem)
+    persistence = insert_timetable(db, formatted_solution, opened_class_cache, room_cache, timeslot_cache)
+    # run sudah selesai dan tersimpan, checkpoint-nya ga perlu lagi
+    checkpointer.clear()
+
     total_time = datetime.now() - start_time
     logger.info(f"Hybrid GA-SA scheduling completed with final best fitness = {best_fitness_sa}. Total computation time: {total_time}")
-        
+
     constraint_breakdown = {
         "total_fitness": best_fitness_sa
     }
-    
+
+    time_budget = None
+    if budget.limited:
+        time_budget = {
+            "seconds": time_budget_seconds,
+            "used": round(budget.elapsed(), 3),
+            "setup": {"used": round(setup_seconds, 3)},
+            "ga": {"budget": round(ga_deadline.seconds, 3), "used": round(ga_seconds, 3)},
+            "sa": {"budget": round(sa_deadline.seconds, 3), "used": round(sa_seconds, 3)},
+            "finalize": {"used": round(budget.elapsed() - setup_seconds - ga_seconds - sa_seconds, 3)},
+        }
+
     return {
         # "timetable": formatted_solution,
         "computation_time": str(total_time),
-        "fitness_details": constraint_breakdown
+        "fitness_details": constraint_breakdown,
+        "fitness_cache": ga_report["fitness_cache"],
+        "islands": ga_report.get("islands"),
+        "sa_replicas": sa_report,
+        "cooling": schedule.report() if sa_mode == "single" else None,
+        "time_budget": time_budget,
+        "run_id": run_id,
+        "checkpoints": checkpointer.saved,
+        "persistence": persistence,
+        "seed": seed,
     }
 
 
 
-# =============================================================================
-#                        HYBRID GA-SA ENDPOINT
-# =============================================================================
+def incremental_schedule(
+    penalties,
+    db: Session,
+    initial_temperature: float = 100,
+    cooling_rate: float = 0.95,
+    iterations_per_temp: int = 100,
+    time_budget_seconds: Optional[float] = None,
+    seed: Optional[int] = None,
+    progress: ProgressReporter = NULL_PROGRESS,
+):
+    """
+    Re-optimasi inkremental: mulai dari timetable yang sudah ada, kelas yang
+    posisinya masih sah dan bebas pelanggaran dipin, sisanya (kelas baru /
+    berubah / yang sekarang bentrok) digeser SA saja tanpa fase GA.
+    """
+    start_time = datetime.now()
+    budget = Deadline(time_budget_seconds)
+    rng, seed = make_rng(seed)
+
+    logger.info("Re-optimasi inkremental dimulai...")
+    snapshot = load_problem_snapshot(db)
+    opened_class_cache, room_cache, timeslot_cache = snapshot.opened_class_cache, snapshot.room_cache, snapshot.timeslot_cache
+    problem = snapshot.problem(identify_recess_times)
+
+    rows = db.query(TimeTable).order_by(TimeTable.id).all()
+    if not rows:
+        raise ValueError("Belum ada jadwal untuk warm-start, generate penuh dulu")
+    solution, movable, report = warm_start(
+        problem, penalties, [(row.opened_class_id, row.ruangan_id, row.timeslot_ids) for row in rows]
+    )
+    start_fitness = fitness(solution, problem, penalties)
+    logger.info(f"Warm-start: {report}, fitness awal = {start_fitness}")
+
+    best_solution = solution
+    if movable and start_fitness > 0:
+        schedule = CoolingSchedule(initial_temperature, cooling_rate, budget)
+        best_solution, _ = sa_phase(
+            problem, penalties, solution, schedule, iterations_per_temp,
+            progress=progress, movable=movable, rng=rng,
+        )
+    best_fitness = fitness(best_solution, problem, penalties)
 
-@router.post("/generate-schedule-hybrid")
-async def generate_schedule_hybrid(
-    db: Session = Depends(get_db),
+    progress.update(phase="finalize", best_fitness=best_fitness)
+    final_solution = decode_solution(problem, best_solution)
+    formatted_solution = format_solution_for_db(db, final_solution, opened_class_cache, room_cache, timeslot_cache, problem)
+    report.update(update_timetable(db, rows, formatted_solution, opened_class_cache, room_cache, timeslot_cache))
+
+    total_time = datetime.now() - start_time
+    logger.info(f"Re-optimasi inkremental selesai: fitness {start_fitness} -> {best_fitness} ({total_time})")
+    return {
+        "computation_time": str(total_time),
+        "fitness_details": {"total_fitness": best_fitness, "start_fitness": start_fitness},
+        "incremental": report,
+        "seed": seed,
+    }
+
+
+def solve_cluster(
+    problem: CompiledProblem, penalties, rng, population_size, generations, mutation_prob,
+    initial_temperature, cooling_rate, iterations_per_temp, ga_budget_share, deadline=NO_DEADLINE,
+):
+    """GA lalu SA untuk satu cluster (dipanggil `decomposed_solve`, bisa di proses worker)."""
+    best_solution, _, _ = ga_phase(
+        problem, penalties, population_size, generations, mutation_prob,
+        deadline=deadline.split(ga_budget_share), rng=rng,
+    )
+    schedule = CoolingSchedule(initial_temperature, cooling_rate, deadline.split(1))
+    return sa_phase(problem, penalties, best_solution, schedule, iterations_per_temp, rng=rng)
+
+
+def decomposed_schedule(
+    penalties,
+    db: Session,
     population_size: int = 50,
     generations: int = 50,
-    mutation_prob: float = 0.10,
+    mutation_prob: float = 0.1,
     initial_temperature: float = 1000,
     cooling_rate: float = 0.95,
     iterations_per_temp: int = 100,
-    # PENALTI
+    workers: int = 1,
+    coupling_threshold: float = COUPLING_THRESHOLD,
+    repair_temperature: float = 100,
+    time_budget_seconds: Optional[float] = None,
+    ga_budget_share: float = GA_BUDGET_SHARE,
+    seed: Optional[int] = None,
+    progress: ProgressReporter = NULL_PROGRESS,
+):
+    """
+    Hybrid GA-SA per cluster (program studi, digabung kalau banyak berbagi
+    dosen), tiap cluster di prosesnya sendiri dengan jatah ruangan sendiri.
+    Hasilnya digabung, lalu kelas yang bentrok setelah digabung diperbaiki
+    SA singkat (cuma kelas itu yang digeser). Waktu solve ikut ukuran cluster
+    terbesar, bukan ukuran seluruh fakultas.
+    """
+    start_time = datetime.now()
+    budget = Deadline(time_budget_seconds)
+    rng, seed = make_rng(seed)
+
+    logger.info("Hybrid GA-SA decomposed dimulai...")
+    snapshot = load_problem_snapshot(db)
+    opened_class_cache, room_cache, timeslot_cache = snapshot.opened_class_cache, snapshot.room_cache, snapshot.timeslot_cache
+    problem = snapshot.problem(identify_recess_times)
+    solve = partial(
+        solve_cluster,
+        population_size=population_size,
+        generations=generations,
+        mutation_prob=mutation_prob,
+        initial_temperature=initial_temperature,
+        cooling_rate=cooling_rate,
+        iterations_per_temp=iterations_per_temp,
+        ga_budget_share=ga_budget_share,
+        deadline=budget.split(1 - REPAIR_BUDGET_SHARE),
+    )
+    solution, movable, report = decomposed_solve(
+        problem, penalties, solve, processes=workers, threshold=coupling_threshold, progress=progress, rng=rng,
+    )
+    logger.info(f"Decomposed: {len(report['clusters'])} cluster, fitness gabungan {report['merged_fitness']} -> {report['greedy_fitness']} setelah greedy")
+
+    best_solution = solution
+    if movable:
+        schedule = CoolingSchedule(repair_temperature, cooling_rate, budget.split(1))
+        best_solution, _ = sa_phase(
+            problem, penalties, solution, schedule, iterations_per_temp,
+            progress=progress, movable=movable, rng=rng,
+        )
+    best_fitness = fitness(best_solution, problem, penalties)
+
+    progress.update(phase="finalize", best_fitness=best_fitness)
+    final_solution = decode_solution(problem, best_solution)
+    formatted_solution = format_solution_for_db(db, final_solution, opened_class_cache, room_cache, timeslot_cache, problem)
+    persistence = insert_timetable(db, formatted_solution, opened_class_cache, room_cache, timeslot_cache, "hybrid-decomposed")
+
+    total_time = datetime.now() - start_time
+    logger.info(f"Hybrid GA-SA decomposed selesai dengan fitness {best_fitness} ({total_time})")
+    return {
+        "computation_time": str(total_time),
+        "fitness_details": {"total_fitness": best_fitness},
+        "decomposition": report,
+        "persistence": persistence,
+        "seed": seed,
+    }
+
+
+# =============================================================================
+#                        HYBRID GA-SA ENDPOINT
+# =============================================================================
+
+def hybrid_response(message, best_timetable):
+    return {
+        "message": message,
+        "computation_time": best_timetable["computation_time"],
+        "final_fitness": best_timetable["fitness_details"],
+        "fitness_cache": best_timetable["fitness_cache"],
+        "islands": best_timetable["islands"],
+        "sa_replicas": best_timetable["sa_replicas"],
+        "cooling": best_timetable["cooling"],
+        "time_budget": best_timetable["time_budget"],
+        "run_id": best_timetable["run_id"],
+        "checkpoints": best_timetable["checkpoints"],
+        "persistence": best_timetable["persistence"],
+        "seed": best_timetable["seed"],
+    }
+
+
+def penalty_params(
     room_conflict: int = Query(2, description="penalti Ruangan bentrok"),
     lecturer_conflict: int = Query(2, description="penalti dosen bentrok"),
     cross_day: int = Query(1, description="Penalti untuk penjadwalan lintas hari"),
@@ -773,43 +809,172 @@ async def generate_schedule_hybrid(
     high_priority_preference: int = Query(2, description="Penalti untuk kehilangan preferensi prioritas tinggi"),
     general_preference: int = Query(1, description="Penalti untuk kehilangan preferensi umum"),
     jabatan: int = Query(2, description="Penalti untuk pelanggaran batasan jabatan"),
-    conflict_multiplier: int = Query(100, description="Multiplier untuk penalti konflik")
+    conflict_multiplier: int = Query(100, description="Multiplier untuk penalti konflik"),
+):
+    """Dependency query penalti; dipakai bareng endpoint hybrid dan tabu supaya bobotnya sama."""
+    return {
+        "room_conflict": room_conflict,
+        "lecturer_conflict": lecturer_conflict,
+        "cross_day": cross_day,
+        "invalid_timeslot": invalid_timeslot,
+        "wrong_room": wrong_room,
+        "special_needs": special_needs,
+        "daily_load": daily_load,
+        "high_priority_preference": high_priority_preference,
+        "general_preference": general_preference,
+        "jabatan": jabatan,
+        "conflict_multiplier": conflict_multiplier
+    }
+
+
+@router.post("/generate-schedule-hybrid")
+def generate_schedule_hybrid(
+    db: Session = Depends(get_db),
+    population_size: int = 50,
+    generations: int = 50,
+    mutation_prob: float = 0.10,
+    initial_temperature: float = 1000,
+    cooling_rate: float = 0.95,
+    iterations_per_temp: int = 100,
+    workers: int = Query(1, ge=1, description="Jumlah proses untuk evaluasi fitness GA"),
+    islands: int = Query(1, ge=1, description="Jumlah pulau GA (proses terpisah); 1 = GA biasa"),
+    migration_interval: int = Query(10, ge=1, description="Migrasi antar pulau tiap M generasi"),
+    migrants: int = Query(2, ge=0, description="Jumlah individu terbaik yang dikirim ke pulau berikutnya"),
+    sa_mode: str = Query("single", description="Mode fase SA: single | tempering | multistart"),
+    replicas: int = Query(4, ge=1, description="Jumlah replika SA (mode tempering/multistart)"),
+    swap_interval: int = Query(100, ge=1, description="Tukar state antar replika tiap N langkah (mode tempering)"),
+    cooling: str = Query("geometric", description="Jadwal pendinginan SA (mode single/multistart): geometric | adaptive"),
+    target_acceptance: float = Query(TARGET_ACCEPTANCE, gt=0, lt=1, description="Target acceptance ratio per level (cooling adaptive)"),
+    reheat_after: int = Query(REHEAT_AFTER, ge=1, description="Reheat setelah N level tanpa best baru (cooling adaptive)"),
+    stop_after: int = Query(STOP_AFTER, ge=1, description="Berhenti setelah N level tanpa best baru (cooling adaptive)"),
+    time_budget_seconds: Optional[float] = Query(None, gt=0, description="Batas waktu total run (detik); SA menyesuaikan cooling rate ke sisa waktu"),
+    ga_budget_share: float = Query(GA_BUDGET_SHARE, gt=0, lt=1, description="Porsi budget waktu untuk fase GA"),
+    checkpoint_interval: Optional[float] = Query(None, gt=0, description="Simpan checkpoint paling sering tiap N detik (kosong = tanpa checkpoint)"),
+    incremental: bool = Query(False, description="Warm-start dari timetable sekarang, cuma kelas yang berubah/bentrok yang dioptimasi ulang (SA saja)"),
+    decomposed: bool = Query(False, description="Solve per cluster program studi secara paralel (pakai `workers` proses), lalu digabung + repair"),
+    coupling_threshold: float = Query(COUPLING_THRESHOLD, ge=0, le=1, description="Gabung dua cluster kalau porsi konflik dosen di antaranya >= nilai ini (mode decomposed)"),
+    seed: Optional[int] = Query(None, ge=0, description="Seed RNG; run dengan seed + parameter sama hasilnya sama persis"),
+    # PENALTI (query param-nya di penalty_params)
+    penalties: Dict = Depends(penalty_params),
+    background: bool = Query(False, description="Jalankan sebagai background job, langsung return job_id")
 ):
     try:
-        penalties = {
-            "room_conflict": room_conflict,
-            "lecturer_conflict": lecturer_conflict,
-            "cross_day": cross_day,
-            "invalid_timeslot": invalid_timeslot,
-            "wrong_room": wrong_room,
-            "special_needs": special_needs,
-            "daily_load": daily_load,
-            "high_priority_preference": high_priority_preference,
-            "general_preference": general_preference,
-            "jabatan": jabatan,
-            "conflict_multiplier": conflict_multiplier
-        }
+        if incremental:
+            params = dict(
+                initial_temperature=initial_temperature,
+                cooling_rate=cooling_rate,
+                iterations_per_temp=iterations_per_temp,
+                time_budget_seconds=time_budget_seconds,
+                seed=seed,
+                penalties=penalties
+            )
+            if background:
+                job_id = job_manager.submit("hybrid-incremental", incremental_schedule, params)
+                return {"message": "Re-optimasi inkremental masuk antrian", "job_id": job_id}
+
+            result = incremental_schedule(db=db, **params)
+            return {
+                "message": "Schedule berhasil diperbarui secara inkremental",
+                "computation_time": result["computation_time"],
+                "final_fitness": result["fitness_details"],
+                "incremental": result["incremental"],
+                "seed": result["seed"],
+            }
 
-        best_timetable = hybrid_schedule(
-            db=db,
+        if decomposed:
+            params = dict(
+                population_size=population_size,
+                generations=generations,
+                mutation_prob=mutation_prob,
+                initial_temperature=initial_temperature,
+                cooling_rate=cooling_rate,
+                iterations_per_temp=iterations_per_temp,
+                workers=workers,
+                coupling_threshold=coupling_threshold,
+                time_budget_seconds=time_budget_seconds,
+                ga_budget_share=ga_budget_share,
+                seed=seed,
+                penalties=penalties
+            )
+            if background:
+                job_id = job_manager.submit("hybrid-decomposed", decomposed_schedule, params)
+                return {"message": "Hybrid GA-SA decomposed masuk antrian", "job_id": job_id}
+
+            result = decomposed_schedule(db=db, **params)
+            return {
+                "message": "Schedule berhasil digenerate menggunakan Hybrid GA-SA per cluster",
+                "computation_time": result["computation_time"],
+                "final_fitness": result["fitness_details"],
+                "decomposition": result["decomposition"],
+                "persistence": result["persistence"],
+                "seed": result["seed"],
+            }
+
+        params = dict(
             population_size=population_size,
             generations=generations,
             mutation_prob=mutation_prob,
             initial_temperature=initial_temperature,
             cooling_rate=cooling_rate,
             iterations_per_temp=iterations_per_temp,
+            workers=workers,
+            islands=islands,
+            migration_interval=migration_interval,
+            migrants=migrants,
+            sa_mode=sa_mode,
+            replicas=replicas,
+            swap_interval=swap_interval,
+            cooling=cooling,
+            target_acceptance=target_acceptance,
+            reheat_after=reheat_after,
+            stop_after=stop_after,
+            time_budget_seconds=time_budget_seconds,
+            ga_budget_share=ga_budget_share,
+            checkpoint_interval=checkpoint_interval,
+            # run_id dibuat di sini supaya caller sudah tahu id buat resume walau run-nya mati
+            run_id=uuid.uuid4().hex if checkpoint_interval else None,
+            seed=seed,
             penalties=penalties
         )
+        if background:
+            job_id = job_manager.submit("hybrid", hybrid_schedule, params)
+            return {"message": "Hybrid GA-SA masuk antrian", "job_id": job_id, "run_id": params["run_id"]}
+
+        best_timetable = hybrid_schedule(db=db, **params)
        
-        return {
-            "message": "Schedule berhasil digenerate menggunakan Hybrid GA-SA",
-            "computation_time": best_timetable["computation_time"],
-            "final_fitness": best_timetable["fitness_details"]
-        }
+        return hybrid_response("Schedule berhasil digenerate menggunakan Hybrid GA-SA", best_timetable)
     except Exception as e:
         logger.error(f"Error Hybrid GA-SA: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@router.post("/resume/{run_id}")
+def resume_schedule_hybrid(
+    run_id: str,
+    db: Session = Depends(get_db),
+    background: bool = Query(False, description="Jalankan sebagai background job, langsung return job_id")
+):
+    """Lanjutkan run hybrid dari checkpoint terakhirnya, dengan parameter run yang sama."""
+    try:
+        params = load_checkpoint(run_id)["params"]
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Checkpoint tidak ditemukan")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    params = {**params, "run_id": run_id, "resume": True}
+
+    try:
+        if background:
+            job_id = job_manager.submit("hybrid", hybrid_schedule, params)
+            return {"message": "Resume Hybrid GA-SA masuk antrian", "job_id": job_id, "run_id": run_id}
+
+        best_timetable = hybrid_schedule(db=db, **params)
+        return hybrid_response("Schedule berhasil dilanjutkan dari checkpoint", best_timetable)
+    except Exception as e:
+        logger.error(f"Error resume Hybrid GA-SA: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # # import matplotlib.pyplot as plt
 # import numpy as np
 # import random
@@ -1037,15 +1202,10 @@ async def generate_schedule_hybrid(
 #         logger.error(f"Error generating schedule with Hybrid GA-SA tracking: {e}")
 #         raise HTTPException(status_code=500, detail=str(e))
 
-def raw_fitness(solution, opened_class_cache, room_cache, timeslot_cache, preferences_cache, dosen_cache, penalties):
-    conflict_score = check_conflicts(solution, opened_class_cache, room_cache, timeslot_cache, penalties)
-    if conflict_score > 0:
-      
-        return conflict_score
+def raw_fitness(solution, problem: CompiledProblem, penalties):
+    components = fitness_components(solution, problem, penalties)
+    if components["conflict"] > 0:
+
+        return components["conflict"]
     else:
-        room_type_score = check_room_type_compatibility(solution, opened_class_cache, room_cache, penalties)
-        special_needs_score = check_special_needs_compliance(solution, opened_class_cache, room_cache, preferences_cache, penalties)
-        daily_load_score = check_daily_load_balance(solution, opened_class_cache, timeslot_cache, penalties)
-        preference_score = check_preference_compliance(solution, opened_class_cache, timeslot_cache, preferences_cache, penalties)
-        jabatan_penalty = check_jabatan_constraint(solution, opened_class_cache, timeslot_cache, dosen_cache, penalties)
-        return room_type_score + special_needs_score + daily_load_score + preference_score + jabatan_penalty
+        return components["room_type"] + components["special_needs"] + components["daily_load"] + components["preference"] + components["jabatan"]
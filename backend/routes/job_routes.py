@@ -0,0 +1,83 @@
+import asyncio
+import json
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from utils.jobs import FINISHED_STATUSES, job_manager
+
+router = APIRouter()
+
+# seberapa sering stream SSE ngecek progress job (detik)
+EVENT_POLL_INTERVAL = 0.5
+# komentar keep-alive supaya proxy ga nutup koneksi yang lama diam
+EVENT_KEEPALIVE = 15
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def job_events(request: Request, job_id: str):
+    """
+    Stream progress job: event `progress` tiap kali progress berubah (sudah
+    di-throttle di sisi solver, dan yang di antara dua poll otomatis
+    tergabung), lalu satu event `done` berisi status akhir.
+    """
+    last_update = None
+    idle = 0.0
+    while not await request.is_disconnected():
+        job = job_manager.get(job_id, include_result=False)
+        if job is None:
+            yield sse_event("done", {"job_id": job_id, "status": "missing"})
+            return
+
+        progress = job["progress"]
+        if progress and progress.get("updated_at") != last_update:
+            last_update = progress.get("updated_at")
+            idle = 0.0
+            yield sse_event("progress", {"job_id": job_id, "status": job["status"], **progress})
+
+        if job["status"] in FINISHED_STATUSES:
+            yield sse_event("done", {"job_id": job_id, "status": job["status"], "error": job["error"]})
+            return
+
+        if idle >= EVENT_KEEPALIVE:
+            idle = 0.0
+            yield ": keep-alive\n\n"
+        await asyncio.sleep(EVENT_POLL_INTERVAL)
+        idle += EVENT_POLL_INTERVAL
+
+
+# Routes
+@router.get("/")
+async def list_jobs():
+    return job_manager.list()
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job tidak ditemukan")
+    return job
+
+
+@router.get("/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """Server-Sent Events progress job (phase, generation/iteration, temperature, fitness, evals/sec, breakdown)."""
+    if job_manager.get(job_id, include_result=False) is None:
+        raise HTTPException(status_code=404, detail="Job tidak ditemukan")
+    return StreamingResponse(
+        job_events(request, job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    status = job_manager.cancel(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job tidak ditemukan")
+    return {"job_id": job_id, "status": status}
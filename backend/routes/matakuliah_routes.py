@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from utils.snapshot import invalidate_on_write
 from sqlalchemy.orm import Session
 from database import get_db
 from typing import Any, Dict, List, Optional
@@ -6,7 +7,8 @@ from pydantic import BaseModel
 from model.matakuliah_model import MataKuliah
 from model.programstudi_model import ProgramStudi  
 
-router = APIRouter()
+# tiap request tulis bikin snapshot input solver basi
+router = APIRouter(dependencies=[Depends(invalidate_on_write)])
 
 
 class MataKuliahSimpleResponse(BaseModel):
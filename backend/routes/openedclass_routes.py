@@ -1,5 +1,6 @@
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, Query
+from utils.snapshot import invalidate_on_write
 from sqlalchemy import delete, exists, func, or_, update
 from sqlalchemy.orm import Session, joinedload
 from routes.matakuliah_routes import PaginatedMatakuliahResponse
@@ -36,7 +37,8 @@ class OpenedClassResponse(BaseModel):
     class Config:
         orm_mode = True
 
-router = APIRouter()
+# tiap request tulis bikin snapshot input solver basi
+router = APIRouter(dependencies=[Depends(invalidate_on_write)])
 
 
 
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from utils.snapshot import invalidate_on_write
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from database import get_db
@@ -7,7 +8,8 @@ from model.dosen_model import Dosen
 from model.timeslot_model import TimeSlot
 from pydantic import BaseModel, Field
 
-router = APIRouter()
+# tiap request tulis bikin snapshot input solver basi
+router = APIRouter(dependencies=[Depends(invalidate_on_write)])
 
 # Pydantic Models
 class PreferenceBase(BaseModel):
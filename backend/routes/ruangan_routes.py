@@ -1,5 +1,6 @@
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from utils.snapshot import invalidate_on_write
 from sqlalchemy.orm import Session
 from model.temporary_timetable_model import TemporaryTimeTable
 from model.timeslot_model import TimeSlot
@@ -10,7 +11,8 @@ from pydantic import BaseModel
 from typing import Dict, List, Optional
 from enum import Enum
 
-router = APIRouter()
+# tiap request tulis bikin snapshot input solver basi
+router = APIRouter(dependencies=[Depends(invalidate_on_write)])
 
 
 class GedungEnum(str, Enum):
@@ -0,0 +1,107 @@
+import logging
+
+from datetime import datetime
+from typing import Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from database import get_db
+from routes.algorithm_routes import load_problem_snapshot
+from routes.hybrid_routes import (
+    fitness, format_solution_for_db, initialize_population, insert_timetable, penalty_params,
+)
+from routes.sa_routes import identify_recess_times
+from solver.budget import Deadline
+from solver.problem import decode_solution
+from solver.progress import NULL_PROGRESS, ProgressReporter
+from solver.rng import make_rng
+from solver.tabu import TABU_CANDIDATES, TABU_TENURE, tabu_search
+from utils.jobs import job_manager
+
+router = APIRouter()
+
+logger = logging.getLogger(__name__)
+
+
+def tabu_schedule(
+    penalties,
+    db: Session,
+    max_iterations: int = 5000,
+    tenure: int = TABU_TENURE,
+    candidates: int = TABU_CANDIDATES,
+    time_budget_seconds: Optional[float] = None,
+    seed: Optional[int] = None,
+    progress: ProgressReporter = NULL_PROGRESS,
+):
+    """
+    Penjadwalan pakai tabu search: solusi awal dari `initialize_population`
+    hybrid, lalu `tabu_search` dengan penalti yang sama seperti hybrid.
+    """
+    start_time = datetime.now()
+    budget = Deadline(time_budget_seconds)
+    rng, seed = make_rng(seed)
+
+    logger.info("Tabu search scheduling dimulai...")
+    snapshot = load_problem_snapshot(db)
+    opened_class_cache, room_cache, timeslot_cache = snapshot.opened_class_cache, snapshot.room_cache, snapshot.timeslot_cache
+    problem = snapshot.problem(identify_recess_times)
+
+    initial_solution = initialize_population(problem, 1, rng)[0]
+    best_solution, _, report = tabu_search(
+        problem, penalties, initial_solution, max_iterations,
+        tenure=tenure, candidates=candidates, progress=progress, deadline=budget, rng=rng,
+    )
+    # skor final dihitung ulang penuh biar angka yang dilaporkan persis
+    best_fitness = fitness(best_solution, problem, penalties)
+
+    progress.update(phase="finalize", best_fitness=best_fitness)
+    final_solution = decode_solution(problem, best_solution)
+    formatted_solution = format_solution_for_db(db, final_solution, opened_class_cache, room_cache, timeslot_cache, problem)
+    insert_timetable(db, formatted_solution, opened_class_cache, room_cache, timeslot_cache, "tabu")
+
+    total_time = datetime.now() - start_time
+    logger.info(f"Tabu search selesai: fitness {report['start_fitness']} -> {best_fitness}, {report['iterations']} iterasi ({total_time})")
+    return {
+        "computation_time": str(total_time),
+        "fitness_details": {"total_fitness": best_fitness},
+        "tabu": report,
+        "seed": seed,
+    }
+
+
+@router.post("/generate-schedule-tabu")
+def generate_schedule_tabu(
+    db: Session = Depends(get_db),
+    max_iterations: int = Query(5000, ge=1, description="Batas jumlah iterasi tabu search"),
+    tenure: int = Query(TABU_TENURE, ge=1, description="Berapa iterasi posisi lama kelas yang dipindah jadi tabu"),
+    candidates: int = Query(TABU_CANDIDATES, ge=1, description="Jumlah kandidat move yang dinilai per iterasi"),
+    time_budget_seconds: Optional[float] = Query(None, gt=0, description="Batas waktu run (detik)"),
+    seed: Optional[int] = Query(None, ge=0, description="Seed RNG; run dengan seed + parameter sama hasilnya sama persis"),
+    penalties: Dict = Depends(penalty_params),
+    background: bool = Query(False, description="Jalankan sebagai background job, langsung return job_id"),
+):
+    try:
+        params = dict(
+            max_iterations=max_iterations,
+            tenure=tenure,
+            candidates=candidates,
+            time_budget_seconds=time_budget_seconds,
+            seed=seed,
+            penalties=penalties,
+        )
+        if background:
+            job_id = job_manager.submit("tabu", tabu_schedule, params)
+            return {"message": "Tabu search masuk antrian", "job_id": job_id}
+
+        result = tabu_schedule(db=db, **params)
+        return {
+            "message": "Schedule berhasil digenerate menggunakan Tabu Search",
+            "computation_time": result["computation_time"],
+            "final_fitness": result["fitness_details"],
+            "tabu": result["tabu"],
+            "seed": result["seed"],
+        }
+    except Exception as e:
+        logger.error(f"Error Tabu Search: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from utils.snapshot import invalidate_on_write
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import time
@@ -6,7 +7,8 @@ from database import get_db
 from model.timeslot_model import TimeSlot
 from pydantic import BaseModel, Field
 
-router = APIRouter()
+# tiap request tulis bikin snapshot input solver basi
+router = APIRouter(dependencies=[Depends(invalidate_on_write)])
 
 # Pydantic Models
 class TimeSlotBase(BaseModel):
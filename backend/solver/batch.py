@@ -0,0 +1,201 @@
+import numpy as np
+
+from solver.chromosome import Chromosome
+from solver.fitness import (
+    DEFAULT_DAILY_LOAD_THRESHOLD,
+    DEFAULT_WRONG_ROOM_TYPES,
+    check_daily_load_balance,
+    evaluate,
+)
+from solver.problem import CompiledProblem, mask_slots
+
+
+class BatchEvaluator:
+    """
+    Evaluator fitness NumPy untuk satu populasi sekaligus.
+
+    Input-nya array int shape (pop, n_gen, 2) berisi (room, start slot) per
+    gen, plus urutan kelas per posisi gen (sama untuk semua individu).
+    Okupansi ruangan/dosen per slot dihitung pakai bincount, jadi tidak ada
+    loop Python per individu. Hasilnya sama persis dengan `evaluate()`.
+    """
+
+    def __init__(self, problem: CompiledProblem, penalties):
+        self.problem = problem
+        self.penalties = penalties
+        self.n_slots = problem.n_slots
+        self.n_rooms = max(problem.n_rooms, 1)
+        self.n_lecturers = max(problem.n_lecturers, 1)
+        self.n_days = max(problem.slot_day, default=0) + 1
+
+        # span tiap (sks, start): sel slot yang ditempati, -1 kalau invalid/lintas hari
+        max_sks = max(problem.class_sks, default=1)
+        self.span_cells = np.full((max_sks + 1, self.n_slots, max_sks), -1, dtype=np.int64)
+        self.span_invalid = np.zeros((max_sks + 1, self.n_slots), dtype=np.int64)
+        self.span_cross = np.zeros((max_sks + 1, self.n_slots), dtype=np.int64)
+        for sks, spans in problem.spans.items():
+            for start, (cells, invalid, cross_day) in enumerate(spans):
+                self.span_cells[sks, start, :len(cells)] = cells
+                self.span_invalid[sks, start] = invalid
+                self.span_cross[sks, start] = cross_day
+
+        checked_types = penalties.get("wrong_room_types", DEFAULT_WRONG_ROOM_TYPES)
+        type_codes = {t: i for i, t in enumerate(sorted(set(problem.class_type) | set(problem.room_type)))}
+        self.class_sks = np.array(problem.class_sks, dtype=np.int64)
+        self.class_type = np.array([type_codes[t] for t in problem.class_type], dtype=np.int64)
+        self.class_checked = np.array([t in checked_types for t in problem.class_type], dtype=bool)
+        self.class_special = np.array(problem.class_special, dtype=np.int64)
+        self.class_jabatan = np.array(problem.class_jabatan, dtype=np.int64)
+        self.room_type = np.array([type_codes[t] for t in problem.room_type], dtype=np.int64)
+        self.room_special_ok = np.array(problem.room_special_ok, dtype=bool)
+        self.slot_day = np.array(problem.slot_day, dtype=np.int64)
+
+        # penalti preferensi per (kelas, start slot) dihitung di depan
+        self.preference = np.zeros((problem.n_classes, self.n_slots), dtype=np.int64)
+        for c in range(problem.n_classes):
+            for forbidden in problem.class_pref_high[c]:
+                for s in mask_slots(forbidden):
+                    self.preference[c, s] += penalties["high_priority_preference"]
+            for wanted in problem.class_pref_general[c]:
+                row = np.full(self.n_slots, penalties["general_preference"], dtype=np.int64)
+                row[mask_slots(wanted)] = 0
+                self.preference[c] += row
+
+        self._pairs = {}
+
+    def _lecturer_pairs(self, classes):
+        # pasangan (posisi gen, dosen) untuk urutan kelas ini
+        key = classes.tobytes()
+        if key not in self._pairs:
+            genes = []
+            lecturers = []
+            for g, c in enumerate(classes):
+                for lecturer in self.problem.class_lecturers[c]:
+                    genes.append(g)
+                    lecturers.append(lecturer)
+            self._pairs[key] = (np.array(genes, dtype=np.int64), np.array(lecturers, dtype=np.int64))
+        return self._pairs[key]
+
+    def components(self, classes, genes):
+        """Komponen penalti per individu. `genes` shape (pop, n_gen, 2)."""
+        penalties = self.penalties
+        classes = np.asarray(classes, dtype=np.int64)
+        genes = np.asarray(genes, dtype=np.int64)
+        pop = genes.shape[0]
+        rooms = genes[:, :, 0]
+        starts = genes[:, :, 1]
+        sks = self.class_sks[classes][None, :]
+        individual = np.arange(pop, dtype=np.int64)[:, None]
+
+        # ---- hard constraint ----
+        cells = self.span_cells[sks, starts]  # (pop, n_gen, max_sks)
+        valid = cells >= 0
+        conflict = (
+            self.span_invalid[sks, starts].sum(axis=1) * penalties["invalid_timeslot"]
+            + self.span_cross[sks, starts].sum(axis=1) * penalties["cross_day"]
+        )
+
+        room_key = ((individual * self.n_rooms + rooms)[:, :, None] * self.n_slots + cells)[valid]
+        room_counts = np.bincount(room_key, minlength=pop * self.n_rooms * self.n_slots)
+        room_pairs = (room_counts * (room_counts - 1) // 2).reshape(pop, -1).sum(axis=1)
+        conflict = conflict + room_pairs * penalties["room_conflict"]
+
+        pair_genes, pair_lecturers = self._lecturer_pairs(classes)
+        if len(pair_genes):
+            pair_cells = cells[:, pair_genes, :]
+            lecturer_key = (
+                (individual * self.n_lecturers + pair_lecturers[None, :])[:, :, None] * self.n_slots + pair_cells
+            )[pair_cells >= 0]
+            lecturer_counts = np.bincount(lecturer_key, minlength=pop * self.n_lecturers * self.n_slots)
+            lecturer_clashes = np.maximum(lecturer_counts - 1, 0).reshape(pop, -1).sum(axis=1)
+            conflict = conflict + lecturer_clashes * penalties["lecturer_conflict"]
+
+        # ---- soft constraint ----
+        wrong_room = (self.class_checked[classes][None, :] & (self.room_type[rooms] != self.class_type[classes][None, :]))
+        room_type = wrong_room.sum(axis=1) * penalties["wrong_room"]
+
+        special = (self.class_special[classes][None, :] * ~self.room_special_ok[rooms]).sum(axis=1) * penalties["special_needs"]
+        preference = self.preference[classes[None, :], starts].sum(axis=1)
+        monday = self.slot_day[starts] == 0
+        jabatan = (self.class_jabatan[classes][None, :] * monday).sum(axis=1) * penalties["jabatan"]
+
+        # daily load: cuma dipakai buat nandain individu yang kena penalti,
+        # nilainya dihitung ulang di Python supaya urutan penjumlahan float sama
+        daily_flag = np.zeros(pop, dtype=bool)
+        if penalties.get("daily_load") and len(pair_genes):
+            threshold = penalties.get("daily_load_threshold", DEFAULT_DAILY_LOAD_THRESHOLD)
+            pair_days = self.slot_day[starts][:, pair_genes]
+            day_key = ((individual * self.n_lecturers + pair_lecturers[None, :]) * self.n_days + pair_days).ravel()
+            day_counts = np.bincount(day_key, minlength=pop * self.n_lecturers * self.n_days)
+            day_counts = day_counts.reshape(pop, self.n_lecturers, self.n_days)
+            taught = day_counts > 0
+            n_days = taught.sum(axis=2)
+            avg = np.divide(day_counts.sum(axis=2), n_days, out=np.zeros(n_days.shape), where=n_days > 0)
+            deviation = np.abs(day_counts - avg[:, :, None])
+            daily_flag = (taught & (deviation > threshold)).any(axis=(1, 2))
+
+        return {
+            "conflict": conflict,
+            "room_type": room_type,
+            "special_needs": special,
+            "preference": preference,
+            "jabatan": jabatan,
+            "daily_flag": daily_flag,
+        }
+
+    def evaluate(self, classes, genes):
+        """Skor total per individu, urutan sama dengan `genes`."""
+        penalties = self.penalties
+        parts = self.components(classes, genes)
+        soft_on_conflict = penalties.get("soft_on_conflict", True)
+        scores = []
+        for p in range(len(parts["conflict"])):
+            conflict_score = int(parts["conflict"][p])
+            if conflict_score > 0 and not soft_on_conflict:
+                scores.append(conflict_score * penalties["conflict_multiplier"])
+                continue
+
+            daily_load = 0
+            if parts["daily_flag"][p]:
+                solution = [(c, int(r), int(s)) for c, (r, s) in zip(classes, genes[p])]
+                daily_load = check_daily_load_balance(solution, self.problem, penalties)
+            soft_score = (
+                int(parts["room_type"][p])
+                + int(parts["special_needs"][p])
+                + daily_load
+                + int(parts["preference"][p])
+                + int(parts["jabatan"][p])
+            )
+            if conflict_score > 0:
+                scores.append(conflict_score * penalties["conflict_multiplier"] + soft_score)
+            else:
+                scores.append(soft_score)
+        return scores
+
+    def evaluate_population(self, population):
+        """
+        Skor untuk list solusi (`Chromosome` atau list of (class, room, slot)).
+
+        Kalau urutan kelas antar individu beda (mis. panjang solusi beda),
+        fallback ke `evaluate()` per individu.
+        """
+        if not population:
+            return []
+        classes = population[0].classes if isinstance(population[0], Chromosome) else None
+        if classes and all(
+            isinstance(solution, Chromosome) and (solution.classes is classes or solution.classes == classes)
+            for solution in population
+        ):
+            # array ruangan/start tinggal digabung jadi satu buffer, tanpa bikin tuple per gen
+            n_gen = len(classes)
+            genes = np.empty((len(population), n_gen, 2), dtype=np.int64)
+            genes[:, :, 0] = np.frombuffer(b"".join(solution.rooms.tobytes() for solution in population), dtype=np.uint16).reshape(-1, n_gen)
+            genes[:, :, 1] = np.frombuffer(b"".join(solution.starts.tobytes() for solution in population), dtype=np.uint16).reshape(-1, n_gen)
+            return self.evaluate(np.frombuffer(classes, dtype=np.uint16), genes)
+        try:
+            stacked = np.array(population, dtype=np.int64)
+        except ValueError:
+            stacked = None
+        if stacked is None or stacked.ndim != 3 or stacked.shape[1] == 0 or not (stacked[:, :, 0] == stacked[0, :, 0]).all():
+            return [evaluate(solution, self.problem, self.penalties) for solution in population]
+        return self.evaluate(stacked[0, :, 0], stacked[:, :, 1:])
@@ -0,0 +1,56 @@
+import time
+
+# batas cooling rate adaptif, biar ga langsung anjlok / ga pernah turun
+MIN_COOLING_RATE = 0.5
+MAX_COOLING_RATE = 0.9999
+
+
+class Deadline:
+    """
+    Batas waktu wall-clock untuk satu run/phase; `seconds=None` berarti
+    tanpa batas. Pakai `time.time()` (bukan monotonic) supaya tetap berlaku
+    waktu dikirim ke proses worker.
+    """
+
+    def __init__(self, seconds=None):
+        self.seconds = seconds
+        self.started = time.time()
+        self.end = None if seconds is None else self.started + seconds
+
+    @property
+    def limited(self):
+        return self.end is not None
+
+    def elapsed(self):
+        return time.time() - self.started
+
+    def remaining(self):
+        if self.end is None:
+            return float('inf')
+        return max(0.0, self.end - time.time())
+
+    def expired(self):
+        return self.end is not None and time.time() >= self.end
+
+    def split(self, share):
+        """Deadline baru yang kebagian `share` dari sisa waktu (tanpa batas kalau ini juga tanpa batas)."""
+        if self.end is None:
+            return Deadline()
+        return Deadline(self.remaining() * share)
+
+
+NO_DEADLINE = Deadline()
+
+
+def budget_cooling_rate(temperature, level_seconds, deadline: Deadline, cooling_rate):
+    """
+    Cooling rate supaya temperatur sampai 1 pas di deadline, dihitung dari
+    rata-rata waktu per level temperatur. Tanpa deadline rate tidak diubah.
+    """
+    if not deadline.limited or level_seconds <= 0 or temperature <= 1:
+        return cooling_rate
+    levels_left = deadline.remaining() / level_seconds
+    if levels_left < 1:
+        return MIN_COOLING_RATE
+    rate = (1 / temperature) ** (1 / levels_left)
+    return min(MAX_COOLING_RATE, max(MIN_COOLING_RATE, rate))
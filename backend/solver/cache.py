@@ -0,0 +1,88 @@
+from collections import OrderedDict
+
+from solver.fitness import evaluate
+from solver.problem import CompiledProblem
+
+
+class FitnessCache:
+    """
+    Memo fitness per kromosom untuk satu run GA.
+
+    Seleksi, scan best-of-generation dan roulette sering menilai individu
+    yang sama berkali-kali; dengan cache ini tiap kromosom unik cukup
+    dihitung sekali. Key-nya `Chromosome.key()` (bytes ruangan + start),
+    dibatasi `maxsize` entri dengan eviksi LRU. Kalau `batch_evaluator`
+    diisi, `score_population` menilai semua miss satu populasi sekaligus.
+    """
+
+    def __init__(self, problem: CompiledProblem, penalties, maxsize=10000, evaluator=evaluate, batch_evaluator=None):
+        self.problem = problem
+        self.penalties = penalties
+        self.maxsize = maxsize
+        self.evaluator = evaluator
+        self.batch_evaluator = batch_evaluator
+        self.hits = 0
+        self.misses = 0
+        self._scores = OrderedDict()
+
+    def __call__(self, solution):
+        key = solution.key()
+        score = self._scores.get(key)
+        if score is not None:
+            self.hits += 1
+            self._scores.move_to_end(key)
+            return score
+
+        self.misses += 1
+        score = self.evaluator(solution, self.problem, self.penalties)
+        self._store(key, score)
+        return score
+
+    def _store(self, key, score):
+        self._scores[key] = score
+        if len(self._scores) > self.maxsize:
+            self._scores.popitem(last=False)
+
+    def score_population(self, population):
+        """Skor seluruh populasi; individu yang belum ada di cache dinilai dalam satu batch."""
+        if self.batch_evaluator is None:
+            return [self(solution) for solution in population]
+
+        keys = [solution.key() for solution in population]
+        known = {}
+        pending = {}
+        for key, solution in zip(keys, population):
+            if key in known or key in pending:
+                continue
+            score = self._scores.get(key)
+            if score is None:
+                pending[key] = solution
+            else:
+                self._scores.move_to_end(key)
+                known[key] = score
+
+        if pending:
+            scores = self.batch_evaluator.evaluate_population(list(pending.values()))
+            for key, score in zip(pending, scores):
+                known[key] = score
+                self._store(key, score)
+
+        result = []
+        for key in keys:
+            # miss pertama dihitung miss, duplikat di populasi yang sama jadi hit
+            if key in pending:
+                del pending[key]
+                self.misses += 1
+            else:
+                self.hits += 1
+            result.append(known[key])
+        return result
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "size": len(self._scores),
+        }
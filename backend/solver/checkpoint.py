@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from solver.chromosome import Chromosome
+from solver.problem import CompiledProblem
+
+CHECKPOINT_DIR = os.getenv("SOLVER_CHECKPOINT_DIR", "/tmp/solver-checkpoints")
+CHECKPOINT_VERSION = 1
+
+# field state yang disimpan sebagai array int32, sisanya masuk meta JSON
+SOLUTION_FIELDS = ("best_solution", "current_solution")
+POPULATION_FIELDS = ("population", "elite")
+# state RNG per pulau (GA model pulau), masing-masing 625 uint32
+RNG_STATE_FIELDS = ("island_rng_states",)
+
+
+def checkpoint_path(run_id, directory=CHECKPOINT_DIR):
+    # run_id dipakai sebagai nama file, jadi karakter aneh dibuang
+    safe = "".join(ch for ch in str(run_id) if ch.isalnum() or ch in "-_")
+    if not safe:
+        raise ValueError("run_id tidak valid")
+    return os.path.join(directory, f"{safe}.npz")
+
+
+def problem_fingerprint(problem: CompiledProblem):
+    """Hash susunan kelas/ruangan/slot; resume cuma sah kalau datanya masih sama."""
+    key = repr((problem.class_ids, problem.class_sks, problem.room_ids, problem.slot_ids))
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def _solutions_array(solutions):
+    # jumlah gen = len(gene_order(problem)), bisa kurang dari n_classes
+    # (kelas tanpa ruangan cocok tidak punya gen)
+    if not solutions:
+        return np.zeros((0, 0, 3), dtype=np.int32)
+    return np.asarray([list(solution) for solution in solutions], dtype=np.int32).reshape(len(solutions), -1, 3)
+
+
+def _to_solution(array):
+    return Chromosome.from_genes(array.tolist())
+
+
+def save_checkpoint(path, state):
+    """
+    Tulis state solver ke file `.npz` terkompresi. Solusi/populasi jadi
+    array int32, RNG (Mersenne Twister) jadi 625 uint32, sisanya JSON.
+    Ditulis ke file sementara dulu lalu `os.replace`, jadi checkpoint lama
+    tidak pernah setengah tertimpa.
+    """
+    arrays = {}
+    meta = {}
+    for key, value in state.items():
+        if value is None:
+            meta[key] = None
+        elif key in SOLUTION_FIELDS:
+            arrays[key] = _solutions_array([value])[0]
+        elif key in POPULATION_FIELDS:
+            arrays[key] = _solutions_array(value)
+        elif key == "rng_state":
+            arrays[key] = np.asarray(value[1], dtype=np.uint32)
+        elif key in RNG_STATE_FIELDS:
+            arrays[key] = np.asarray([rng_state[1] for rng_state in value], dtype=np.uint32)
+        else:
+            meta[key] = value
+    arrays["meta"] = np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(run_id, directory=CHECKPOINT_DIR):
+    """Kebalikan `save_checkpoint`. Raise FileNotFoundError kalau checkpoint tidak ada."""
+    with np.load(checkpoint_path(run_id, directory), allow_pickle=False) as data:
+        state = json.loads(data["meta"].tobytes().decode())
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Versi checkpoint {state.get('version')} tidak didukung")
+        for key in data.files:
+            if key in SOLUTION_FIELDS:
+                state[key] = _to_solution(data[key])
+            elif key in POPULATION_FIELDS:
+                state[key] = [_to_solution(solution) for solution in data[key]]
+            elif key == "rng_state":
+                state[key] = (3, tuple(data[key].tolist()), None)
+            elif key in RNG_STATE_FIELDS:
+                state[key] = [(3, tuple(row), None) for row in data[key].tolist()]
+    return state
+
+
+class Checkpointer:
+    """
+    Simpan state solver ke `<directory>/<run_id>.npz` paling sering tiap
+    `interval` detik. `params` (parameter run) dan `carry` (mis. hasil fase
+    GA waktu sudah masuk SA) ikut ditulis di tiap checkpoint, jadi satu file
+    cukup untuk melanjutkan run. `interval=None` mematikan checkpoint.
+    """
+
+    def __init__(self, run_id=None, interval=None, problem: CompiledProblem = None, params=None, directory=CHECKPOINT_DIR):
+        self.run_id = run_id
+        self.interval = interval
+        self.problem = problem
+        self.params = params or {}
+        self.directory = directory
+        self.carry = {}
+        self.saved = 0
+        self._saved_at = time.time()
+
+    @property
+    def enabled(self):
+        return self.interval is not None and self.run_id is not None
+
+    def due(self):
+        return self.enabled and time.time() - self._saved_at >= self.interval
+
+    def save(self, **state):
+        if not self.enabled:
+            return
+        full_state = {
+            **self.carry,
+            **state,
+            "version": CHECKPOINT_VERSION,
+            "run_id": self.run_id,
+            "params": self.params,
+            "fingerprint": problem_fingerprint(self.problem),
+            "saved_at": time.time(),
+        }
+        save_checkpoint(checkpoint_path(self.run_id, self.directory), full_state)
+        self._saved_at = time.time()
+        self.saved += 1
+
+    def clear(self):
+        if not self.enabled:
+            return
+        try:
+            os.remove(checkpoint_path(self.run_id, self.directory))
+        except FileNotFoundError:
+            pass
+
+
+NO_CHECKPOINT = Checkpointer()
@@ -0,0 +1,74 @@
+from array import array
+
+# typecode array: unsigned short, cukup untuk index kelas/ruangan/slot (< 65536)
+GENE_TYPECODE = "H"
+
+
+class Chromosome:
+    """
+    Solusi jadwal dalam bentuk kompak: per posisi gen, index kelas, ruangan
+    dan start slot disimpan di tiga `array('H')`.
+
+    Urutan kelas (`classes`) tidak pernah diubah, jadi dipakai bareng oleh
+    semua salinan dan anak hasil crossover; yang disalin cuma array ruangan
+    dan start (memcpy). Dari luar tetap kelihatan seperti list of
+    (class, room, start): bisa di-iterate, di-index dan diisi per gen, jadi
+    evaluator dan `decode_solution` tidak perlu tahu bedanya.
+    """
+
+    __slots__ = ("classes", "rooms", "starts")
+
+    def __init__(self, classes, rooms, starts):
+        self.classes = classes
+        self.rooms = rooms
+        self.starts = starts
+
+    @classmethod
+    def from_genes(cls, genes):
+        """Chromosome baru dari iterable (class, room, start); Chromosome disalin."""
+        if isinstance(genes, Chromosome):
+            return genes.copy()
+        genes = list(genes)
+        return cls(
+            array(GENE_TYPECODE, [c for c, _, _ in genes]),
+            array(GENE_TYPECODE, [r for _, r, _ in genes]),
+            array(GENE_TYPECODE, [s for _, _, s in genes]),
+        )
+
+    def __len__(self):
+        return len(self.classes)
+
+    def __iter__(self):
+        return zip(self.classes, self.rooms, self.starts)
+
+    def __getitem__(self, idx):
+        return self.classes[idx], self.rooms[idx], self.starts[idx]
+
+    def __setitem__(self, idx, gene):
+        # kelas di posisi ini tetap, yang berubah cuma ruangan + start
+        _, self.rooms[idx], self.starts[idx] = gene
+
+    def __eq__(self, other):
+        if not isinstance(other, Chromosome):
+            return NotImplemented
+        return self.classes == other.classes and self.rooms == other.rooms and self.starts == other.starts
+
+    __hash__ = None  # mutable; pakai `key()` untuk dict/set
+
+    def __repr__(self):
+        return f"Chromosome({list(self)!r})"
+
+    def copy(self):
+        return Chromosome(self.classes, self.rooms[:], self.starts[:])
+
+    def key(self):
+        """Key bytes untuk cache/dedup; hanya sah antar kromosom dengan urutan kelas yang sama."""
+        return self.rooms.tobytes() + self.starts.tobytes()
+
+    def splice(self, other, point):
+        """Anak one-point crossover: gen [0, point) dari kromosom ini, sisanya dari `other`."""
+        return Chromosome(
+            self.classes,
+            self.rooms[:point] + other.rooms[point:],
+            self.starts[:point] + other.starts[point:],
+        )
@@ -0,0 +1,162 @@
+import heapq
+import random
+
+from solver.chromosome import Chromosome
+from solver.problem import CompiledProblem, popcount, slot_mask
+
+
+def gene_order(problem: CompiledProblem):
+    """Urutan gen kromosom: sks terbesar dulu, kelas tanpa ruangan cocok dilewati."""
+    return [
+        c for c in sorted(range(problem.n_classes), key=lambda c: problem.class_sks[c], reverse=True)
+        if problem.class_rooms[c]
+    ]
+
+
+def _domain_starts(problem: CompiledProblem, c):
+    # dosen berjabatan gaboleh senen
+    sks = problem.class_sks[c]
+    return problem.block_starts_no_monday[sks] if problem.class_jabatan[c] else problem.block_starts[sks]
+
+
+def _least_conflict(problem: CompiledProblem, c, room_busy, class_masks, rng):
+    """Fallback kalau domain habis: (room, start) dengan sel bentrok paling sedikit (senen juga boleh)."""
+    sks = problem.class_sks[c]
+    starts = list(problem.block_starts[sks] or range(problem.n_slots - sks + 1))
+    if not starts:
+        raise ValueError(
+            f"Kelas {problem.class_ids[c]} butuh {sks} slot berturut-turut, timeslot yang ada cuma {problem.n_slots}"
+        )
+    rng.shuffle(starts)
+    # sel yang sudah dipakai tetangga di graf konflik dosen
+    lecturer_busy = 0
+    for d in problem.conflicts_of(c):
+        lecturer_busy |= class_masks[d]
+    best = None
+    best_conflict = float('inf')
+    for room in problem.class_rooms[c]:
+        busy = room_busy[room] | lecturer_busy
+        for start in starts:
+            conflict = popcount(problem.span_masks[sks][start] & busy)
+            if conflict < best_conflict:
+                best = (room, start)
+                best_conflict = conflict
+                if not conflict:
+                    return best
+    return best
+
+
+def _nth_bit(mask, n):
+    """Index bit nyala ke-n (mulai 0) dari `mask`."""
+    s = 0
+    while True:
+        if mask & 1:
+            if not n:
+                return s
+            n -= 1
+        mask >>= 1
+        s += 1
+
+
+def dsatur_solution(problem: CompiledProblem, rng=random):
+    """
+    Bangun satu solusi ala DSatur.
+
+    Tiap kelas punya domain (ruangan sesuai tipe x start blok yang sah),
+    disimpan sebagai bitmask start per ruangan. Yang ditempatkan duluan
+    selalu kelas dengan domain tersisa paling kecil (seri: derajat di graf
+    konflik dosen paling besar, lalu acak). Start yang kena preferensi dosen
+    diutamakan. Setelah kelas ditempatkan, start yang tumpang tindih dibuang
+    dari domain tetangganya di graf konflik (semua ruangan) dan dari domain
+    kelas lain di ruangan yang sama. Di antara start yang masih boleh,
+    yang bloknya nempel ke kelas lain / batas hari diutamakan biar ruangan
+    tidak bolong-bolong. Kalau domain sebuah kelas habis, dipilih
+    posisi dengan bentrok paling sedikit. Urutan gen hasilnya sama dengan
+    `gene_order`, jadi aman untuk crossover.
+    """
+    order = gene_order(problem)
+    sks_of = problem.class_sks
+    domains = {}
+    sizes = {}
+    for c in order:
+        starts = _domain_starts(problem, c)
+        mask = slot_mask(starts)
+        domains[c] = {room: mask for room in problem.class_rooms[c]}
+        sizes[c] = len(problem.class_rooms[c]) * len(starts)
+    # kelas yang belum ditempatkan per ruangan (dict = set yang urutannya tetap)
+    open_classes = [dict.fromkeys(d for d in classes if d in domains) for classes in problem.room_classes]
+    priority = {c: -len(problem.conflicts_of(c)) for c in order}
+    # sel yang sudah terpakai per ruangan + sel awal tiap potongan (awal hari / habis istirahat)
+    room_busy = [0] * problem.n_rooms
+    run_starts = slot_mask(s for s in range(problem.n_slots) if not problem.slot_follows[s]) | 1 << problem.n_slots
+
+    heap = [(sizes[c], priority[c], rng.random(), c) for c in order]
+    heapq.heapify(heap)
+    placed = {}
+    class_masks = [0] * problem.n_classes
+
+    while heap:
+        size, _, _, c = heapq.heappop(heap)
+        if c in placed or size != sizes[c]:
+            continue  # entry lama, domain-nya sudah mengecil sejak di-push
+
+        if size:
+            preferred = {room: mask & problem.class_pref_starts[c] for room, mask in domains[c].items()}
+            options = preferred if any(preferred.values()) else domains[c]
+            # best-fit: utamakan blok yang nempel ke sel terpakai / batas potongan di kiri dan kanan
+            sks = sks_of[c]
+            flush = {}
+            for room, mask in options.items():
+                edges = room_busy[room] | run_starts
+                flush[room] = mask & (edges << 1 | run_starts) & (edges >> sks)
+            if any(flush.values()):
+                options = flush
+            pick = rng.randrange(sum(popcount(mask) for mask in options.values()))
+            for room, mask in options.items():
+                count = popcount(mask)
+                if pick < count:
+                    start = _nth_bit(mask, pick)
+                    break
+                pick -= count
+        else:
+            room, start = _least_conflict(problem, c, room_busy, class_masks, rng)
+        placed[c] = (room, start)
+        for r in problem.class_rooms[c]:
+            del open_classes[r][c]
+
+        cells = problem.spans[sks_of[c]][start][0]
+        class_masks[c] = problem.span_masks[sks_of[c]][start]
+        room_busy[room] |= class_masks[c]
+        if not cells:
+            continue
+
+        # start yang bloknya kena sel lo..hi, per sks
+        lo, hi = cells[0], cells[-1]
+        overlap = {}
+        for sks in set(sks_of[d] for d in open_classes[room]) | set(sks_of[d] for d in problem.conflicts_of(c)):
+            first = max(0, lo - sks + 1)
+            overlap[sks] = ((1 << (hi + 1 - first)) - 1) << first
+
+        # tetangga di graf konflik kehilangan start itu di semua ruangan,
+        # kelas lain di ruangan yang sama cuma di ruangan ini
+        touched = {}
+        for d in problem.conflicts_of(c):
+            if d in domains and d not in placed:
+                domain = domains[d]
+                mask = overlap[sks_of[d]]
+                for r, starts in domain.items():
+                    hit = starts & mask
+                    if hit:
+                        domain[r] = starts ^ hit
+                        touched[d] = touched.get(d, 0) + popcount(hit)
+        for d in open_classes[room]:
+            domain = domains[d]
+            hit = domain[room] & overlap[sks_of[d]]
+            if hit:
+                domain[room] ^= hit
+                touched[d] = touched.get(d, 0) + popcount(hit)
+        for d, removed in touched.items():
+            sizes[d] -= removed
+            heapq.heappush(heap, (sizes[d], priority[d], rng.random(), d))
+
+    return Chromosome.from_genes((c, *placed[c]) for c in order)
@@ -0,0 +1,125 @@
+from solver.budget import MIN_COOLING_RATE, NO_DEADLINE, Deadline, budget_cooling_rate
+
+COOLING_MODES = ("geometric", "adaptive")
+
+# default jadwal adaptif
+TARGET_ACCEPTANCE = 0.3
+REHEAT_AFTER = 10
+STOP_AFTER = 30
+
+
+class CoolingSchedule:
+    """
+    Jadwal temperatur SA, di-`step` sekali tiap level temperatur.
+
+    - `geometric`: `T *= cooling_rate` sampai T <= 1 (rate disesuaikan ke
+      sisa waktu kalau ada `deadline`), sama seperti loop SA yang lama.
+    - `adaptive`: selama acceptance ratio level di atas `target_acceptance`
+      (masih random walk) temperatur turun lebih cepat, maksimal ke
+      `target_acceptance / acceptance`; di bawah target pakai `cooling_rate`
+      biasa. Tiap `reheat_after` level dingin (acceptance di bawah target)
+      tanpa best baru, temperatur dinaikkan lagi sebanyak `reheat_after`
+      level pendinginan; setelah `stop_after` level seperti itu berhenti
+      (plateau).
+
+    Objeknya picklable, jadi bisa dikirim ke proses worker (multi-start).
+    """
+
+    def __init__(
+        self,
+        initial_temperature,
+        cooling_rate,
+        deadline: Deadline = NO_DEADLINE,
+        mode="geometric",
+        target_acceptance=TARGET_ACCEPTANCE,
+        reheat_after=REHEAT_AFTER,
+        stop_after=STOP_AFTER,
+    ):
+        if mode not in COOLING_MODES:
+            raise ValueError(f"cooling harus salah satu dari {COOLING_MODES}")
+        if not 0 < cooling_rate < 1:
+            raise ValueError("cooling_rate harus di antara 0 dan 1")
+        if not 0 < target_acceptance < 1:
+            raise ValueError("target_acceptance harus di antara 0 dan 1")
+        if reheat_after < 1 or stop_after < 1:
+            raise ValueError("reheat_after dan stop_after minimal 1")
+        self.initial_temperature = initial_temperature
+        self.temperature = initial_temperature
+        self.cooling_rate = cooling_rate
+        self.deadline = deadline
+        self.mode = mode
+        self.target_acceptance = target_acceptance
+        self.reheat_after = reheat_after
+        self.stop_after = stop_after
+        self.levels = 0
+        self.stopped = None
+        # state adaptif
+        self.best_fitness = float('inf')
+        self.stale = 0
+        self.reheats = 0
+
+    @property
+    def active(self):
+        return self.stopped is None and self.temperature > 1
+
+    def step(self, accepted, attempted, best_fitness):
+        """Tutup satu level: catat hasilnya lalu tentukan temperatur level berikutnya."""
+        self.levels += 1
+        if self.deadline.expired():
+            self.stopped = "deadline"
+            return
+        if self.mode == "geometric":
+            # kalau ada budget, rate disesuaikan biar temperatur sampai 1 pas deadline
+            self.cooling_rate = budget_cooling_rate(
+                self.temperature, self.deadline.elapsed() / self.levels, self.deadline, self.cooling_rate
+            )
+            self.temperature *= self.cooling_rate
+            return
+
+        acceptance = accepted / attempted if attempted else 0.0
+        if best_fitness < self.best_fitness:
+            self.best_fitness = best_fitness
+            self.stale = 0
+        elif acceptance < self.target_acceptance:
+            # selama masih panas best memang jarang membaik, jadi stagnasi
+            # baru dihitung setelah chain mulai dingin
+            self.stale += 1
+            if self.stale >= self.stop_after:
+                self.stopped = "plateau"
+                return
+            if self.stale % self.reheat_after == 0:
+                # balik ke temperatur `reheat_after` level yang lalu
+                self.temperature = min(self.initial_temperature, self.temperature / self.cooling_rate ** self.reheat_after)
+                self.reheats += 1
+                return
+
+        rate = self.cooling_rate
+        if acceptance > self.target_acceptance:
+            rate = max(MIN_COOLING_RATE, min(rate, self.target_acceptance / acceptance))
+        self.temperature *= rate
+
+    def state(self):
+        """State yang perlu masuk checkpoint (semuanya skalar, aman untuk JSON)."""
+        return {
+            "temperature": self.temperature,
+            "cooling_rate": self.cooling_rate,
+            "stale": self.stale,
+            "reheats": self.reheats,
+        }
+
+    def restore(self, state, best_fitness):
+        self.temperature = state["temperature"]
+        self.cooling_rate = state["cooling_rate"]
+        self.stale = state.get("stale", 0)
+        self.reheats = state.get("reheats", 0)
+        self.best_fitness = best_fitness
+
+    def report(self):
+        return {
+            "mode": self.mode,
+            "levels": self.levels,
+            "final_temperature": round(self.temperature, 4),
+            "reheats": self.reheats,
+            # berhenti sebelum beku tanpa alasan lain berarti loop-nya ketemu fitness 0
+            "stopped": self.stopped or ("frozen" if self.temperature <= 1 else "optimal"),
+        }
@@ -0,0 +1,196 @@
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from solver.chromosome import Chromosome
+from solver.construct import gene_order
+from solver.delta import IncrementalEvaluator
+from solver.problem import CompiledProblem, sub_problem
+from solver.progress import NULL_PROGRESS
+from solver.warmstart import place_greedy
+
+# dua cluster digabung kalau porsi edge graf konflik dosen di antara keduanya
+# minimal segini dari total edge cluster yang lebih kecil keterikatannya
+COUPLING_THRESHOLD = 0.3
+
+
+def _cluster_edges(problem: CompiledProblem, cluster_of):
+    # edge graf konflik dosen: antar pasangan cluster dan total yang nempel ke tiap cluster
+    cross = {}
+    degree = {}
+    for c in range(problem.n_classes):
+        g = cluster_of[c]
+        for d in problem.conflicts_of(c):
+            if d < c:
+                continue
+            h = cluster_of[d]
+            degree[g] = degree.get(g, 0) + 1
+            if h != g:
+                degree[h] = degree.get(h, 0) + 1
+                pair = (min(g, h), max(g, h))
+                cross[pair] = cross.get(pair, 0) + 1
+    return cross, degree
+
+
+def cluster_classes(problem: CompiledProblem, threshold=COUPLING_THRESHOLD):
+    """
+    Bagi kelas jadi cluster yang keterikatannya lemah.
+
+    Awalnya satu cluster per program studi mata kuliah. Selama ada pasangan
+    cluster yang berbagi dosen cukup banyak (edge konflik di antara keduanya
+    >= `threshold` x total edge cluster yang lebih kecil), pasangan yang
+    paling terikat digabung. Return list cluster, tiap cluster list index
+    kelas terurut; urutan cluster ikut kelas pertamanya.
+    """
+    labels = {}
+    cluster_of = [labels.setdefault(program, len(labels)) for program in problem.class_program]
+    while True:
+        cross, degree = _cluster_edges(problem, cluster_of)
+        merge = None
+        best = threshold
+        for (g, h), edges in sorted(cross.items()):
+            coupling = edges / min(degree[g], degree[h])
+            if coupling >= best and (merge is None or coupling > best):
+                merge = (g, h)
+                best = coupling
+        if merge is None:
+            break
+        g, h = merge
+        cluster_of = [g if k == h else k for k in cluster_of]
+
+    clusters = {}
+    for c, k in enumerate(cluster_of):
+        clusters.setdefault(k, []).append(c)
+    return list(clusters.values())
+
+
+def _apportion(needs, total):
+    # bagi `total` ruangan proporsional ke `needs` (largest remainder), minimal 1 per cluster
+    spare = total - len(needs)
+    quotas = [spare * need / sum(needs) for need in needs]
+    counts = [1 + int(quota) for quota in quotas]
+    left = total - sum(counts)
+    for i in sorted(range(len(needs)), key=lambda i: quotas[i] - int(quotas[i]), reverse=True)[:left]:
+        counts[i] += 1
+    return counts
+
+
+def reserve_rooms(problem: CompiledProblem, clusters):
+    """
+    Jatah ruangan tiap cluster, per tipe ruangan proporsional ke kebutuhan
+    sel (sks) kelasnya. Ruangan diurutkan per gedung dulu, jadi jatah satu
+    cluster sebisa mungkin ngumpul di gedung yang sama. Kalau ruangan suatu
+    tipe lebih sedikit dari cluster yang butuh, ruangannya dipakai bergiliran
+    dan bentroknya dibereskan fase repair.
+    Return (class_rooms per cluster sejajar `clusters`, tipe yang dipakai bareng).
+    """
+    demand = [{} for _ in clusters]
+    for k, classes in enumerate(clusters):
+        for c in classes:
+            if problem.class_rooms[c]:
+                room_type = problem.class_type[c]
+                demand[k][room_type] = demand[k].get(room_type, 0) + problem.class_sks[c]
+
+    allotted = [{} for _ in clusters]
+    shared = []
+    for room_type in sorted({room_type for needs in demand for room_type in needs}):
+        rooms = sorted(
+            (r for r in range(problem.n_rooms) if problem.room_type[r] == room_type),
+            key=lambda r: (problem.room_building[r] or "", r),
+        )
+        needs = [(k, needs[room_type]) for k, needs in enumerate(demand) if room_type in needs]
+        if len(rooms) < len(needs):
+            shared.append(room_type)
+            for i, (k, _) in enumerate(needs):
+                allotted[k][room_type] = [rooms[i % len(rooms)]]
+            continue
+        first = 0
+        for (k, _), count in zip(needs, _apportion([need for _, need in needs], len(rooms))):
+            allotted[k][room_type] = rooms[first:first + count]
+            first += count
+
+    class_rooms = [
+        [allotted[k].get(problem.class_type[c], []) if problem.class_rooms[c] else [] for c in classes]
+        for k, classes in enumerate(clusters)
+    ]
+    return class_rooms, shared
+
+
+def _solve_cluster(problem: CompiledProblem, penalties, solve, rng_state):
+    rng = random.Random()
+    rng.setstate(rng_state)
+    return solve(problem, penalties, rng)
+
+
+def decomposed_solve(
+    problem: CompiledProblem,
+    penalties,
+    solve,
+    processes: int = 1,
+    threshold=COUPLING_THRESHOLD,
+    progress=NULL_PROGRESS,
+    rng=random,
+):
+    """
+    Solve per cluster lalu gabung.
+
+    Kelas dibagi pakai `cluster_classes`, tiap cluster dapat jatah ruangan
+    dari `reserve_rooms` dan di-solve sendiri sebagai `sub_problem` lewat
+    `solve(problem, penalties, rng) -> (solution, fitness)`, paralel di
+    `processes` proses (`solve` harus top-level/picklable). Tiap cluster punya
+    RNG sendiri yang diturunkan dari `rng`, jadi hasilnya tetap deterministik.
+    Hasil cluster digabung jadi satu solusi penuh, lalu kelas yang bentrok /
+    kena penalti setelah digabung (biasanya lewat dosen atau ruangan yang
+    dipakai bareng) ditaruh ulang greedy di semua ruangan.
+    Return (solution, movable, report); `movable` = index gen yang masih
+    melanggar, untuk fase repair berikutnya.
+    """
+    clusters = cluster_classes(problem, threshold)
+    class_rooms, shared = reserve_rooms(problem, clusters)
+    subproblems = [sub_problem(problem, classes, rooms) for classes, rooms in zip(clusters, class_rooms)]
+    rng_states = [random.Random(rng.getrandbits(64)).getstate() for _ in clusters]
+
+    results = []
+    if processes > 1 and len(clusters) > 1:
+        with ProcessPoolExecutor(max_workers=min(processes, len(clusters))) as executor:
+            futures = [
+                executor.submit(_solve_cluster, sub, penalties, solve, state)
+                for sub, state in zip(subproblems, rng_states)
+            ]
+            for future in futures:
+                results.append(future.result())
+                progress.update(phase="clusters", clusters=len(clusters), clusters_done=len(results))
+    else:
+        for sub, state in zip(subproblems, rng_states):
+            results.append(_solve_cluster(sub, penalties, solve, state))
+            progress.update(phase="clusters", clusters=len(clusters), clusters_done=len(results))
+
+    placed = {}
+    for classes, (solution, _) in zip(clusters, results):
+        for c, room, start in solution:
+            placed[classes[c]] = (room, start)
+    evaluator = IncrementalEvaluator(
+        problem, penalties, Chromosome.from_genes((c, *placed[c]) for c in gene_order(problem))
+    )
+    merged_fitness = evaluator.score
+
+    violating = evaluator.violations()
+    place_greedy(evaluator, [idx for idx, c in enumerate(evaluator.solution.classes) if c in violating])
+    violating = evaluator.violations()
+    movable = [idx for idx, c in enumerate(evaluator.solution.classes) if c in violating]
+
+    report = {
+        "clusters": [
+            {
+                "classes": len(classes),
+                "program_studi": sorted({problem.class_program[c] for c in classes}, key=str),
+                "rooms": len({r for rooms in cluster_rooms for r in rooms}),
+                "fitness": fitness,
+            }
+            for classes, cluster_rooms, (_, fitness) in zip(clusters, class_rooms, results)
+        ],
+        "shared_room_types": shared,
+        "merged_fitness": merged_fitness,
+        "greedy_fitness": evaluator.score,
+        "repair_classes": len(movable),
+    }
+    return evaluator.solution, movable, report
@@ -0,0 +1,266 @@
+from solver.chromosome import Chromosome
+from solver.fitness import DEFAULT_DAILY_LOAD_THRESHOLD, DEFAULT_WRONG_ROOM_TYPES, combine_score
+from solver.problem import CompiledProblem, popcount
+
+
+class IncrementalEvaluator:
+    """
+    Evaluator fitness yang menyimpan state okupansi ruangan/dosen per slot.
+
+    Dipakai SA: satu move (pindah 1 kelas ke ruangan/slot lain) dihitung
+    selisih skornya dalam O(sks + tetangga di graf konflik dosen) tanpa scan
+    ulang seluruh solusi.
+    `score` selalu sama dengan `evaluate()` untuk solusi yang sedang dipegang
+    (komponen daily load bisa beda di digit float terakhir).
+    """
+
+    def __init__(self, problem: CompiledProblem, penalties, solution):
+        self.problem = problem
+        self.penalties = penalties
+        self.solution = Chromosome.from_genes(solution)
+
+        self.checked_types = penalties.get("wrong_room_types", DEFAULT_WRONG_ROOM_TYPES)
+        self.daily_weight = penalties.get("daily_load") or 0
+        self.daily_threshold = penalties.get("daily_load_threshold", DEFAULT_DAILY_LOAD_THRESHOLD)
+
+        self.room_usage = {}      # room * n_slots + slot -> jumlah kelas
+        self.class_masks = [0] * problem.n_classes  # kelas -> bitmask sel yang sedang dipakai
+        self.daily_counts = {}    # lecturer -> {day: jumlah kelas}
+        self.daily_penalty = {}   # lecturer -> penalti daily load
+        self.daily_total = 0
+
+        self.conflict_score = 0
+        self.soft_score = 0
+        self._busy_class = None  # kelas terakhir yang digeser + hasil `_lecturer_busy`-nya
+        self._busy = None
+        # kelas yang melanggar, dibangun waktu `violations()` pertama kali dipanggil;
+        # setelah itu cuma kelas yang terdampak move yang dicek ulang
+        self._violating = None      # list kelas melanggar (buat sampling acak)
+        self._violating_pos = None  # kelas -> posisi di _violating
+        self._moved = None          # kelas yang digeser sejak sinkron terakhir -> (room, start) lama
+        self._gene_of = None        # kelas -> index gen
+        self._room_members = None   # ruangan -> kelas yang sedang di ruangan itu
+        for c, r, s in self.solution:
+            self._add(c, r, s, self._lecturer_busy(c))
+        self._refresh_daily(
+            {lecturer for c, _, _ in self.solution for lecturer in problem.class_lecturers[c]}
+        )
+
+    @property
+    def score(self):
+        return combine_score(self.conflict_score, self.soft_score + self.daily_total, self.penalties)
+
+    def _class_soft(self, c, r, s):
+        problem = self.problem
+        penalties = self.penalties
+        penalty = 0
+        tipe_mk = problem.class_type[c]
+        if tipe_mk in self.checked_types and problem.room_type[r] != tipe_mk:
+            penalty += penalties["wrong_room"]
+        if problem.class_special[c] and not problem.room_special_ok[r]:
+            penalty += problem.class_special[c] * penalties["special_needs"]
+        for forbidden in problem.class_pref_high[c]:
+            if forbidden >> s & 1:
+                penalty += penalties["high_priority_preference"]
+        for wanted in problem.class_pref_general[c]:
+            if not wanted >> s & 1:
+                penalty += penalties["general_preference"]
+        if problem.slot_day[s] == 0 and problem.class_jabatan[c]:
+            penalty += problem.class_jabatan[c] * penalties["jabatan"]
+        return penalty
+
+    def _lecturer_busy(self, c):
+        """Per dosen kelas `c`: bitmask sel yang dipakai kelas lain dosen itu (tetangga `c` di graf konflik)."""
+        problem = self.problem
+        class_masks = self.class_masks
+        indptr = problem.lecturer_class_indptr
+        indices = problem.lecturer_class_indices
+        busy = []
+        for lecturer in problem.class_lecturers[c]:
+            mask = 0
+            for d in indices[indptr[lecturer]:indptr[lecturer + 1]]:
+                if d != c:
+                    mask |= class_masks[d]
+            busy.append(mask)
+        return busy
+
+    def _add(self, c, r, s, busy):
+        problem = self.problem
+        penalties = self.penalties
+        n_slots = problem.n_slots
+        cells, invalid, cross_day = problem.spans[problem.class_sks[c]][s]
+        lecturers = problem.class_lecturers[c]
+
+        delta = invalid * penalties["invalid_timeslot"] + cross_day * penalties["cross_day"]
+        for cell in cells:
+            key = r * n_slots + cell
+            used = self.room_usage.get(key, 0)
+            delta += used * penalties["room_conflict"]
+            self.room_usage[key] = used + 1
+        mask = problem.span_masks[problem.class_sks[c]][s]
+        for used in busy:
+            if used & mask:
+                delta += popcount(used & mask) * penalties["lecturer_conflict"]
+        self.class_masks[c] = mask
+        self.conflict_score += delta
+        self.soft_score += self._class_soft(c, r, s)
+
+        if self.daily_weight:
+            day = problem.slot_day[s]
+            for lecturer in lecturers:
+                day_counts = self.daily_counts.setdefault(lecturer, {})
+                day_counts[day] = day_counts.get(day, 0) + 1
+
+    def _remove(self, c, r, s, busy):
+        problem = self.problem
+        penalties = self.penalties
+        n_slots = problem.n_slots
+        cells, invalid, cross_day = problem.spans[problem.class_sks[c]][s]
+        lecturers = problem.class_lecturers[c]
+
+        delta = invalid * penalties["invalid_timeslot"] + cross_day * penalties["cross_day"]
+        for cell in cells:
+            key = r * n_slots + cell
+            used = self.room_usage[key] - 1
+            delta += used * penalties["room_conflict"]
+            if used:
+                self.room_usage[key] = used
+            else:
+                del self.room_usage[key]
+        mask = problem.span_masks[problem.class_sks[c]][s]
+        for used in busy:
+            if used & mask:
+                delta += popcount(used & mask) * penalties["lecturer_conflict"]
+        self.class_masks[c] = 0
+        self.conflict_score -= delta
+        self.soft_score -= self._class_soft(c, r, s)
+
+        if self.daily_weight:
+            day = problem.slot_day[s]
+            for lecturer in lecturers:
+                day_counts = self.daily_counts[lecturer]
+                day_counts[day] -= 1
+                if not day_counts[day]:
+                    del day_counts[day]
+
+    def _refresh_daily(self, lecturers):
+        if not self.daily_weight:
+            return
+        for lecturer in lecturers:
+            penalty = 0
+            counts = list(self.daily_counts.get(lecturer, {}).values())
+            if counts:
+                avg = sum(counts) / len(counts)
+                for count in counts:
+                    if abs(count - avg) > self.daily_threshold:
+                        penalty += self.daily_weight * abs(count - avg)
+            self.daily_total += penalty - self.daily_penalty.get(lecturer, 0)
+            if penalty:
+                self.daily_penalty[lecturer] = penalty
+            else:
+                self.daily_penalty.pop(lecturer, None)
+        if not self.daily_penalty:
+            # buang sisa pembulatan float
+            self.daily_total = 0
+
+    def _violates(self, c, r, s):
+        problem = self.problem
+        n_slots = problem.n_slots
+        class_masks = self.class_masks
+        cells, invalid, cross_day = problem.spans[problem.class_sks[c]][s]
+        mask = class_masks[c]
+        return bool(invalid or cross_day or self._class_soft(c, r, s) or any(
+            self.room_usage[r * n_slots + cell] > 1 for cell in cells
+        ) or any(class_masks[d] & mask for d in problem.conflicts_of(c)))
+
+    def _mark(self, c, violating):
+        pos = self._violating_pos.get(c)
+        if violating and pos is None:
+            self._violating_pos[c] = len(self._violating)
+            self._violating.append(c)
+        elif not violating and pos is not None:
+            # tukar dengan elemen terakhir lalu pop, O(1)
+            last = self._violating.pop()
+            if last != c:
+                self._violating[pos] = last
+                self._violating_pos[last] = pos
+            del self._violating_pos[c]
+
+    def _sync_violations(self):
+        """
+        Update set kelas melanggar. Status kelas cuma bergantung pada posisinya
+        sendiri, kelas lain di sel ruangan yang sama, dan tetangganya di graf
+        konflik dosen; jadi yang dicek ulang cuma kelas yang digeser plus
+        kelas di sekitar posisi lama/barunya. Move yang sudah di-undo dilewati.
+        """
+        problem = self.problem
+        solution = self.solution
+        if self._violating is None:
+            self._gene_of = {c: idx for idx, c in enumerate(solution.classes)}
+            self._room_members = [set() for _ in range(problem.n_rooms)]
+            for c, r, _ in solution:
+                self._room_members[r].add(c)
+            self._violating = []
+            self._violating_pos = {}
+            for c, r, s in solution:
+                self._mark(c, self._violates(c, r, s))
+            self._moved = {}
+            return
+        if not self._moved:
+            return
+
+        moved, self._moved = self._moved, {}
+        changed = []
+        for c, (old_room, old_start) in moved.items():
+            idx = self._gene_of[c]
+            room, start = solution.rooms[idx], solution.starts[idx]
+            if (room, start) == (old_room, old_start):
+                continue
+            if room != old_room:
+                self._room_members[old_room].discard(c)
+                self._room_members[room].add(c)
+            changed.append((c, old_room, old_start, room, start))
+
+        class_masks = self.class_masks
+        affected = set()
+        for c, old_room, old_start, room, start in changed:
+            sks = problem.class_sks[c]
+            affected.add(c)
+            affected.update(problem.conflicts_of(c))
+            for r, mask in ((old_room, problem.span_masks[sks][old_start]), (room, class_masks[c])):
+                affected.update(d for d in self._room_members[r] if class_masks[d] & mask)
+        for c in affected:
+            idx = self._gene_of.get(c)
+            if idx is not None:
+                self._mark(c, self._violates(c, solution.rooms[idx], solution.starts[idx]))
+
+    def violations(self):
+        """Index kelas yang sekarang kena konflik (ruangan/dosen/slot) atau penalti soft."""
+        self._sync_violations()
+        return set(self._violating)
+
+    def sample_violation(self, rng):
+        """Satu kelas acak dari `violations()` tanpa scan ulang solusi; None kalau tidak ada."""
+        self._sync_violations()
+        return rng.choice(self._violating) if self._violating else None
+
+    def move(self, idx, room, start):
+        """Pindahkan gen ke-idx ke (room, start). Return selisih skor (baru - lama)."""
+        before = self.score
+        solution = self.solution
+        c, old_room, old_start = solution.classes[idx], solution.rooms[idx], solution.starts[idx]
+        # sel dosen yang dipakai tetangga cuma berubah kalau kelas lain yang digeser,
+        # jadi move lalu undo kelas yang sama (SA/tabu) cukup hitung sekali
+        if c != self._busy_class:
+            self._busy = self._lecturer_busy(c)
+            self._busy_class = c
+        busy = self._busy
+        self._remove(c, old_room, old_start, busy)
+        self._add(c, room, start, busy)
+        solution.rooms[idx] = room
+        solution.starts[idx] = start
+        if self._moved is not None:
+            self._moved.setdefault(c, (old_room, old_start))
+        if self.daily_weight and self.problem.slot_day[old_start] != self.problem.slot_day[start]:
+            self._refresh_daily(self.problem.class_lecturers[c])
+        return self.score - before
@@ -0,0 +1,140 @@
+from solver.problem import CompiledProblem, popcount
+
+# Bentuk fitness default = versi hybrid. GA/SA lama override lewat key yang sama.
+DEFAULT_WRONG_ROOM_TYPES = ("P", "T", "S")
+DEFAULT_DAILY_LOAD_THRESHOLD = 4
+
+
+def check_conflicts(solution, problem: CompiledProblem, penalties):
+    conflicts = 0
+    n_slots = problem.n_slots
+    room_usage = {}  # room * n_slots + slot -> jumlah kelas yang sudah pakai
+    class_masks = [0] * problem.n_classes
+
+    for c, r, s in solution:
+        sks = problem.class_sks[c]
+        cells, invalid, cross_day = problem.spans[sks][s]
+        conflicts += invalid * penalties["invalid_timeslot"] + cross_day * penalties["cross_day"]
+
+        for cell in cells:
+            key = r * n_slots + cell
+            used = room_usage.get(key, 0)
+            conflicts += used * penalties["room_conflict"]
+            room_usage[key] = used + 1
+        class_masks[c] = problem.span_masks[sks][s]
+
+    # dosen bentrok: per dosen, sel yang sudah dipakai kelas sebelumnya di kliknya
+    # (sama dengan jumlah kelas - 1 per (dosen, slot))
+    indices = problem.lecturer_class_indices
+    for lecturer in range(problem.n_lecturers):
+        busy = 0
+        for c in indices[problem.lecturer_class_indptr[lecturer]:problem.lecturer_class_indptr[lecturer + 1]]:
+            mask = class_masks[c]
+            if busy & mask:
+                conflicts += popcount(busy & mask) * penalties["lecturer_conflict"]
+            busy |= mask
+
+    return conflicts
+
+
+def check_room_type_compatibility(solution, problem: CompiledProblem, penalties):
+    checked_types = penalties.get("wrong_room_types", DEFAULT_WRONG_ROOM_TYPES)
+    penalty = 0
+    for c, r, _ in solution:
+        tipe_mk = problem.class_type[c]
+        if tipe_mk in checked_types and problem.room_type[r] != tipe_mk:
+            penalty += penalties["wrong_room"]
+    return penalty
+
+
+def check_special_needs_compliance(solution, problem: CompiledProblem, penalties):
+    penalty = 0
+    for c, r, _ in solution:
+        if problem.class_special[c] and not problem.room_special_ok[r]:
+            penalty += problem.class_special[c] * penalties["special_needs"]
+    return penalty
+
+
+def check_daily_load_balance(solution, problem: CompiledProblem, penalties):
+    if not penalties.get("daily_load"):
+        return 0
+    threshold = penalties.get("daily_load_threshold", DEFAULT_DAILY_LOAD_THRESHOLD)
+
+    # urutan insert dict sama dengan versi lama biar hasil float-nya identik
+    lecturer_daily_counts = {}
+    for c, _, s in solution:
+        day = problem.slot_day[s]
+        for lecturer in problem.class_lecturers[c]:
+            day_counts = lecturer_daily_counts.setdefault(lecturer, {})
+            day_counts[day] = day_counts.get(day, 0) + 1
+
+    penalty = 0
+    for day_counts in lecturer_daily_counts.values():
+        counts = list(day_counts.values())
+        avg = sum(counts) / len(counts)
+        for count in counts:
+            if abs(count - avg) > threshold:
+                penalty += penalties["daily_load"] * abs(count - avg)
+    return penalty
+
+
+def check_preference_compliance(solution, problem: CompiledProblem, penalties):
+    penalty = 0
+    for c, _, s in solution:
+        for forbidden in problem.class_pref_high[c]:
+            if forbidden >> s & 1:
+                penalty += penalties["high_priority_preference"]
+        for wanted in problem.class_pref_general[c]:
+            if not wanted >> s & 1:
+                penalty += penalties["general_preference"]
+    return penalty
+
+
+def check_jabatan_constraint(solution, problem: CompiledProblem, penalties):
+    penalty = 0
+    for c, _, s in solution:
+        if problem.slot_day[s] == 0 and problem.class_jabatan[c]:
+            penalty += problem.class_jabatan[c] * penalties["jabatan"]
+    return penalty
+
+
+def fitness_components(solution, problem: CompiledProblem, penalties):
+    """Breakdown tiap komponen penalti untuk satu solusi."""
+    return {
+        "conflict": check_conflicts(solution, problem, penalties),
+        "room_type": check_room_type_compatibility(solution, problem, penalties),
+        "special_needs": check_special_needs_compliance(solution, problem, penalties),
+        "daily_load": check_daily_load_balance(solution, problem, penalties),
+        "preference": check_preference_compliance(solution, problem, penalties),
+        "jabatan": check_jabatan_constraint(solution, problem, penalties),
+    }
+
+
+def combine_score(conflict_score, soft_score, penalties):
+    """
+    Gabungkan skor konflik dan soft constraint.
+
+    `soft_on_conflict=False` meniru GA/SA lama yang langsung return
+    konflik * multiplier tanpa soft constraint.
+    """
+    if conflict_score > 0:
+        if penalties.get("soft_on_conflict", True):
+            return conflict_score * penalties["conflict_multiplier"] + soft_score
+        return conflict_score * penalties["conflict_multiplier"]
+    return soft_score
+
+
+def evaluate(solution, problem: CompiledProblem, penalties):
+    """Total penalti (semakin kecil semakin baik)."""
+    conflict_score = check_conflicts(solution, problem, penalties)
+    if conflict_score > 0 and not penalties.get("soft_on_conflict", True):
+        return conflict_score * penalties["conflict_multiplier"]
+
+    soft_score = (
+        check_room_type_compatibility(solution, problem, penalties)
+        + check_special_needs_compliance(solution, problem, penalties)
+        + check_daily_load_balance(solution, problem, penalties)
+        + check_preference_compliance(solution, problem, penalties)
+        + check_jabatan_constraint(solution, problem, penalties)
+    )
+    return combine_score(conflict_score, soft_score, penalties)
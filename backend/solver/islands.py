@@ -0,0 +1,208 @@
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from solver.batch import BatchEvaluator
+from solver.budget import NO_DEADLINE
+from solver.cache import FitnessCache
+from solver.checkpoint import NO_CHECKPOINT
+from solver.fitness import fitness_components
+from solver.problem import CompiledProblem
+from solver.progress import NULL_PROGRESS
+
+# state milik proses worker, diisi sekali lewat initializer pool
+_island = {}
+
+
+def _init_island(problem: CompiledProblem, penalties, init, evolve):
+    _island["problem"] = problem
+    _island["init"] = init
+    _island["evolve"] = evolve
+    _island["cache"] = FitnessCache(problem, penalties, batch_evaluator=BatchEvaluator(problem, penalties))
+
+
+def _run_epoch(population, population_size, rng_state, generations, mutation_prob):
+    """Jalankan satu pulau selama `generations` generasi. RNG pulau dibawa bolak-balik lewat state."""
+    problem = _island["problem"]
+    cache = _island["cache"]
+    rng = random.Random()
+    rng.setstate(rng_state)
+    if population is None:
+        population = _island["init"](problem, population_size, rng)
+
+    best_solution = None
+    best_fitness = float('inf')
+    for _ in range(generations):
+        population = _island["evolve"](population, problem, cache, mutation_prob, rng)
+        scores = cache.score_population(population)
+        best_idx = min(range(len(population)), key=scores.__getitem__)
+        if scores[best_idx] < best_fitness:
+            best_solution = population[best_idx]
+            best_fitness = scores[best_idx]
+        if best_fitness == 0:
+            break
+
+    scores = cache.score_population(population)
+    best_idx = min(range(len(population)), key=scores.__getitem__)
+    if scores[best_idx] < best_fitness:
+        best_solution = population[best_idx]
+        best_fitness = scores[best_idx]
+    return population, scores, best_solution, best_fitness, rng.getstate(), os.getpid(), cache.stats()
+
+
+def _migrate(populations, scores, migrants):
+    # topologi ring: K individu terbaik pulau i menggantikan K terburuk pulau i+1
+    n = len(populations)
+    emigrants = []
+    for population, population_scores in zip(populations, scores):
+        order = sorted(range(len(population)), key=population_scores.__getitem__)
+        emigrants.append([(population[j], population_scores[j]) for j in order[:migrants]])
+
+    for i in range(n):
+        target = (i + 1) % n
+        population = list(populations[target])
+        population_scores = list(scores[target])
+        order = sorted(range(len(population)), key=population_scores.__getitem__)
+        for j, (solution, score) in zip(reversed(order), emigrants[i]):
+            population[j] = solution
+            population_scores[j] = score
+        populations[target] = population
+        scores[target] = population_scores
+
+
+def elite_solutions(candidates, k):
+    """K solusi berbeda dengan skor terbaik dari list (solution, score), urut naik."""
+    elite = []
+    seen = set()
+    for solution, _ in sorted(candidates, key=lambda item: item[1]):
+        key = solution.key()
+        if key in seen:
+            continue
+        seen.add(key)
+        elite.append(solution)
+        if len(elite) >= k:
+            break
+    return elite
+
+
+def island_ga(
+    problem: CompiledProblem,
+    penalties,
+    init,
+    evolve,
+    islands: int,
+    population_size: int,
+    generations: int,
+    mutation_prob: float,
+    migration_interval: int = 10,
+    migrants: int = 2,
+    elite: int = 1,
+    progress=NULL_PROGRESS,
+    deadline=NO_DEADLINE,
+    checkpointer=NO_CHECKPOINT,
+    resume=None,
+    rng=random,
+):
+    """
+    GA model pulau: `islands` populasi berevolusi di proses terpisah.
+
+    `init(problem, size, rng)` membuat populasi awal dan `evolve(population,
+    problem, fitness_cache, mutation_prob, rng)` menjalankan satu generasi;
+    keduanya harus fungsi top-level supaya bisa dikirim ke worker. Tiap
+    `migration_interval` generasi, pulau bertukar `migrants` individu
+    terbaik lewat ring. Tiap pulau punya RNG sendiri yang diturunkan dari
+    `rng`, jadi run dengan seed yang sama hasilnya sama.
+
+    Kalau `deadline` habis, evolusi berhenti setelah epoch yang sedang jalan.
+    Checkpoint ditulis di batas epoch (setelah migrasi): populasi semua
+    pulau digabung jadi satu, plus state RNG tiap pulau; `resume` adalah
+    state checkpoint itu dan run lanjut persis dari epoch berikutnya.
+
+    Return (best_solution, best_fitness, report); `report["elite"]` berisi
+    `elite` solusi terbaik gabungan semua pulau.
+    """
+    islands = max(1, islands)
+    migration_interval = max(1, migration_interval)
+    migrants = max(0, min(migrants, population_size))
+    if resume:
+        rng.setstate(resume["rng_state"])
+        rng_states = resume["island_rng_states"]
+        # populasi gabungan dipotong lagi per pulau
+        populations = []
+        offset = 0
+        for size in resume["island_sizes"]:
+            populations.append(resume["population"][offset:offset + size])
+            offset += size
+        island_best = resume["island_best"]
+        cache_stats = resume["cache_stats"]
+        best_solution = resume["best_solution"]
+        best_fitness = resume["best_fitness"]
+        done = resume["generation"]
+    else:
+        rng_states = [random.Random(rng.getrandbits(64)).getstate() for _ in range(islands)]
+        populations = [None] * islands
+        island_best = [float('inf')] * islands
+        cache_stats = {}
+        best_solution = None
+        best_fitness = float('inf')
+        done = 0
+    scores = [None] * islands
+    with ProcessPoolExecutor(
+        max_workers=islands,
+        initializer=_init_island,
+        initargs=(problem, penalties, init, evolve),
+    ) as executor:
+        while True:
+            epoch = max(0, min(migration_interval, generations - done))
+            futures = [
+                executor.submit(_run_epoch, populations[i], population_size, rng_states[i], epoch, mutation_prob)
+                for i in range(islands)
+            ]
+            for i, future in enumerate(futures):
+                population, population_scores, solution, fitness, state, pid, stats = future.result()
+                populations[i] = population
+                scores[i] = population_scores
+                rng_states[i] = state
+                cache_stats[str(pid)] = stats
+                island_best[i] = min(island_best[i], fitness)
+                if fitness < best_fitness:
+                    best_solution = solution
+                    best_fitness = fitness
+            done += epoch
+            progress.update(
+                phase="ga", generation=done, best_fitness=best_fitness, islands=list(island_best),
+                evaluations=done * population_size * islands,
+                constraints=lambda: fitness_components(best_solution, problem, penalties),
+            )
+
+            if best_fitness == 0 or done >= generations or deadline.expired():
+                break
+            if migrants:
+                _migrate(populations, scores, migrants)
+            if checkpointer.due():
+                checkpointer.save(
+                    phase="ga", generation=done,
+                    population=[solution for population in populations for solution in population],
+                    island_sizes=[len(population) for population in populations],
+                    island_rng_states=rng_states, island_best=island_best, cache_stats=cache_stats,
+                    best_solution=best_solution, best_fitness=best_fitness, rng_state=rng.getstate(),
+                )
+
+    hits = sum(stats["hits"] for stats in cache_stats.values())
+    misses = sum(stats["misses"] for stats in cache_stats.values())
+    report = {
+        "islands": island_best,
+        "elite": elite_solutions(
+            [(best_solution, best_fitness)]
+            + [item for population, population_scores in zip(populations, scores) for item in zip(population, population_scores)],
+            elite,
+        ),
+        "generations": done,
+        "fitness_cache": {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "size": sum(stats["size"] for stats in cache_stats.values()),
+        },
+    }
+    return best_solution, best_fitness, report
@@ -0,0 +1,65 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+from solver.batch import BatchEvaluator
+from solver.problem import CompiledProblem
+
+# evaluator milik proses worker, dibangun sekali waktu pool start
+_worker_evaluator = None
+
+
+def _init_worker(problem: CompiledProblem, penalties):
+    global _worker_evaluator
+    _worker_evaluator = BatchEvaluator(problem, penalties)
+
+
+def _score_chunk(chunk):
+    return _worker_evaluator.evaluate_population(chunk)
+
+
+class ParallelEvaluator:
+    """
+    Evaluasi fitness populasi dibagi ke beberapa proses.
+
+    Data problem + penalti dikirim sekali lewat initializer pool; tiap
+    panggilan cuma kirim potongan populasi. Urutan hasil selalu sama
+    dengan urutan input, jadi hasil run tidak tergantung jumlah worker.
+    Interface-nya sama dengan `BatchEvaluator.evaluate_population`.
+    """
+
+    def __init__(self, problem: CompiledProblem, penalties, workers: int):
+        self.workers = max(1, workers)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(problem, penalties),
+        )
+
+    def evaluate_population(self, population):
+        if not population:
+            return []
+        chunk_size = -(-len(population) // self.workers)
+        chunks = [population[i:i + chunk_size] for i in range(0, len(population), chunk_size)]
+        scores = []
+        for chunk_scores in self._executor.map(_score_chunk, chunks):
+            scores.extend(chunk_scores)
+        return scores
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+@contextmanager
+def population_evaluator(problem: CompiledProblem, penalties, workers: int = 1):
+    """`BatchEvaluator` biasa kalau workers <= 1, selain itu `ParallelEvaluator` (pool ditutup di akhir blok)."""
+    if workers and workers > 1:
+        with ParallelEvaluator(problem, penalties, workers) as evaluator:
+            yield evaluator
+    else:
+        yield BatchEvaluator(problem, penalties)
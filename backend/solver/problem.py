@@ -0,0 +1,355 @@
+from typing import Dict, List, Optional, Tuple
+
+# kode ruangan yang bisa dipakai dosen berkebutuhan khusus
+SPECIAL_NEEDS_GROUP_CODES = ("KHD2", "DS2")
+
+# sks efektif yang selalu dibuatkan index blok (P 3 sks = 6 slot)
+BLOCK_SKS = range(1, 7)
+
+
+class CompiledProblem:
+    """
+    Snapshot data penjadwalan yang sudah di-compile ke index integer.
+
+    Semua solver (GA, SA, hybrid) kerja di atas array ini, jadi di dalam
+    loop pencarian tidak ada lagi akses atribut ORM. Kelas, ruangan, slot
+    dan dosen dipetakan ke index 0..n-1; slot diurutkan (day_index, start_time)
+    sama seperti `fetch_data`.
+    """
+
+    def __init__(self):
+        self.class_ids: List[int] = []
+        self.room_ids: List[int] = []
+        self.slot_ids: List[int] = []
+        self.lecturer_ids: List[int] = []
+
+        self.class_index: Dict[int, int] = {}
+        self.room_index: Dict[int, int] = {}
+        self.slot_index: Dict[int, int] = {}
+        self.lecturer_index: Dict[int, int] = {}
+
+        # per kelas
+        self.class_sks: List[int] = []          # effective sks (P = sks * 2)
+        self.class_base_sks: List[int] = []     # sks mentah dari mata kuliah
+        self.class_type: List[str] = []         # tipe_mk
+        self.class_program: List[Optional[int]] = []  # program_studi_id mata kuliah
+        self.class_lecturers: List[Tuple[int, ...]] = []
+        self.class_rooms: List[List[int]] = []  # ruangan dengan tipe_ruangan == tipe_mk
+        self.class_jabatan: List[int] = []      # jumlah dosen yang punya jabatan
+        self.class_special: List[int] = []      # jumlah dosen berkebutuhan khusus
+        # preferensi disimpan sebagai bitmask int: bit s nyala = slot index s
+        self.class_pref_high: List[List[int]] = []     # slot terlarang (high priority), per dosen
+        self.class_pref_general: List[List[int]] = []  # slot yang diminta (used_preference), per dosen
+        self.class_pref_any: List[List[int]] = []      # semua slot preferensi, per dosen
+        self.class_pref_starts: List[int] = []         # start yang bloknya kena preferensi semua dosen
+
+        # per ruangan
+        self.room_type: List[str] = []
+        self.room_special_ok: List[bool] = []
+        self.room_building: List[Optional[str]] = []  # gedung
+        self.room_classes: List[Tuple[int, ...]] = []  # kelas yang tipe_mk-nya cocok dengan ruangan ini
+
+        # per slot
+        self.slot_day: List[int] = []
+        self.slot_follows: List[bool] = []  # slot ini boleh nyambung dari slot sebelumnya
+        self.slot_touches: List[bool] = []  # start_time == end_time slot sebelumnya
+
+        # spans[sks][start] -> (cells, jumlah slot invalid, jumlah slot lintas hari)
+        self.spans: Dict[int, List[Tuple[Tuple[int, ...], int, int]]] = {}
+        self.span_masks: Dict[int, List[int]] = {}  # cells di atas sebagai bitmask
+
+        # graf konflik dosen format CSR, dibangun sekali per compile:
+        # - kelas lain yang berbagi dosen dengan kelas c:
+        #   conflict_indices[conflict_indptr[c]:conflict_indptr[c + 1]]
+        # - kelas yang diajar dosen l (satu klik di graf konflik):
+        #   lecturer_class_indices[lecturer_class_indptr[l]:lecturer_class_indptr[l + 1]]
+        self.conflict_indptr: List[int] = [0]
+        self.conflict_indices: List[int] = []
+        self.lecturer_class_indptr: List[int] = [0]
+        self.lecturer_class_indices: List[int] = []
+
+        # start index yang potongan sks slot-nya sah: hari sama, id urut, ga kepotong istirahat
+        self.block_starts: Dict[int, Tuple[int, ...]] = {}
+        self.block_starts_no_monday: Dict[int, Tuple[int, ...]] = {}  # buat kelas dosen berjabatan
+        self.tight_block_starts: Dict[int, Tuple[int, ...]] = {}      # + jam start/end nyambung
+
+    @property
+    def n_classes(self):
+        return len(self.class_ids)
+
+    @property
+    def n_rooms(self):
+        return len(self.room_ids)
+
+    @property
+    def n_slots(self):
+        return len(self.slot_ids)
+
+    @property
+    def n_lecturers(self):
+        return len(self.lecturer_ids)
+
+    def conflicts_of(self, c):
+        """Kelas lain yang berbagi dosen dengan kelas `c`."""
+        return self.conflict_indices[self.conflict_indptr[c]:self.conflict_indptr[c + 1]]
+
+    def classes_of(self, lecturer):
+        """Kelas yang diajar dosen index `lecturer`."""
+        return self.lecturer_class_indices[self.lecturer_class_indptr[lecturer]:self.lecturer_class_indptr[lecturer + 1]]
+
+
+def slot_mask(slots):
+    """Bitmask int dari kumpulan slot index."""
+    mask = 0
+    for s in slots:
+        mask |= 1 << s
+    return mask
+
+
+def popcount(mask):
+    return bin(mask).count("1")
+
+
+def mask_slots(mask):
+    """Kebalikan `slot_mask`: list slot index yang bit-nya nyala."""
+    slots = []
+    s = 0
+    while mask:
+        if mask & 1:
+            slots.append(s)
+        mask >>= 1
+        s += 1
+    return slots
+
+
+def _preferred_starts(pref_any, sks, n_slots):
+    # bit start s nyala kalau blok s..s+sks-1 kena minimal satu slot preferensi tiap dosen
+    starts = (1 << n_slots) - 1
+    for preferred in pref_any:
+        touched = 0
+        for i in range(sks):
+            touched |= preferred >> i
+        starts &= touched
+    return starts
+
+
+def _build_spans(problem: CompiledProblem, sks: int):
+    """
+    Sel slot yang ditempati kelas `sks` slot kalau mulai di tiap start index.
+
+    Mengikuti aturan `check_conflicts`: slot berikutnya dicari lewat id + i,
+    id yang tidak ada dihitung invalid dan yang beda hari dihitung lintas hari.
+    """
+    spans = []
+    for start in range(problem.n_slots):
+        start_id = problem.slot_ids[start]
+        start_day = problem.slot_day[start]
+        cells = []
+        invalid = 0
+        cross_day = 0
+        for i in range(sks):
+            cell = problem.slot_index.get(start_id + i)
+            if cell is None:
+                invalid += 1
+            elif problem.slot_day[cell] != start_day:
+                cross_day += 1
+            else:
+                cells.append(cell)
+        spans.append((tuple(cells), invalid, cross_day))
+    return spans
+
+
+def _build_block_starts(problem: CompiledProblem, sks: int, tight: bool = False):
+    starts = []
+    for start in range(problem.n_slots - sks + 1):
+        if all(
+            problem.slot_follows[t] and (not tight or problem.slot_touches[t])
+            for t in range(start + 1, start + sks)
+        ):
+            starts.append(start)
+    return tuple(starts)
+
+
+def _build_class_graphs(problem: CompiledProblem):
+    """Graf konflik dosen (CSR), kelas per dosen dan kelas per ruangan dari data per kelas."""
+    lecturer_classes = [[] for _ in range(problem.n_lecturers)]
+    for c, lecturers in enumerate(problem.class_lecturers):
+        for lecturer in dict.fromkeys(lecturers):
+            lecturer_classes[lecturer].append(c)
+    for classes in lecturer_classes:
+        problem.lecturer_class_indices.extend(classes)
+        problem.lecturer_class_indptr.append(len(problem.lecturer_class_indices))
+    for c, lecturers in enumerate(problem.class_lecturers):
+        neighbors = {d for lecturer in lecturers for d in problem.classes_of(lecturer)}
+        neighbors.discard(c)
+        problem.conflict_indices.extend(sorted(neighbors))
+        problem.conflict_indptr.append(len(problem.conflict_indices))
+
+    room_classes = [[] for _ in range(problem.n_rooms)]
+    for c, class_rooms in enumerate(problem.class_rooms):
+        for r in class_rooms:
+            room_classes[r].append(c)
+    problem.room_classes = [tuple(classes) for classes in room_classes]
+
+
+def compile_problem(
+    opened_classes, rooms, timeslots, opened_class_cache,
+    preferences_cache, dosen_cache, recess_times
+) -> CompiledProblem:
+    """Bangun `CompiledProblem` sekali dari hasil `fetch_data` + cache preferensi."""
+    problem = CompiledProblem()
+
+    sorted_slots = sorted(timeslots, key=lambda x: (x.day_index, x.start_time))
+    for idx, slot in enumerate(sorted_slots):
+        problem.slot_ids.append(slot.id)
+        problem.slot_index[slot.id] = idx
+        problem.slot_day.append(slot.day_index)
+        if idx == 0:
+            problem.slot_follows.append(False)
+            problem.slot_touches.append(False)
+            continue
+        prev = sorted_slots[idx - 1]
+        problem.slot_follows.append(
+            slot.day_index == prev.day_index
+            and slot.id == prev.id + 1
+            and slot.id not in recess_times
+        )
+        problem.slot_touches.append(slot.start_time == prev.end_time)
+
+    for idx, room in enumerate(rooms):
+        problem.room_ids.append(room.id)
+        problem.room_index[room.id] = idx
+        problem.room_type.append(room.tipe_ruangan)
+        problem.room_special_ok.append(room.group_code in SPECIAL_NEEDS_GROUP_CODES)
+        problem.room_building.append(room.gedung)
+
+    def slot_set(pref_info):
+        return slot_mask(
+            problem.slot_index[t] for t in pref_info.get("preferences", {}) if t in problem.slot_index
+        )
+
+    for idx, oc in enumerate(opened_classes):
+        class_info = opened_class_cache[oc.id]
+        tipe_mk = class_info["mata_kuliah"].tipe_mk
+        sks = class_info["sks"]
+
+        problem.class_ids.append(oc.id)
+        problem.class_index[oc.id] = idx
+        problem.class_base_sks.append(sks)
+        problem.class_sks.append(sks * 2 if tipe_mk == "P" else sks)
+        problem.class_type.append(tipe_mk)
+        problem.class_program.append(class_info["mata_kuliah"].program_studi_id)
+        problem.class_rooms.append([r for r, t in enumerate(problem.room_type) if t == tipe_mk])
+
+        lecturers = []
+        jabatan = 0
+        special = 0
+        pref_high = []
+        pref_general = []
+        pref_any = []
+        for dosen_id in class_info["dosen_ids"]:
+            if dosen_id not in problem.lecturer_index:
+                problem.lecturer_index[dosen_id] = len(problem.lecturer_ids)
+                problem.lecturer_ids.append(dosen_id)
+            lecturers.append(problem.lecturer_index[dosen_id])
+
+            dosen = dosen_cache.get(dosen_id)
+            if dosen and dosen.jabatan is not None:
+                jabatan += 1
+
+            pref_info = preferences_cache.get((oc.id, dosen_id))
+            if pref_info is None:
+                pref_any.append(0)
+                continue
+            slots = slot_set(pref_info)
+            pref_any.append(slots)
+            if pref_info.get("is_special_needs", False):
+                special += 1
+            if pref_info.get("is_high_priority", False):
+                pref_high.append(slots)
+            elif pref_info.get("used_preference", False):
+                pref_general.append(slots)
+
+        problem.class_lecturers.append(tuple(lecturers))
+        problem.class_jabatan.append(jabatan)
+        problem.class_special.append(special)
+        problem.class_pref_high.append(pref_high)
+        problem.class_pref_general.append(pref_general)
+        problem.class_pref_any.append(pref_any)
+        problem.class_pref_starts.append(_preferred_starts(pref_any, problem.class_sks[-1], problem.n_slots))
+
+    # base sks ikut dibuatkan span karena format jadwal GA masih pakai sks mentah
+    for sks in set(problem.class_sks) | set(problem.class_base_sks):
+        problem.spans[sks] = _build_spans(problem, sks)
+        problem.span_masks[sks] = [slot_mask(cells) for cells, _, _ in problem.spans[sks]]
+
+    for sks in set(problem.class_sks) | set(BLOCK_SKS):
+        starts = _build_block_starts(problem, sks)
+        problem.block_starts[sks] = starts
+        problem.block_starts_no_monday[sks] = tuple(s for s in starts if problem.slot_day[s] != 0)
+        problem.tight_block_starts[sks] = _build_block_starts(problem, sks, tight=True)
+
+    _build_class_graphs(problem)
+    return problem
+
+
+# field per kelas yang ikut dipotong di `sub_problem`
+_CLASS_FIELDS = (
+    "class_ids", "class_sks", "class_base_sks", "class_type", "class_program", "class_lecturers",
+    "class_jabatan", "class_special", "class_pref_high", "class_pref_general", "class_pref_any",
+    "class_pref_starts",
+)
+
+
+def sub_problem(problem: CompiledProblem, classes, class_rooms=None) -> CompiledProblem:
+    """
+    `CompiledProblem` yang cuma berisi kelas `classes` (index di `problem`),
+    dipakai solve per cluster. Index ruangan, slot dan dosen tetap sama
+    dengan `problem`, kelas di-index ulang 0..len(classes)-1 sesuai urutan
+    `classes`. `class_rooms` (opsional, sejajar `classes`) membatasi
+    ruangan yang boleh dipakai tiap kelas.
+    """
+    sub = CompiledProblem()
+    for name, value in vars(problem).items():
+        if name in _CLASS_FIELDS:
+            value = [value[c] for c in classes]
+        elif name in ("class_index", "class_rooms", "room_classes") or name.startswith(("conflict_", "lecturer_class_")):
+            continue
+        setattr(sub, name, value)
+    sub.class_index = {oc_id: idx for idx, oc_id in enumerate(sub.class_ids)}
+    # span cuma untuk sks yang ada di sub-problem, sama seperti `compile_problem`
+    used_sks = set(sub.class_sks) | set(sub.class_base_sks)
+    sub.spans = {sks: spans for sks, spans in problem.spans.items() if sks in used_sks}
+    sub.span_masks = {sks: masks for sks, masks in problem.span_masks.items() if sks in used_sks}
+    sub.class_rooms = [list(rooms) for rooms in class_rooms] if class_rooms is not None else [problem.class_rooms[c] for c in classes]
+    _build_class_graphs(sub)
+    return sub
+
+
+def decode_solution(problem: CompiledProblem, solution):
+    """Ubah solusi index (class, room, slot) balik ke (opened_class_id, room_id, timeslot_id)."""
+    return [
+        (problem.class_ids[c], problem.room_ids[r], problem.slot_ids[s])
+        for c, r, s in solution
+    ]
+
+
+def block_slot_ids(problem: CompiledProblem, sks, start_timeslot_id):
+    """Timeslot id yang ditempati kelas `sks` slot mulai `start_timeslot_id` (pakai `spans`)."""
+    start = problem.slot_index.get(start_timeslot_id)
+    if start is None:
+        raise ValueError(f"Invalid timeslot ID: {start_timeslot_id}")
+    cells, invalid, cross_day = problem.spans[sks][start]
+    if invalid:
+        raise ValueError(f"Invalid timeslot ID: {start_timeslot_id + len(cells)}")
+    if cross_day:
+        raise ValueError(f"Timeslots cross days starting at {start_timeslot_id}")
+    return [problem.slot_ids[cell] for cell in cells]
+
+
+def encode_solution(problem: CompiledProblem, solution):
+    """Kebalikan `decode_solution`."""
+    return [
+        (problem.class_index[oc_id], problem.room_index[room_id], problem.slot_index[ts_id])
+        for oc_id, room_id, ts_id in solution
+    ]
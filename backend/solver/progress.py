@@ -0,0 +1,74 @@
+import time
+
+# jarak minimal antar publish progress (detik); update di antaranya digabung
+PROGRESS_INTERVAL = 0.5
+
+
+class JobCancelled(Exception):
+    """Dilempar dari `ProgressReporter.update` kalau job diminta berhenti."""
+
+
+class ProgressReporter:
+    """
+    Tempat solver melaporkan progress (phase, generation, temperature,
+    best_fitness, ...). Default-nya no-op; runner job menggantinya dengan
+    reporter yang menulis ke state bersama dan melempar `JobCancelled`
+    kalau job dibatalkan, jadi solver cukup memanggil `update()` sekali
+    per generasi / level temperatur.
+    """
+
+    def update(self, **fields):
+        pass
+
+
+class ThrottledProgress(ProgressReporter):
+    """
+    Reporter yang menggabungkan update dan baru `publish()` paling cepat
+    tiap `interval` detik (atau langsung kalau phase berganti), supaya loop
+    SA yang cepat tidak membanjiri channel.
+
+    Field yang nilainya callable (mis. `constraints=lambda: ...`) baru
+    dievaluasi saat publish. Kalau solver mengirim `evaluations` (kumulatif
+    per phase), hasil publish ditambah `evals_per_sec`.
+    """
+
+    def __init__(self, interval=PROGRESS_INTERVAL):
+        self.interval = interval
+        self._pending = {}
+        self._phase = None
+        self._published_at = 0.0
+        self._last_update = None
+        self._rate_base = None  # (waktu, evaluations) publish sebelumnya
+
+    def update(self, **fields):
+        now = time.time()
+        phase = fields.get("phase", self._phase)
+        if phase != self._phase:
+            # phase baru: field lama dibuang, hitungan evaluasi mulai dari update sebelumnya
+            self._pending = {}
+            self._rate_base = (self._last_update or now, 0)
+            self._phase = phase
+        elif now - self._published_at < self.interval:
+            self._pending.update(fields)
+            self._last_update = now
+            return
+        self._pending.update(fields)
+        self._last_update = now
+        self._published_at = now
+
+        snapshot = {key: value() if callable(value) else value for key, value in self._pending.items()}
+        evaluations = snapshot.get("evaluations")
+        if evaluations is not None:
+            since, done = self._rate_base
+            if now > since:
+                snapshot["evals_per_sec"] = round((evaluations - done) / (now - since), 1)
+            self._rate_base = (now, evaluations)
+        snapshot["updated_at"] = now
+        self._pending = {}
+        self.publish(snapshot)
+
+    def publish(self, fields):
+        pass
+
+
+NULL_PROGRESS = ProgressReporter()
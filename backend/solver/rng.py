@@ -0,0 +1,11 @@
+import random
+
+
+def make_rng(seed=None):
+    """
+    RNG per run. Tanpa `seed`, seed-nya diambil acak lalu ikut dikembalikan
+    supaya run mana pun bisa diulang persis. Return (rng, seed).
+    """
+    if seed is None:
+        seed = random.SystemRandom().randrange(2 ** 32)
+    return random.Random(seed), seed
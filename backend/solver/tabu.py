@@ -0,0 +1,131 @@
+import random
+
+from solver.budget import NO_DEADLINE
+from solver.delta import IncrementalEvaluator
+from solver.fitness import fitness_components
+from solver.problem import CompiledProblem
+from solver.progress import NULL_PROGRESS
+
+# default parameter tabu search
+TABU_TENURE = 15
+TABU_CANDIDATES = 40
+# kelas yang sedang melanggar dipilih dengan peluang ini, sisanya kelas acak
+CONFLICT_FOCUS = 0.8
+
+
+def _sample_moves(evaluator: IncrementalEvaluator, gene_of, candidates, rng):
+    """Ambil sampel move (idx, room, start) yang benar-benar memindahkan kelas, tanpa duplikat."""
+    problem = evaluator.problem
+    solution = evaluator.solution
+    moves = set()
+    for _ in range(candidates * 2):
+        if len(moves) >= candidates:
+            break
+        # kelas melanggar di-update evaluator dari move sebelumnya, tidak discan ulang
+        target = evaluator.sample_violation(rng) if rng.random() < CONFLICT_FOCUS else None
+        if target is not None:
+            idx = gene_of[target]
+        else:
+            idx = rng.randrange(len(solution))
+        c, room, start = solution[idx]
+        rooms = problem.class_rooms[c]
+        starts = problem.tight_block_starts[problem.class_sks[c]]
+        if not rooms or not starts:
+            continue
+        move = (idx, rng.choice(rooms), rng.choice(starts))
+        if move[1:] != (room, start):
+            moves.add(move)
+    return sorted(moves)
+
+
+def tabu_search(
+    problem: CompiledProblem,
+    penalties,
+    initial_solution,
+    max_iterations: int,
+    tenure: int = TABU_TENURE,
+    candidates: int = TABU_CANDIDATES,
+    progress=NULL_PROGRESS,
+    deadline=NO_DEADLINE,
+    rng=random,
+):
+    """
+    Tabu search di atas model fitness yang sama dengan GA/SA.
+
+    Tiap iterasi: ambil `candidates` move acak (kebanyakan dari kelas yang
+    sedang bentrok/kena penalti), nilai semuanya pakai `IncrementalEvaluator`
+    (apply lalu undo), lalu ambil move terbaik yang tidak tabu — walaupun
+    lebih jelek dari sekarang. Posisi lama (kelas, ruangan, slot) dari kelas
+    yang dipindah jadi tabu selama `tenure` iterasi; move tabu tetap boleh
+    kalau menghasilkan best baru (aspirasi). Berhenti kalau fitness 0,
+    `max_iterations` habis, atau `deadline` lewat.
+    Return (best_solution, best_fitness, report).
+    """
+    evaluator = IncrementalEvaluator(problem, penalties, initial_solution)
+    gene_of = {c: idx for idx, (c, _, _) in enumerate(evaluator.solution)}
+    best_solution = evaluator.solution.copy()
+    best_fitness = start_fitness = evaluator.score
+
+    tabu_until = {}  # (kelas, ruangan, start) -> iterasi terakhir posisi itu masih tabu
+    evaluations = tabu_rejected = aspirations = 0
+    improved_at = 0
+    stopped = "iterations"
+    iteration = 0
+    while iteration < max_iterations:
+        if best_fitness == 0:
+            stopped = "optimal"
+            break
+        if deadline.expired():
+            stopped = "deadline"
+            break
+        iteration += 1
+
+        current = evaluator.score
+        chosen = None
+        chosen_score = float('inf')
+        chosen_aspiration = False
+        for idx, room, start in _sample_moves(evaluator, gene_of, candidates, rng):
+            c, old_room, old_start = evaluator.solution[idx]
+            score = current + evaluator.move(idx, room, start)
+            evaluator.move(idx, old_room, old_start)
+            evaluations += 1
+
+            is_tabu = tabu_until.get((c, room, start), 0) >= iteration
+            if is_tabu and score >= best_fitness:
+                tabu_rejected += 1
+                continue
+            if score < chosen_score:
+                chosen = (idx, room, start)
+                chosen_score = score
+                chosen_aspiration = is_tabu
+
+        if chosen is None:
+            continue
+        idx, room, start = chosen
+        c, old_room, old_start = evaluator.solution[idx]
+        evaluator.move(idx, room, start)
+        # jangan balik ke posisi lama selama `tenure` iterasi
+        tabu_until[(c, old_room, old_start)] = iteration + tenure
+        aspirations += chosen_aspiration
+
+        if evaluator.score < best_fitness:
+            best_solution = evaluator.solution.copy()
+            best_fitness = evaluator.score
+            improved_at = iteration
+
+        progress.update(
+            phase="tabu", iteration=iteration, best_fitness=best_fitness,
+            current_fitness=evaluator.score, evaluations=evaluations,
+            constraints=lambda: fitness_components(best_solution, problem, penalties),
+        )
+
+    report = {
+        "iterations": iteration,
+        "evaluations": evaluations,
+        "start_fitness": start_fitness,
+        "best_found_at": improved_at,
+        "tabu_rejected": tabu_rejected,
+        "aspirations": aspirations,
+        "stopped": "optimal" if best_fitness == 0 else stopped,
+    }
+    return best_solution, best_fitness, report
@@ -0,0 +1,310 @@
+import itertools
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+
+from solver.budget import NO_DEADLINE
+from solver.cooling import CoolingSchedule
+from solver.delta import IncrementalEvaluator
+from solver.fitness import fitness_components
+from solver.problem import CompiledProblem
+from solver.progress import NULL_PROGRESS
+
+SA_MODES = ("single", "tempering", "multistart")
+
+# state milik proses worker, diisi sekali lewat initializer pool
+_chain = {}
+
+
+def _init_chain(problem: CompiledProblem, penalties, neighbor):
+    _chain["problem"] = problem
+    _chain["penalties"] = penalties
+    _chain["neighbor"] = neighbor
+
+
+def _metropolis_steps(evaluator: IncrementalEvaluator, neighbor, temperature, iterations, best_solution, best_fitness, rng):
+    """Jalankan `iterations` langkah Metropolis di satu temperatur."""
+    problem = evaluator.problem
+    accepted = attempted = 0
+    for _ in range(iterations):
+        move = neighbor(evaluator.solution, problem, rng=rng)
+        if move is None:
+            continue
+        attempted += 1
+        idx, new_room, new_start = move
+        _, old_room, old_start = evaluator.solution[idx]
+        delta_fitness = evaluator.move(idx, new_room, new_start)
+
+        new_fitness = evaluator.score
+        if new_fitness < best_fitness:
+            best_solution = evaluator.solution.copy()
+            best_fitness = new_fitness
+            if best_fitness == 0:
+                accepted += 1
+                break
+
+        if delta_fitness <= 0 or rng.random() < math.exp(-delta_fitness / temperature):
+            accepted += 1
+        else:
+            evaluator.move(idx, old_room, old_start)
+    return accepted, attempted, best_solution, best_fitness
+
+
+class _Replica:
+    """
+    Satu chain tempering. Evaluator, RNG dan best-nya hidup terus sepanjang
+    run (di proses worker-nya sendiri), jadi tiap potongan cuma terima
+    temperatur dan jumlah langkah.
+    """
+
+    def __init__(self, problem: CompiledProblem, penalties, neighbor, solution, rng_state):
+        self.neighbor = neighbor
+        self.rng = random.Random()
+        self.rng.setstate(rng_state)
+        self.evaluator = IncrementalEvaluator(problem, penalties, solution)
+        self.best_solution = self.evaluator.solution.copy()
+        self.best_fitness = self.evaluator.score
+
+    def run(self, temperature, iterations):
+        """
+        Jalan `iterations` langkah di `temperature`. Return (score sekarang,
+        best baru atau None kalau tidak membaik, best fitness, accepted, attempted).
+        """
+        best_before = self.best_fitness
+        accepted, attempted, self.best_solution, self.best_fitness = _metropolis_steps(
+            self.evaluator, self.neighbor, temperature, iterations, self.best_solution, self.best_fitness, self.rng
+        )
+        improved = self.best_solution if self.best_fitness < best_before else None
+        return self.evaluator.score, improved, self.best_fitness, accepted, attempted
+
+
+def _init_replica(problem: CompiledProblem, penalties, neighbor, solution, rng_state):
+    _chain["replica"] = _Replica(problem, penalties, neighbor, solution, rng_state)
+
+
+def _run_replica(temperature, iterations):
+    return _chain["replica"].run(temperature, iterations)
+
+
+def _run_annealing(solution, rng_state, schedule: CoolingSchedule, iterations_per_temp):
+    # satu chain multi-start: jadwal pendinginan penuh seperti SA biasa
+    rng = random.Random()
+    rng.setstate(rng_state)
+    evaluator = IncrementalEvaluator(_chain["problem"], _chain["penalties"], solution)
+    best_solution = evaluator.solution.copy()
+    best_fitness = start_fitness = evaluator.score
+    accepted = attempted = 0
+    while schedule.active:
+        level_accepted, level_attempted, best_solution, best_fitness = _metropolis_steps(
+            evaluator, _chain["neighbor"], schedule.temperature, iterations_per_temp, best_solution, best_fitness, rng
+        )
+        accepted += level_accepted
+        attempted += level_attempted
+        if best_fitness == 0:
+            break
+        schedule.step(level_accepted, level_attempted, best_fitness)
+    return best_solution, best_fitness, start_fitness, accepted, attempted, schedule.report()
+
+
+def cooling_levels(initial_temperature, cooling_rate):
+    """Jumlah level temperatur yang dilewati SA biasa (`while temperature > 1`)."""
+    if initial_temperature <= 1:
+        return 0
+    if not 0 < cooling_rate < 1:
+        raise ValueError("cooling_rate harus di antara 0 dan 1")
+    levels = 0
+    temperature = initial_temperature
+    while temperature > 1:
+        levels += 1
+        temperature *= cooling_rate
+    return levels
+
+
+def _acceptance_rate(accepted, attempted):
+    return round(accepted / attempted, 4) if attempted else 0.0
+
+
+def _chain_pool(problem, penalties, neighbor, replicas):
+    return ProcessPoolExecutor(
+        max_workers=replicas,
+        initializer=_init_chain,
+        initargs=(problem, penalties, neighbor),
+    )
+
+
+def parallel_tempering(
+    problem: CompiledProblem,
+    penalties,
+    neighbor,
+    starts,
+    replicas: int,
+    initial_temperature: float,
+    cooling_rate: float,
+    iterations_per_temp: int,
+    swap_interval: int,
+    progress=NULL_PROGRESS,
+    deadline=NO_DEADLINE,
+    rng=random,
+):
+    """
+    Parallel tempering: `replicas` chain di temperatur tetap (geometris dari
+    `initial_temperature` turun ke 1), tiap chain di proses worker-nya
+    sendiri yang hidup sepanjang run (1 replika = jalan di proses ini).
+
+    Tiap `swap_interval` langkah, pasangan temperatur bertetangga (genap/ganjil
+    bergantian) tukar replika pakai kriteria Metropolis. Yang ditukar cuma
+    temperaturnya; solusi, evaluator dan RNG tetap di replikanya, jadi tiap
+    ronde yang dikirim ke worker cuma temperatur + jumlah langkah.
+    Total langkah per replika sama dengan SA biasa dengan parameter
+    pendinginan yang sama; kalau ada `deadline`, ronde jalan terus sampai
+    deadline habis.
+    `neighbor(solution, problem, rng=...)` harus fungsi top-level yang return
+    (idx, room, start) atau None. Return (best_solution, best_fitness, report).
+    """
+    replicas = max(1, replicas)
+    swap_interval = max(1, swap_interval)
+    if replicas > 1:
+        temperatures = [initial_temperature ** (1 - k / (replicas - 1)) for k in range(replicas)]
+    else:
+        temperatures = [initial_temperature]
+    if deadline.limited:
+        total_steps = None
+        rounds = itertools.count()
+    else:
+        total_steps = cooling_levels(initial_temperature, cooling_rate) * iterations_per_temp
+        rounds = range(max(1, -(-total_steps // swap_interval)))
+
+    rng_states = [random.Random(rng.getrandbits(64)).getstate() for _ in range(replicas)]
+    # ladder[k] = replika yang sedang di temperatur ke-k
+    ladder = list(range(replicas))
+    scores = [None] * replicas
+    accepted = [0] * replicas
+    attempted = [0] * replicas
+    replica_best = [float('inf')] * replicas
+    swaps_accepted = swaps_attempted = 0
+
+    best_solution = None
+    best_fitness = float('inf')
+    with ExitStack() as stack:
+        if replicas == 1:
+            chain = _Replica(problem, penalties, neighbor, list(starts[0]), rng_states[0])
+        else:
+            # satu pool 1-proses per replika: state replika nempel di proses itu
+            pools = [
+                stack.enter_context(ProcessPoolExecutor(
+                    max_workers=1,
+                    initializer=_init_replica,
+                    initargs=(problem, penalties, neighbor, list(starts[r % len(starts)]), rng_states[r]),
+                ))
+                for r in range(replicas)
+            ]
+        for round_idx in rounds:
+            if total_steps is None:
+                iterations = swap_interval
+            else:
+                iterations = min(swap_interval, total_steps - round_idx * swap_interval) if total_steps else 0
+            if replicas == 1:
+                results = [chain.run(temperatures[0], iterations)]
+            else:
+                futures = [pools[r].submit(_run_replica, temperatures[k], iterations) for k, r in enumerate(ladder)]
+                results = [future.result() for future in futures]
+            for k, (score, improved, fitness_best, n_accepted, n_attempted) in enumerate(results):
+                r = ladder[k]
+                scores[r] = score
+                accepted[k] += n_accepted
+                attempted[k] += n_attempted
+                replica_best[r] = fitness_best
+                if improved is not None and fitness_best < best_fitness:
+                    best_solution = improved
+                    best_fitness = fitness_best
+            if best_solution is None:
+                # belum ada move yang membaik: best = start terbaik
+                best_fitness = min(replica_best)
+                best_solution = list(starts[replica_best.index(best_fitness) % len(starts)])
+            done = (round_idx + 1) * swap_interval
+            if total_steps is not None:
+                done = min(total_steps, done)
+            progress.update(
+                phase="sa", iteration=done, replicas=replicas,
+                best_fitness=best_fitness, current_fitness=min(scores),
+                evaluations=done * replicas,
+                constraints=lambda: fitness_components(best_solution, problem, penalties),
+            )
+            if best_fitness == 0 or deadline.expired():
+                break
+
+            # swap temperatur antar replika di temperatur bertetangga
+            for k in range(round_idx % 2, replicas - 1, 2):
+                swaps_attempted += 1
+                a, b = ladder[k], ladder[k + 1]
+                exponent = (1 / temperatures[k] - 1 / temperatures[k + 1]) * (scores[a] - scores[b])
+                if exponent >= 0 or rng.random() < math.exp(exponent):
+                    swaps_accepted += 1
+                    ladder[k], ladder[k + 1] = b, a
+
+    report = {
+        "mode": "tempering",
+        "replicas": [
+            {
+                "temperature": round(temperatures[k], 4),
+                "acceptance_rate": _acceptance_rate(accepted[k], attempted[k]),
+                # best replika yang ada di temperatur ini waktu run selesai
+                "best_fitness": replica_best[ladder[k]],
+            }
+            for k in range(replicas)
+        ],
+        "swap_acceptance_rate": _acceptance_rate(swaps_accepted, swaps_attempted),
+    }
+    return best_solution, best_fitness, report
+
+
+def multi_start(
+    problem: CompiledProblem,
+    penalties,
+    neighbor,
+    starts,
+    replicas: int,
+    schedule: CoolingSchedule,
+    iterations_per_temp: int,
+    progress=NULL_PROGRESS,
+    rng=random,
+):
+    """
+    Multi-start SA: `replicas` chain independen (start dari `starts`, diputar
+    kalau kurang) dengan jadwal pendinginan yang sama, ambil yang terbaik.
+    Tiap chain dapat salinan `schedule` sendiri (ikut ter-pickle ke worker),
+    termasuk deadline-nya. Return (best_solution, best_fitness, report).
+    """
+    replicas = max(1, replicas)
+    rng_states = [random.Random(rng.getrandbits(64)).getstate() for _ in range(replicas)]
+    with _chain_pool(problem, penalties, neighbor, replicas) as executor:
+        futures = [
+            executor.submit(
+                _run_annealing, list(starts[k % len(starts)]), rng_states[k], schedule, iterations_per_temp
+            )
+            for k in range(replicas)
+        ]
+        results = []
+        for future in futures:
+            results.append(future.result())
+            progress.update(
+                phase="sa", replicas=replicas, replicas_done=len(results),
+                best_fitness=min(result[1] for result in results),
+                constraints=lambda: fitness_components(min(results, key=lambda r: r[1])[0], problem, penalties),
+            )
+
+    best_solution = None
+    best_fitness = float('inf')
+    replica_report = []
+    for solution, fitness, start_fitness, n_accepted, n_attempted, cooling in results:
+        if fitness < best_fitness:
+            best_solution = solution
+            best_fitness = fitness
+        replica_report.append({
+            "start_fitness": start_fitness,
+            "acceptance_rate": _acceptance_rate(n_accepted, n_attempted),
+            "best_fitness": fitness,
+            "cooling": cooling,
+        })
+    return best_solution, best_fitness, {"mode": "multistart", "replicas": replica_report}
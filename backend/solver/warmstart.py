@@ -0,0 +1,79 @@
+from solver.delta import IncrementalEvaluator
+from solver.problem import CompiledProblem
+
+
+def seed_from_timetable(problem: CompiledProblem, rows):
+    """
+    Ambil posisi kelas dari baris timetable yang sudah ada.
+
+    `rows` berisi (opened_class_id, ruangan_id, timeslot_ids). Baris yang
+    sudah tidak cocok dengan data sekarang (kelas/ruangan hilang, tipe
+    ruangan beda, sks berubah, slot hilang) dilewati, begitu juga baris
+    kedua untuk kelas yang sama. Return dict class index -> (room, start).
+    """
+    seeded = {}
+    for opened_class_id, room_id, timeslot_ids in rows:
+        c = problem.class_index.get(opened_class_id)
+        r = problem.room_index.get(room_id)
+        if c is None or r is None or c in seeded or not timeslot_ids:
+            continue
+        if r not in problem.class_rooms[c]:
+            continue
+        start = problem.slot_index.get(timeslot_ids[0])
+        if start is None:
+            continue
+        cells, invalid, cross_day = problem.spans[problem.class_sks[c]][start]
+        if invalid or cross_day or [problem.slot_ids[cell] for cell in cells] != list(timeslot_ids):
+            continue
+        seeded[c] = (r, start)
+    return seeded
+
+
+def place_greedy(evaluator: IncrementalEvaluator, indices):
+    """Taruh tiap gen di `indices` ke (ruangan, start) yang skornya paling kecil, satu per satu."""
+    problem = evaluator.problem
+    for idx in indices:
+        c, room, start = evaluator.solution[idx]
+        best = (evaluator.score, room, start)
+        for r in problem.class_rooms[c]:
+            for s in problem.block_starts[problem.class_sks[c]]:
+                evaluator.move(idx, r, s)
+                if evaluator.score < best[0]:
+                    best = (evaluator.score, r, s)
+        evaluator.move(idx, best[1], best[2])
+
+
+def warm_start(problem: CompiledProblem, penalties, rows):
+    """
+    Solusi awal dari timetable lama untuk re-optimasi inkremental.
+
+    Kelas yang posisinya masih sah dipakai apa adanya; kelas baru/berubah
+    ditaruh greedy. Yang boleh digeser (`movable`, index gen) cuma kelas
+    baru/berubah plus kelas yang sekarang kena konflik atau penalti soft,
+    sisanya dipin. Return (solution, movable, report).
+    """
+    seeded = seed_from_timetable(problem, rows)
+    solution = []
+    new = []
+    # urutan gen sama seperti initialize_population: sks besar duluan
+    for c in sorted(range(problem.n_classes), key=lambda c: problem.class_sks[c], reverse=True):
+        starts = problem.block_starts[problem.class_sks[c]]
+        if c in seeded:
+            solution.append((c,) + seeded[c])
+        elif problem.class_rooms[c] and starts:
+            new.append(len(solution))
+            solution.append((c, problem.class_rooms[c][0], starts[0]))
+
+    evaluator = IncrementalEvaluator(problem, penalties, solution)
+    place_greedy(evaluator, new)
+    violating = evaluator.violations()
+    movable = sorted(
+        set(new) | {idx for idx, (c, _, _) in enumerate(evaluator.solution) if c in violating}
+    )
+    report = {
+        "seeded": len(seeded),
+        "new": len(new),
+        "reoptimized": len(movable),
+        "pinned": len(solution) - len(movable),
+    }
+    return evaluator.solution, movable, report
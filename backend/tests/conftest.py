@@ -0,0 +1,136 @@
+import os
+import random
+import sys
+from datetime import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from solver.construct import dsatur_solution, gene_order  # noqa: E402
+from solver.problem import compile_problem  # noqa: E402
+
+# bobot penalti sama dengan GA_PENALTIES, SA_PENALTIES dan default penalty_params
+# hybrid (routes/*); ditulis ulang di sini biar test tidak perlu koneksi DB
+PENALTY_SETS = {
+    "ga": {
+        "invalid_timeslot": 500, "cross_day": 500, "room_conflict": 70, "lecturer_conflict": 50,
+        "conflict_multiplier": 1000, "soft_on_conflict": False, "wrong_room": 1000,
+        "wrong_room_types": ("P", "T"), "special_needs": 1000, "daily_load": 0,
+        "high_priority_preference": 800, "general_preference": 200, "jabatan": 10000,
+    },
+    "sa": {
+        "invalid_timeslot": 20, "cross_day": 20, "room_conflict": 1, "lecturer_conflict": 1,
+        "conflict_multiplier": 20, "soft_on_conflict": False, "wrong_room": 30,
+        "wrong_room_types": ("P", "T"), "special_needs": 100, "daily_load": 0,
+        "high_priority_preference": 50, "general_preference": 10, "jabatan": 500,
+    },
+    "hybrid": {
+        "room_conflict": 2, "lecturer_conflict": 2, "cross_day": 1, "invalid_timeslot": 2,
+        "wrong_room": 2, "special_needs": 2, "daily_load": 1, "high_priority_preference": 2,
+        "general_preference": 1, "jabatan": 2, "conflict_multiplier": 100,
+    },
+}
+
+
+DAYS = ("Senin", "Selasa", "Rabu", "Kamis", "Jumat")
+
+
+def _timeslots():
+    # 5 hari x 10 slot 50 menit, istirahat sebelum slot ke-5; id hari berikutnya
+    # loncat 1 biar blok yang kebablasan akhir hari kena invalid_timeslot
+    slots = []
+    slot_id = 1
+    for day in range(5):
+        for i in range(10):
+            minutes = 7 * 60 + i * 50 + (60 if i >= 4 else 0)
+            slots.append(SimpleNamespace(
+                id=slot_id, day=DAYS[day], day_index=day,
+                start_time=time(minutes // 60, minutes % 60),
+                end_time=time((minutes + 50) // 60, (minutes + 50) % 60),
+            ))
+            slot_id += 1
+        slot_id += 1
+    return slots
+
+
+def build_data(seed=0, n_classes=48, n_lecturers=10, class_types="TTTPS"):
+    """
+    Data palsu kecil dengan bentuk sama seperti `fetch_data` + preferensi:
+    (opened_classes, rooms, timeslots, opened_class_cache, preferences_cache, dosen_cache).
+    Ada bentrok dosen, preferensi, jabatan dan kebutuhan khusus. Tipe kelas
+    diacak dari `class_types`; tipe selain T/P/S tidak punya ruangan.
+    """
+    rng = random.Random(seed)
+    timeslots = _timeslots()
+    rooms = [
+        SimpleNamespace(id=i + 1, tipe_ruangan=tipe, group_code=group, gedung=gedung)
+        for i, (tipe, group, gedung) in enumerate([
+            ("T", "KHD2", "KHD"), ("T", "KHD3", "KHD"), ("T", "DS2", "DS"), ("T", "DS3", "DS"),
+            ("P", "KHD4", "KHD"), ("P", "DS2", "DS"), ("S", "DS4", "DS"),
+        ])
+    ]
+    # dosen 1 ngajar jauh lebih banyak kelas, biar daily load kena
+    lecturers = list(range(1, n_lecturers + 1))
+    dosen_cache = {d: SimpleNamespace(pegawai_id=d, jabatan="Lektor" if d % 4 == 0 else None) for d in lecturers}
+
+    opened_classes = []
+    opened_class_cache = {}
+    preferences_cache = {}
+    for oc_id in range(1, n_classes + 1):
+        tipe = rng.choice(class_types)
+        dosen_ids = [1] if oc_id % 3 == 0 else rng.sample(lecturers[1:], rng.choice((1, 1, 2)))
+        opened_classes.append(SimpleNamespace(id=oc_id))
+        opened_class_cache[oc_id] = {
+            "mata_kuliah": SimpleNamespace(tipe_mk=tipe, program_studi_id=oc_id % 3 + 1),
+            "sks": rng.choice((1, 2, 3)),
+            "dosen_ids": dosen_ids,
+            "kelas": "A",
+            "kapasitas": 35,
+        }
+        for d in dosen_ids:
+            if d % 5 == 2:
+                continue  # dosen tanpa preferensi
+            prefs = rng.sample([t.id for t in timeslots], 6)
+            preferences_cache[(oc_id, d)] = {
+                "used_preference": d % 2 == 0,
+                "preferences": {t: None for t in prefs},
+                "is_high_priority": d % 3 == 0,
+                "is_special_needs": d == 6,
+            }
+
+    return opened_classes, rooms, timeslots, opened_class_cache, preferences_cache, dosen_cache
+
+
+def build_problem(**kwargs):
+    """`CompiledProblem` dari `build_data(**kwargs)`, tanpa jam istirahat."""
+    return compile_problem(*build_data(**kwargs), set())
+
+
+def random_solution(problem, rng):
+    """
+    Solusi acak: ruangan dan start boleh salah tipe / invalid / lintas hari.
+    Sebagian besar kelas numpuk di hari Senin, biar daily load dan jabatan kena.
+    """
+    return [
+        (c, rng.randrange(problem.n_rooms), rng.randrange(10) if rng.random() < 0.6 else rng.randrange(problem.n_slots))
+        for c in gene_order(problem)
+    ]
+
+
+@pytest.fixture(scope="session")
+def problem():
+    return build_problem()
+
+
+@pytest.fixture(params=sorted(PENALTY_SETS))
+def penalties(request):
+    return PENALTY_SETS[request.param]
+
+
+@pytest.fixture
+def starts(problem):
+    """Satu solusi acak (banyak bentrok) dan satu hasil DSatur (hampir bersih)."""
+    rng = random.Random(1)
+    return [random_solution(problem, rng), list(dsatur_solution(problem, rng))]
@@ -0,0 +1,34 @@
+import random
+
+import pytest
+
+from solver.batch import BatchEvaluator
+from solver.chromosome import Chromosome
+from solver.fitness import evaluate
+
+from conftest import random_solution
+
+
+def _population(problem, starts, size=30):
+    rng = random.Random(3)
+    population = [random_solution(problem, rng) for _ in range(size)]
+    # turunan DSatur: sedikit gen digeser, jadi ada individu bebas bentrok / hampir bebas
+    for _ in range(size // 3):
+        solution = list(starts[1])
+        for idx in rng.sample(range(len(solution)), 2):
+            c, _, _ = solution[idx]
+            solution[idx] = (c, rng.randrange(problem.n_rooms), rng.randrange(problem.n_slots))
+        population.append(solution)
+    return population + starts
+
+
+def test_chromosome_population_matches_evaluate(problem, penalties, starts):
+    population = [Chromosome.from_genes(solution) for solution in _population(problem, starts)]
+    expected = [evaluate(solution, problem, penalties) for solution in population]
+    assert BatchEvaluator(problem, penalties).evaluate_population(population) == pytest.approx(expected)
+
+
+def test_list_population_matches_evaluate(problem, penalties, starts):
+    population = _population(problem, starts)
+    expected = [evaluate(solution, problem, penalties) for solution in population]
+    assert BatchEvaluator(problem, penalties).evaluate_population(population) == pytest.approx(expected)
@@ -0,0 +1,29 @@
+import random
+
+from solver.checkpoint import Checkpointer, load_checkpoint
+from solver.construct import dsatur_solution, gene_order
+
+from conftest import build_problem, random_solution
+
+
+def test_roundtrip_with_roomless_classes(tmp_path):
+    # kelas tipe "L" tidak punya ruangan, jadi kromosom lebih pendek dari n_classes
+    problem = build_problem(class_types="TTTPSL")
+    n_genes = len(gene_order(problem))
+    assert 0 < n_genes < problem.n_classes
+
+    rng = random.Random(5)
+    best = dsatur_solution(problem, rng)
+    population = [random_solution(problem, rng) for _ in range(4)]
+    checkpointer = Checkpointer("roomless", 0, problem, {"seed": 5}, directory=str(tmp_path))
+    checkpointer.save(
+        phase="ga", generation=3, population=population, best_solution=best, best_fitness=12.5,
+        rng_state=rng.getstate(),
+    )
+
+    state = load_checkpoint("roomless", directory=str(tmp_path))
+    assert list(state["best_solution"]) == list(best)
+    assert [list(solution) for solution in state["population"]] == population
+    assert all(len(solution) == n_genes for solution in state["population"])
+    assert state["rng_state"] == rng.getstate()
+    assert (state["generation"], state["best_fitness"]) == (3, 12.5)
@@ -0,0 +1,18 @@
+import random
+
+import pytest
+
+from solver.construct import dsatur_solution
+from solver.problem import compile_problem
+
+from conftest import build_data
+
+
+def test_dsatur_rejects_class_longer_than_timetable():
+    opened_classes, rooms, timeslots, opened_class_cache, preferences_cache, dosen_cache = build_data()
+    # cuma 2 slot: kelas 3 sks (atau praktikum) tidak muat di mana pun
+    problem = compile_problem(
+        opened_classes, rooms, timeslots[:2], opened_class_cache, preferences_cache, dosen_cache, set(),
+    )
+    with pytest.raises(ValueError, match=r"Kelas \d+ butuh \d+ slot"):
+        dsatur_solution(problem, random.Random(2))
@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from solver.delta import IncrementalEvaluator
+from solver.fitness import check_daily_load_balance, evaluate
+
+from conftest import PENALTY_SETS
+
+MOVES = 1500
+
+
+def test_daily_load_is_exercised(problem, starts):
+    # data test harus benar-benar kena penalti daily load, kalau tidak test di bawah tidak ngecek apa-apa
+    assert check_daily_load_balance(starts[0], problem, PENALTY_SETS["hybrid"]) > 0
+
+
+def test_initial_score_matches_evaluate(problem, penalties, starts):
+    for solution in starts:
+        evaluator = IncrementalEvaluator(problem, penalties, solution)
+        assert evaluator.score == pytest.approx(evaluate(solution, problem, penalties))
+
+
+def test_moves_match_evaluate(problem, penalties, starts):
+    rng = random.Random(7)
+    for solution in starts:
+        evaluator = IncrementalEvaluator(problem, penalties, solution)
+        for _ in range(MOVES):
+            idx = rng.randrange(len(evaluator.solution))
+            before = evaluator.score
+            _, old_room, old_start = evaluator.solution[idx]
+            room = rng.randrange(problem.n_rooms)
+            start = rng.randrange(problem.n_slots)
+            delta = evaluator.move(idx, room, start)
+            assert evaluator.solution[idx][1:] == (room, start)
+            assert evaluator.score == pytest.approx(evaluate(evaluator.solution, problem, penalties))
+            assert delta == pytest.approx(evaluator.score - before)
+            if rng.random() < 0.3:
+                # pola SA/tabu: move lalu undo kelas yang sama
+                evaluator.move(idx, old_room, old_start)
+                assert evaluator.score == pytest.approx(before)
+
+
+def test_violations_track_moves(problem, penalties, starts):
+    rng = random.Random(9)
+    for solution in starts:
+        evaluator = IncrementalEvaluator(problem, penalties, solution)
+        evaluator.violations()
+        for step in range(MOVES):
+            idx = rng.randrange(len(evaluator.solution))
+            _, old_room, old_start = evaluator.solution[idx]
+            evaluator.move(idx, rng.randrange(problem.n_rooms), rng.randrange(problem.n_slots))
+            if rng.random() < 0.5:
+                # pola tabu: coba move lalu undo
+                evaluator.move(idx, old_room, old_start)
+            if step % 10 == 0:
+                # evaluator baru = scan penuh
+                expected = IncrementalEvaluator(problem, penalties, evaluator.solution).violations()
+                assert evaluator.violations() == expected
+                assert (evaluator.sample_violation(rng) in expected) if expected else evaluator.sample_violation(rng) is None
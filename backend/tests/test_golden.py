@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+from solver.batch import BatchEvaluator
+from solver.construct import gene_order
+from solver.delta import IncrementalEvaluator
+from solver.fitness import evaluate
+
+from conftest import PENALTY_SETS, build_problem, random_solution
+
+# (ruangan, start) per gen, urut gene_order: hasil DSatur pada build_problem(),
+# bebas bentrok jadi cuma penalti soft yang kena. Ditulis literal biar skor
+# golden tidak ikut berubah kalau constructor-nya diubah.
+CLEAN = [
+    (5, 34), (5, 30), (5, 23), (1, 6), (1, 17), (0, 15), (1, 37), (0, 1), (0, 45), (6, 43), (0, 41), (6, 25),
+    (6, 40), (6, 0), (3, 11), (2, 41), (0, 35), (6, 3), (3, 30), (2, 45), (3, 20), (2, 10), (3, 6), (6, 22),
+    (0, 48), (0, 18), (0, 4), (0, 38), (1, 15), (5, 21), (5, 27), (4, 32), (2, 48), (0, 44), (1, 32), (0, 20),
+    (1, 45), (2, 44), (6, 24), (6, 12), (6, 21), (3, 10), (6, 30), (6, 20), (1, 31), (2, 40), (3, 9), (6, 16),
+]
+
+# skor dari fungsi fitness versi awal yang masih pakai objek ORM (commit d1befc8):
+# ga_routes.fitness, sa_routes.calculate_fitness dan hybrid_routes.fitness dengan
+# penalty_params default, dijalankan pada solusi hasil decode_solution(...)
+GOLDEN = {
+    "ga": [5600, 100000, 100000, 7600, 370000, 5610000, 9120000, 7050000],
+    "sa": [360, 40, 40, 420, 140, 2580, 5120, 3740],
+    "hybrid": [19, 421, 417, 25, 1425, 14497.8, 16589.0, 14500.0],
+}
+
+
+def golden_solutions(problem):
+    """Solusi uji: CLEAN, CLEAN dengan beberapa gen digeser, dan solusi acak."""
+    order = gene_order(problem)
+    clean = [(c, room, start) for c, (room, start) in zip(order, CLEAN)]
+    solutions = [clean]
+    rng = random.Random(11)
+    for moved in (1, 2, 3, 5):
+        solution = list(clean)
+        for idx in rng.sample(range(len(solution)), moved):
+            solution[idx] = (solution[idx][0], rng.randrange(problem.n_rooms), rng.randrange(problem.n_slots))
+        solutions.append(solution)
+    solutions.extend(random_solution(problem, rng) for _ in range(3))
+    return solutions
+
+
+@pytest.fixture(scope="module")
+def golden_problem():
+    return build_problem()
+
+
+@pytest.mark.parametrize("name", sorted(PENALTY_SETS))
+def test_evaluate_matches_baseline(golden_problem, name):
+    penalties = PENALTY_SETS[name]
+    scores = [evaluate(solution, golden_problem, penalties) for solution in golden_solutions(golden_problem)]
+    assert scores == pytest.approx(GOLDEN[name])
+
+
+@pytest.mark.parametrize("name", sorted(PENALTY_SETS))
+def test_batch_matches_baseline(golden_problem, name):
+    evaluator = BatchEvaluator(golden_problem, PENALTY_SETS[name])
+    assert evaluator.evaluate_population(golden_solutions(golden_problem)) == pytest.approx(GOLDEN[name])
+
+
+@pytest.mark.parametrize("name", sorted(PENALTY_SETS))
+def test_incremental_matches_baseline(golden_problem, name):
+    penalties = PENALTY_SETS[name]
+    scores = [IncrementalEvaluator(golden_problem, penalties, solution).score for solution in golden_solutions(golden_problem)]
+    assert scores == pytest.approx(GOLDEN[name])
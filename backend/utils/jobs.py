@@ -0,0 +1,178 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+
+from solver.progress import JobCancelled, ThrottledProgress
+from utils.snapshot import data_version, sync_data_version
+
+logger = logging.getLogger(__name__)
+
+# default 1 worker: semua solver nulis ke tabel timetable yang sama
+JOB_WORKERS = int(os.getenv("SOLVER_JOB_WORKERS", "1"))
+# job yang sudah selesai disimpan sebatas ini, yang paling lama dibuang duluan
+MAX_FINISHED_JOBS = 100
+
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+
+class SharedProgress(ThrottledProgress):
+    """Reporter di proses worker: tulis progress ke dict manager, cek flag cancel."""
+
+    def __init__(self, job_id, progress, cancelled):
+        super().__init__()
+        self.job_id = job_id
+        self.progress = progress
+        self.cancelled = cancelled
+
+    def publish(self, fields):
+        self.progress[self.job_id] = fields
+        if self.cancelled.get(self.job_id):
+            raise JobCancelled(self.job_id)
+
+
+def _init_worker():
+    # koneksi DB hasil fork dari proses utama jangan dipakai bareng
+    from database import SessionLocal
+    SessionLocal.kw["bind"].dispose(close=False)
+
+
+def _run_job(solver, job_id, params, progress, cancelled, version):
+    from database import SessionLocal
+
+    # snapshot problem di worker ini basi kalau data master berubah sejak job sebelumnya
+    sync_data_version(version)
+    reporter = SharedProgress(job_id, progress, cancelled)
+    reporter.update(phase="starting")
+    db = SessionLocal()
+    try:
+        return solver(db=db, progress=reporter, **params)
+    finally:
+        db.close()
+
+
+class JobManager:
+    """
+    Antrian job solver di process pool terpisah, supaya endpoint generate
+    tidak nahan event loop uvicorn selama solver jalan.
+
+    `submit(algorithm, solver, params)` langsung return job id; `solver`
+    dipanggil di worker sebagai `solver(db=..., progress=..., **params)` dan
+    harus fungsi top-level. Record job (status, progress, result) disimpan
+    di memori proses API. Pool + manager baru dibuat waktu job pertama masuk.
+    """
+
+    def __init__(self, workers=JOB_WORKERS):
+        self.workers = max(1, workers)
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._futures = {}
+        self._executor = None
+        self._manager = None
+        self._progress = None
+        self._cancelled = None
+
+    def _ensure_started(self):
+        if self._executor is None:
+            self._manager = multiprocessing.Manager()
+            self._progress = self._manager.dict()
+            self._cancelled = self._manager.dict()
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+
+    def submit(self, algorithm, solver, params):
+        with self._lock:
+            self._ensure_started()
+            self._prune()
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "algorithm": algorithm,
+                "status": "queued",
+                "params": params,
+                "result": None,
+                "error": None,
+                "created_at": time.time(),
+                "finished_at": None,
+            }
+            future = self._executor.submit(
+                _run_job, solver, job_id, params, self._progress, self._cancelled, data_version()
+            )
+            self._futures[job_id] = future
+        future.add_done_callback(lambda f: self._finish(job_id, f))
+        logger.info(f"Job {job_id} ({algorithm}) masuk antrian")
+        return job_id
+
+    def _finish(self, job_id, future):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job["finished_at"] = time.time()
+            try:
+                job["result"] = future.result()
+                job["status"] = "completed"
+            except (CancelledError, JobCancelled):
+                job["status"] = "cancelled"
+            except Exception as e:
+                job["status"] = "failed"
+                job["error"] = str(e)
+            self._futures.pop(job_id, None)
+        logger.info(f"Job {job_id} selesai dengan status {job['status']}")
+
+    def _prune(self):
+        finished = [job for job in self._jobs.values() if job["status"] in FINISHED_STATUSES]
+        finished.sort(key=lambda job: job["finished_at"])
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job["job_id"]]
+            self._progress.pop(job["job_id"], None)
+            self._cancelled.pop(job["job_id"], None)
+
+    def get(self, job_id, include_result=True):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job = dict(job)
+        progress = self._progress.get(job_id)
+        if job["status"] not in FINISHED_STATUSES:
+            if self._cancelled.get(job_id):
+                job["status"] = "cancelling"
+            elif progress:
+                job["status"] = "running"
+        job["progress"] = progress
+        if not include_result:
+            job.pop("result")
+        return job
+
+    def list(self):
+        with self._lock:
+            job_ids = list(self._jobs)
+        return [self.get(job_id, include_result=False) for job_id in job_ids]
+
+    def cancel(self, job_id):
+        """Batalkan job. Yang masih antri langsung batal, yang jalan berhenti di `update()` berikutnya."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job["status"] in FINISHED_STATUSES:
+                return job["status"]
+            self._cancelled[job_id] = True
+            future = self._futures.get(job_id)
+        if future is not None:
+            future.cancel()
+        return "cancelling"
+
+    def shutdown(self):
+        if self._executor is not None:
+            for job_id in list(self._futures):
+                self.cancel(job_id)
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._manager.shutdown()
+            self._executor = None
+
+
+job_manager = JobManager()
@@ -0,0 +1,108 @@
+import logging
+import threading
+
+from fastapi import Request
+from sqlalchemy.orm import Session
+
+from model.academicperiod_model import AcademicPeriods
+from solver.problem import compile_problem
+
+logger = logging.getLogger(__name__)
+
+# versi data master (mata kuliah, ruangan, timeslot, preferensi, kelas dibuka,
+# dosen); dinaikkan tiap ada request tulis, snapshot versi lama jadi basi
+_data_version = 0
+_lock = threading.Lock()
+_snapshots = {}
+
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+
+def data_version():
+    return _data_version
+
+
+def bump_data_version():
+    """Tandai data master berubah: snapshot yang sudah ada tidak dipakai lagi."""
+    global _data_version
+    with _lock:
+        _data_version += 1
+        _snapshots.clear()
+
+
+def sync_data_version(version):
+    """Dipakai worker job: ikut versi proses API waktu job di-submit."""
+    global _data_version
+    with _lock:
+        if version != _data_version:
+            _data_version = version
+            _snapshots.clear()
+
+
+def invalidate_on_write(request: Request):
+    """
+    Dependency router data master: setelah request tulis selesai (commit
+    sudah jalan), versi data dinaikkan. Request yang gagal tetap dihitung,
+    snapshot yang dibuang padahal masih sah cuma bikin load ulang sekali.
+    """
+    try:
+        yield
+    finally:
+        if request.method in WRITE_METHODS:
+            bump_data_version()
+
+
+class ProblemSnapshot:
+    """
+    Input solver yang sudah jadi untuk satu versi data: hasil `fetch_data`,
+    preferensi dosen, dosen_cache, plus `CompiledProblem` per aturan jam
+    istirahat. Objek ORM-nya sudah dilepas dari session (expunge), jadi
+    aman dipakai ulang di session lain; isinya dianggap read-only.
+    """
+
+    def __init__(self, data, preferences_cache, dosen_cache):
+        (
+            self.courses, self.lecturers, self.rooms, self.timeslots, self.preferences,
+            self.opened_classes, self.opened_class_cache, self.room_cache, self.timeslot_cache,
+        ) = data
+        self.preferences_cache = preferences_cache
+        self.dosen_cache = dosen_cache
+        self._problems = {}
+
+    def problem(self, identify_recess_times):
+        """`CompiledProblem` dengan jam istirahat dari `identify_recess_times(timeslot_cache)`, dikompilasi sekali."""
+        key = (identify_recess_times.__module__, identify_recess_times.__qualname__)
+        with _lock:
+            problem = self._problems.get(key)
+        if problem is None:
+            problem = compile_problem(
+                self.opened_classes, self.rooms, self.timeslots, self.opened_class_cache,
+                self.preferences_cache, self.dosen_cache, identify_recess_times(self.timeslot_cache),
+            )
+            with _lock:
+                problem = self._problems.setdefault(key, problem)
+        return problem
+
+
+def cached_snapshot(db: Session, build):
+    """
+    Snapshot untuk periode akademik aktif + versi data sekarang; kalau belum
+    ada dibangun lewat `build(db)` lalu disimpan. Cuma snapshot terbaru yang
+    disimpan, periode/versi lain langsung dibuang.
+    """
+    active_period = db.query(AcademicPeriods.id).filter(AcademicPeriods.is_active == True).first()
+    version = _data_version
+    key = (active_period.id if active_period else None, version)
+    with _lock:
+        snapshot = _snapshots.get(key)
+    if snapshot is not None:
+        return snapshot
+
+    snapshot = build(db)
+    with _lock:
+        # versi sudah naik selama build: snapshot ini mungkin basi, pakai sekali saja
+        if version == _data_version:
+            _snapshots.clear()
+            _snapshots[key] = snapshot
+    logger.info(f"Snapshot problem dibangun (periode {key[0]}, versi data {version})")
+    return snapshot
@@ -0,0 +1,241 @@
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import literal, select
+from sqlalchemy.orm import Session
+
+from model.academicperiod_model import AcademicPeriods
+from model.mahasiswatimetable_model import MahasiswaTimeTable
+from model.temporary_timetable_model import TemporaryTimeTable
+from model.timetable_model import TimeTable
+from model.timetable_version_model import TimeTableStaging, TimeTableVersion
+
+logger = logging.getLogger(__name__)
+
+# ruangan virtual kelas besar, ditulis sebagai baris kedua placeholder
+KELAS_BESAR_ROOM = "FIK-VCR-KB-1"
+# versi selain yang aktif yang disimpan di staging (buat rollback), sisanya dibuang
+KEEP_VERSIONS = 3
+# kolom timetable yang disalin bolak-balik dengan staging
+TIMETABLE_COLUMNS = (
+    "opened_class_id", "ruangan_id", "timeslot_ids", "is_conflicted", "kelas", "kapasitas",
+    "reason", "academic_period_id", "kuota", "placeholder",
+)
+
+
+def _time_range(timeslot_ids, timeslot_cache):
+    first_timeslot = timeslot_cache[timeslot_ids[0]]
+    day = first_timeslot.day.value
+    start_time = first_timeslot.start_time.strftime("%H:%M")
+    end_time = timeslot_cache[timeslot_ids[-1]].end_time.strftime("%H:%M")
+    return f"{day} ({start_time} - {end_time})"
+
+
+def first_entries(timetable: List[Dict], opened_class_cache):
+    """Entri pertama tiap kodemk di `timetable`, dibangun sekali (kelas besar ikut jadwal entri ini)."""
+    first = {}
+    for entry in timetable:
+        class_info = opened_class_cache.get(entry["opened_class_id"])
+        if class_info is not None:
+            first.setdefault(class_info["mata_kuliah"].kodemk, entry)
+    return first
+
+
+def timetable_placeholder(entry, first_entry, opened_class_cache, room_cache, timeslot_cache):
+    """Teks ruangan + jam untuk satu entri; kelas besar ikut jadwal `first_entry` (kodemk yang sama)."""
+    mata_kuliah = opened_class_cache[entry["opened_class_id"]]["mata_kuliah"]
+    room = room_cache[entry["ruangan_id"]]
+    placeholder = f"1. {room.kode_ruangan} - {_time_range(entry['timeslot_ids'], timeslot_cache)}"
+    if mata_kuliah.have_kelas_besar and first_entry:
+        placeholder += f"\n2. {KELAS_BESAR_ROOM} - {_time_range(first_entry['timeslot_ids'], timeslot_cache)}"
+    return placeholder
+
+
+def timetable_rows(timetable: List[Dict], opened_class_cache, room_cache, timeslot_cache, academic_period_id):
+    """Baris siap insert (dict kolom `TimeTable`) untuk semua entri, satu pass; entri yang key-nya hilang dilewati."""
+    first = first_entries(timetable, opened_class_cache)
+    rows = []
+    for entry in timetable:
+        try:
+            opened_class = opened_class_cache[entry["opened_class_id"]]
+            placeholder = timetable_placeholder(
+                entry, first.get(opened_class["mata_kuliah"].kodemk), opened_class_cache, room_cache, timeslot_cache
+            )
+        except KeyError as e:
+            logger.error(f"Missing key in opened_class_cache or room_cache for timetable entry: {e}")
+            continue
+        rows.append({
+            "opened_class_id": entry["opened_class_id"],
+            "ruangan_id": entry["ruangan_id"],
+            "timeslot_ids": entry["timeslot_ids"],
+            "is_conflicted": entry["is_conflicted"],
+            "kelas": entry["kelas"],
+            "kapasitas": opened_class["kapasitas"],
+            "academic_period_id": academic_period_id,
+            "placeholder": placeholder,
+        })
+    return rows
+
+
+def stage_timetable(db: Session, timetable: List[Dict], opened_class_cache, room_cache, timeslot_cache, source=None):
+    """
+    Tulis jadwal sebagai versi baru di staging (executemany, satu transaksi),
+    timetable yang sedang tampil tidak disentuh. Return (versi, statistik tulis).
+    """
+    active_period = db.query(AcademicPeriods).filter(AcademicPeriods.is_active == True).first()
+    if not active_period:
+        raise ValueError("Active academic period tidak ditemukan")
+
+    started = time.perf_counter()
+    rows = timetable_rows(timetable, opened_class_cache, room_cache, timeslot_cache, active_period.id)
+    try:
+        version = TimeTableVersion(source=source, rows=len(rows), academic_period_id=active_period.id)
+        db.add(version)
+        db.flush()
+        if rows:
+            db.execute(TimeTableStaging.__table__.insert(), [{"version_id": version.id, **row} for row in rows])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    seconds = time.perf_counter() - started
+
+    stats = {
+        "rows": len(rows),
+        "seconds": round(seconds, 4),
+        "rows_per_second": round(len(rows) / seconds, 1) if seconds > 0 else None,
+    }
+    logger.info(f"Timetable versi {version.id} tersimpan di staging: {stats['rows']} baris dalam {stats['seconds']} detik ({stats['rows_per_second']} baris/detik)")
+    return version, stats
+
+
+def _copy_live(db: Session, version: TimeTableVersion):
+    # isi timetable sekarang jadi isi staging `version` (yang lama dibuang)
+    live = TimeTable.__table__
+    staging = TimeTableStaging.__table__
+    db.execute(staging.delete().where(staging.c.version_id == version.id))
+    db.execute(staging.insert().from_select(
+        ("version_id",) + TIMETABLE_COLUMNS,
+        select(literal(version.id), *(live.c[name] for name in TIMETABLE_COLUMNS)).order_by(live.c.id),
+    ))
+    version.rows = db.query(TimeTable).count()
+
+
+def archive_live(db: Session, academic_period_id: int):
+    """
+    Simpan isi timetable sekarang (termasuk edit manual) ke staging versi
+    aktifnya lalu jadikan archived. Kalau jadwal yang tampil belum punya
+    versi, dibuatkan versi "unversioned". Belum di-commit.
+    """
+    active = db.query(TimeTableVersion).filter(TimeTableVersion.status == "active").first()
+    if active is None and db.query(TimeTable).first() is not None:
+        # ditulis sebelum ada versioning / lewat reset, tetap disimpan
+        active = TimeTableVersion(source="unversioned", status="active", academic_period_id=academic_period_id)
+        db.add(active)
+        db.flush()
+    if active is not None:
+        _copy_live(db, active)
+        active.status = "archived"
+    return active
+
+
+def _prune_versions(db: Session, keep_id: int):
+    # versi lama di luar KEEP_VERSIONS terbaru dibuang dari staging
+    staging = TimeTableStaging.__table__
+    stale = [
+        v.id for v in db.query(TimeTableVersion)
+        .filter(TimeTableVersion.id != keep_id)
+        .order_by(TimeTableVersion.id.desc())
+        .offset(KEEP_VERSIONS)
+    ]
+    if stale:
+        db.execute(staging.delete().where(staging.c.version_id.in_(stale)))
+        db.query(TimeTableVersion).filter(TimeTableVersion.id.in_(stale)).delete(synchronize_session=False)
+
+
+def activate_live(db: Session, academic_period_id: int, source=None):
+    """
+    Catat isi timetable sekarang sebagai versi aktif baru (dipakai kalau
+    timetable diubah di tempat, bukan lewat publish). Panggil setelah
+    `archive_live` di transaksi yang sama; belum di-commit.
+    """
+    db.flush()
+    version = TimeTableVersion(
+        source=source, status="active", academic_period_id=academic_period_id, published_at=datetime.now()
+    )
+    db.add(version)
+    db.flush()
+    _copy_live(db, version)
+    _prune_versions(db, version.id)
+    return version
+
+
+def publish_version(db: Session, version_id: int):
+    """
+    Jadikan versi `version_id` jadwal yang tampil, dalam satu transaksi:
+    isi timetable sekarang (termasuk edit manual) disimpan dulu sebagai
+    versi aktif lama dan versi itu jadi archived, lalu timetable beserta
+    mahasiswa_timetable/temporary_timetable-nya diganti isi versi baru.
+    Pembaca cuma pernah lihat jadwal lama atau jadwal baru, tidak pernah
+    setengah jadi/kosong; kalau ada error semuanya di-rollback.
+    """
+    live = TimeTable.__table__
+    staging = TimeTableStaging.__table__
+    try:
+        version = db.get(TimeTableVersion, version_id)
+        if version is None:
+            raise ValueError(f"Versi timetable {version_id} tidak ditemukan")
+        if version.status == "active":
+            # publish ulang bakal nimpa edit manual sejak publish terakhir dengan isi staging yang lama
+            raise ValueError(f"Versi timetable {version_id} sudah aktif")
+        archive_live(db, version.academic_period_id)
+
+        db.execute(TemporaryTimeTable.__table__.delete())
+        db.execute(MahasiswaTimeTable.__table__.delete())
+        db.execute(live.delete())
+        db.execute(live.insert().from_select(
+            TIMETABLE_COLUMNS,
+            select(*(staging.c[name] for name in TIMETABLE_COLUMNS))
+            .where(staging.c.version_id == version.id)
+            .order_by(staging.c.id),
+        ))
+        version.status = "active"
+        version.published_at = datetime.now()
+        _prune_versions(db, version.id)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    logger.info(f"Timetable versi {version_id} dipublish")
+    return version
+
+
+def previous_version(db: Session) -> Optional[TimeTableVersion]:
+    """Versi archived yang paling terakhir tampil, target rollback."""
+    return (
+        db.query(TimeTableVersion)
+        .filter(TimeTableVersion.status == "archived")
+        .order_by(TimeTableVersion.published_at.desc(), TimeTableVersion.id.desc())
+        .first()
+    )
+
+
+def rollback_timetable(db: Session):
+    """Publish ulang versi sebelumnya; versi yang sekarang jadi archived (rollback bisa di-rollback lagi)."""
+    previous = previous_version(db)
+    if previous is None:
+        raise ValueError("Tidak ada versi timetable sebelumnya untuk rollback")
+    return publish_version(db, previous.id)
+
+
+def write_timetable(db: Session, timetable: List[Dict], opened_class_cache, room_cache, timeslot_cache, source=None):
+    """
+    Simpan jadwal final: ditulis sebagai versi baru di staging sekali batch,
+    lalu dipublish atomik. Return statistik tulis (rows, detik, rows per
+    detik) plus id versinya.
+    """
+    version, stats = stage_timetable(db, timetable, opened_class_cache, room_cache, timeslot_cache, source)
+    publish_version(db, version.id)
+    return {**stats, "version": version.id}